@@ -2,13 +2,56 @@
 
 cd $(dirname $0)/libreria
 
-gunicorn libreria.wsgi:application \
-  --bind 0.0.0.0:${PORT:-8000} \
-  --workers $(($(nproc) * 2 + 1)) \
-  --threads 2 \
-  --timeout 120 \
-  --access-logfile '-' \
-  --error-logfile '-' \
-  --preload \
-  --max-requests 150 \
-  --max-requests-jitter 10
+# Verifica que existan los índices declarados (libros/indexes.py) antes de
+# atender peticiones; con ENSURE_INDEXES=yes se crean los que falten
+if [ "${ENSURE_INDEXES:-NO}" = "yes" ]; then
+  python manage.py ensure_indexes || exit 1
+else
+  python manage.py ensure_indexes --check || exit 1
+fi
+
+# exec: el proceso de la función (en segundo plano, un subshell) pasa a ser
+# gunicorn, que así recibe directamente las señales
+serve() {
+  exec gunicorn "$@" \
+    --config gunicorn.conf.py \
+    --timeout 120 \
+    --access-logfile '-' \
+    --error-logfile '-' \
+    --preload \
+    --max-requests 150 \
+    --max-requests-jitter 10
+}
+
+wsgi() {
+  serve libreria.wsgi:application \
+    --threads 2 \
+    --bind 0.0.0.0:${PORT:-8000} \
+    --workers $(($(nproc) * 2 + 1))
+}
+
+# SERVER=asgi sirve además las vistas asíncronas (/api/async/...) con
+# uvicorn en ASYNC_PORT. El resto de la API sigue en WSGI: bajo ASGI,
+# Django 3.1 ejecuta todas las vistas síncronas de un worker en un hilo
+if [ "${SERVER:-wsgi}" != "asgi" ]; then
+  wsgi
+fi
+
+serve libreria.asgi:application \
+  --worker-class uvicorn.workers.UvicornWorker \
+  --bind 0.0.0.0:${ASYNC_PORT:-8001} \
+  --workers ${ASYNC_WORKERS:-$(nproc)} &
+ASYNC_PID=$!
+wsgi &
+WSGI_PID=$!
+
+# Los dos servidores se detienen juntos: si uno termina, se detiene el
+# otro y el contenedor sale con error para que el orquestador lo reinicie
+STOPPING=no
+trap 'STOPPING=yes; kill -TERM $ASYNC_PID $WSGI_PID 2>/dev/null' TERM INT
+while kill -0 $ASYNC_PID 2>/dev/null && kill -0 $WSGI_PID 2>/dev/null; do
+  sleep 1
+done
+kill -TERM $ASYNC_PID $WSGI_PID 2>/dev/null
+wait
+[ "$STOPPING" = "yes" ]
@@ -0,0 +1,79 @@
+"""
+Configuración de gunicorn.
+
+Las opciones de línea de comandos están en entrypoint.sh; este archivo
+define los hooks que se ejecutan en el proceso maestro y en cada worker.
+"""
+import os
+
+
+def when_ready(server):
+    """
+    Construye el índice de autocompletado en el proceso maestro.
+
+    Con --preload los workers lo heredan ya construido al hacer fork y lo
+    comparten por copy-on-write, así ninguna petición paga el recorrido
+    completo de la colección, tampoco tras reciclar un worker. Cada worker
+    aplica después en segundo plano los cambios posteriores. La
+    construcción termina antes de crear los workers y el maestro no
+    vuelve a usar MongoDB ni el índice, por lo que ningún hilo puede dejar
+    un lock tomado o el índice a medio modificar al hacer fork. Los
+    workers de uvicorn solo sirven las vistas asíncronas y no lo necesitan.
+    """
+    if 'uvicorn' in server.cfg.worker_class_str:
+        return
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'libreria.settings')
+
+    import django
+    django.setup()
+
+    from libros.suggest import suggest_index
+    try:
+        suggest_index.build()
+    except Exception as e:
+        server.log.warning('No se pudo construir el índice de autocompletado: %s', e)
+    else:
+        server.log.info('Índice de autocompletado construido: %s', suggest_index.stats())
+
+
+def post_fork(server, worker):
+    """
+    Prepara el worker recién creado.
+
+    El cliente de MongoDB heredado del proceso maestro se descarta
+    automáticamente después del fork (ver libros.utils.mongo). Con
+    MONGO_WARMUP=yes se abre la primera conexión antes de atender
+    peticiones, evitando que la primera pague la resolución SRV y el
+    handshake TLS.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'libreria.settings')
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    if not settings.MONGO_WARMUP:
+        return
+
+    from libros.utils.mongo import warm_up
+    try:
+        warm_up()
+    except Exception as e:
+        worker.log.warning('No se pudo precalentar la conexión a MongoDB: %s', e)
+    else:
+        worker.log.info('Conexión a MongoDB precalentada en el worker %s', worker.pid)
+
+
+def worker_exit(server, worker):
+    """
+    Guarda las métricas pendientes del worker antes de que termine.
+
+    Los workers se reciclan cada --max-requests peticiones; sin esto se
+    perderían las observaciones posteriores al último guardado periódico.
+    """
+    from libros.utils.metrics import flush_metrics
+    try:
+        flush_metrics()
+    except Exception as e:
+        worker.log.warning('No se pudieron guardar las métricas del worker: %s', e)
@@ -13,4 +13,27 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'libreria.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Rutas que se sirven con ASGI; el resto de la API se sirve con WSGI
+ASYNC_PATH_PREFIX = '/api/async/'
+
+
+async def application(scope, receive, send):
+    """
+    Sirve solo las vistas asíncronas (/api/async/...).
+
+    Con Django 3.1 y asgiref 3.8, ASGI ejecuta todas las vistas síncronas
+    de un proceso en un único hilo, por lo que servir allí la API de DRF
+    la atendería de a una petición por worker. Las demás rutas responden
+    404 y se sirven con gunicorn WSGI (ver entrypoint.sh).
+    """
+    if scope['type'] == 'http' and not scope['path'].startswith(ASYNC_PATH_PREFIX):
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"detail":"Not found."}'})
+        return
+    await django_application(scope, receive, send)
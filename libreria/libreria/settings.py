@@ -14,9 +14,34 @@ from pathlib import Path
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 load_dotenv()
 
+
+def env_number(name, default=None, cast=int):
+    """
+    Lee una variable de entorno numérica.
+
+    Una variable ausente o vacía toma el valor por defecto; un valor
+    inválido detiene el arranque indicando la variable.
+    """
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        raise ImproperlyConfigured(f'{name} debe ser un número ({cast.__name__}), no {value!r}')
+
+
+def env_int(name, default=None):
+    return env_number(name, default, int)
+
+
+def env_float(name, default=None):
+    return env_number(name, default, float)
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,10 +70,11 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'drf_spectacular',
-    'libros',
+    'libros.apps.LibrosConfig',
 ]
 
 MIDDLEWARE = [
+    'libros.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,18 +108,61 @@ WSGI_APPLICATION = 'libreria.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Pool de conexiones de MongoDB. djongo y las consultas directas con
+# pymongo comparten un único cliente por worker con estas opciones; los
+# valores por defecto son los de pymongo.
+MONGO_CLIENT_OPTIONS = {
+    'maxPoolSize': env_int('MONGO_MAX_POOL_SIZE', 100),
+    'minPoolSize': env_int('MONGO_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': env_int('MONGO_MAX_IDLE_TIME_MS'),
+    'waitQueueTimeoutMS': env_int('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+    'connectTimeoutMS': env_int('MONGO_CONNECT_TIMEOUT_MS', 20000),
+    'socketTimeoutMS': env_int('MONGO_SOCKET_TIMEOUT_MS'),
+    'serverSelectionTimeoutMS': env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000),
+}
+
+# Abrir la primera conexión al iniciar cada worker de gunicorn
+MONGO_WARMUP = os.environ.get('MONGO_WARMUP', 'NO') == 'yes'
+
 DATABASES = {
     'default': {
         'ENGINE': 'djongo',
-        'NAME': 'libreria',
+        'NAME': os.environ.get('MONGO_DB_NAME', 'libreria'),
         'ENFORCE_SCHEMA': False,
+        # Conexión persistente: djongo cierra el cliente compartido al
+        # cerrar la conexión, lo que vaciaría el pool en cada petición
+        'CONN_MAX_AGE': None,
         'CLIENT': {
             'host': f'mongodb+srv://{os.environ.get("MONGO_USER")}:{os.environ.get("MONGO_PASSWORD")}@{os.environ.get("MONGO_HOST")}/?retryWrites=true&w=majority&appName=Cluster0',
+            **{option: value for option, value in MONGO_CLIENT_OPTIONS.items() if value is not None},
         }
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+#
+# 'books' guarda las respuestas de búsqueda y estadísticas. Por defecto es
+# una caché LRU local a cada worker; BOOKS_CACHE_BACKEND y
+# BOOKS_CACHE_LOCATION permiten usar una caché compartida (por ejemplo
+# django.core.cache.backends.memcached.PyLibMCCache).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'books': {
+        'BACKEND': os.environ.get('BOOKS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('BOOKS_CACHE_LOCATION', 'libros-books'),
+        'TIMEOUT': env_int('BOOKS_CACHE_TIMEOUT', 300),
+        'OPTIONS': {
+            'MAX_ENTRIES': env_int('BOOKS_CACHE_MAX_ENTRIES', 1000),
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -138,11 +207,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'libros.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'libros.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
@@ -175,6 +248,9 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
+    # Versiones fijas de Swagger UI y Redoc; @latest puede romper la documentación
+    'SWAGGER_UI_DIST': 'https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.17.14',
+    'REDOC_DIST': 'https://cdn.jsdelivr.net/npm/redoc@2.1.5',
     'SECURITY_DEFINITIONS': {
         'Bearer': {
             'type': 'http',
@@ -182,4 +258,62 @@ SPECTACULAR_SETTINGS = {
             'bearerFormat': 'JWT',
         }
     },
-}
\ No newline at end of file
+}
+
+# Motor de búsqueda de libros: 'index' (índice invertido) o 'regex'
+BOOK_SEARCH_ENGINE = os.environ.get('BOOK_SEARCH_ENGINE', 'index')
+
+# Tiempo máximo (ms) para calcular las facetas de la búsqueda (facets=true);
+# si se supera, la búsqueda responde sin facetas
+SEARCH_FACETS_MAX_TIME_MS = env_int('SEARCH_FACETS_MAX_TIME_MS', 300)
+
+# Similitud mínima de trigramas (0 a 1) para que un término cuente en la
+# búsqueda difusa (fuzzy=true)
+SEARCH_FUZZY_THRESHOLD = env_float('SEARCH_FUZZY_THRESHOLD', 0.3)
+
+# Intervalo (segundos) con que cada worker aplica en segundo plano a su
+# índice de autocompletado los libros modificados en otros workers
+SUGGEST_INDEX_MAX_AGE = env_int('SUGGEST_INDEX_MAX_AGE', 30)
+
+# Caché por worker de los usuarios autenticados con JWT; la expiración
+# (segundos) nunca supera ACCESS_TOKEN_LIFETIME. Cada worker consulta los
+# usuarios modificados en otros cada AUTH_USER_CACHE_CHECK_INTERVAL segundos
+AUTH_USER_CACHE_TIMEOUT = env_int('AUTH_USER_CACHE_TIMEOUT', 300)
+AUTH_USER_CACHE_MAX_ENTRIES = env_int('AUTH_USER_CACHE_MAX_ENTRIES', 10000)
+AUTH_USER_CACHE_CHECK_INTERVAL = env_int('AUTH_USER_CACHE_CHECK_INTERVAL', 5)
+
+# Límites de POST /api/books/import/, que importa dentro de la petición;
+# los archivos mayores se importan con el comando import_books
+IMPORT_UPLOAD_MAX_BYTES = env_int('IMPORT_UPLOAD_MAX_BYTES', 5 * 1024 * 1024)
+IMPORT_UPLOAD_MAX_ROWS = env_int('IMPORT_UPLOAD_MAX_ROWS', 10000)
+
+# Lecturas del listado y el detalle de libros directamente con pymongo
+BOOKS_NATIVE_READS = os.environ.get('BOOKS_NATIVE_READS', 'NO') == 'yes'
+
+# Consultas simultáneas a MongoDB por proceso en las vistas asíncronas
+MONGO_ASYNC_WORKERS = env_int('MONGO_ASYNC_WORKERS', 32)
+
+# Agregaciones lentas: las que superan MONGO_SLOW_QUERY_MS (0 desactiva la
+# detección) se guardan en MONGO_SLOW_QUERY_LOG; de cada forma se obtiene
+# el plan de ejecución como máximo una vez cada
+# MONGO_SLOW_QUERY_EXPLAIN_INTERVAL segundos por worker, muestreado con
+# MONGO_SLOW_QUERY_SAMPLE_RATE. El comando slow_queries las resume
+MONGO_SLOW_QUERY_MS = env_float('MONGO_SLOW_QUERY_MS', 200)
+MONGO_SLOW_QUERY_SAMPLE_RATE = env_float('MONGO_SLOW_QUERY_SAMPLE_RATE', 1.0)
+MONGO_SLOW_QUERY_EXPLAIN_INTERVAL = env_float('MONGO_SLOW_QUERY_EXPLAIN_INTERVAL', 300)
+MONGO_SLOW_QUERY_LOG = os.environ.get('MONGO_SLOW_QUERY_LOG', str(BASE_DIR / 'slow_queries.log'))
+
+# Métricas de /metrics: cada worker suma sus observaciones a MongoDB cada
+# METRICS_FLUSH_INTERVAL segundos; sin METRICS_TOKEN el endpoint está
+# desactivado y con él exige 'Authorization: Bearer <METRICS_TOKEN>'
+METRICS_FLUSH_INTERVAL = env_float('METRICS_FLUSH_INTERVAL', 10)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Esquema OpenAPI precalculado (comando spectacular) servido como archivo
+# estático; los workers no cargan drf_spectacular
+API_SCHEMA_STATIC = os.environ.get('API_SCHEMA_STATIC', 'NO') == 'yes'
+API_SCHEMA_FILE = os.environ.get('API_SCHEMA_FILE', str(BASE_DIR / 'schema.yml'))
+
+if API_SCHEMA_STATIC:
+    INSTALLED_APPS.remove('drf_spectacular')
+    REST_FRAMEWORK.pop('DEFAULT_SCHEMA_CLASS')
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class LibrosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'libros'
+
+    def ready(self):
+        from pymongo import monitoring
+        from . import signals  # noqa: F401
+        from .utils.monitoring import command_timer, pool_stats
+
+        # Deben registrarse antes de crear el MongoClient del proceso
+        monitoring.register(pool_stats)
+        monitoring.register(command_timer)
@@ -0,0 +1,230 @@
+"""
+Versiones asíncronas de la búsqueda y las estadísticas de libros.
+
+Las agregaciones se ejecutan en el pool de hilos de aggregate_async, por
+lo que el event loop no se bloquea mientras esperan a MongoDB y un único
+proceso servido con ASGI (uvicorn) puede atender muchas a la vez.
+Devuelven las mismas respuestas que BookViewSet.search y BookStatsView,
+sin la caché de respuestas ni las peticiones condicionales.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from pymongo.errors import ExecutionTimeout
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.request import Request
+
+from .authentication import CachedJWTAuthentication
+from .fuzzy import TrigramIndex, fuzzy_plan, fuzzy_requested
+from .pagination import Pagination
+from .renderers import ORJSONRenderer
+from .search import facets_requested, get_search_backend, query_terms, search_facets_pipeline, search_facets_result
+from .serializers import BookStatsSerializer
+from .stats import book_stats_pipeline, book_stats_result, parse_stats_params
+from .utils.mongo import MongoConnection, aggregate_async
+
+renderer = ORJSONRenderer()
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    """
+    Construye una respuesta JSON con el mismo formato que las vistas de DRF.
+
+    Args:
+        data: Datos de la respuesta
+        status_code: Código de estado HTTP
+        headers: Encabezados adicionales
+
+    Returns:
+        HttpResponse: Respuesta con el JSON renderizado
+    """
+    response = HttpResponse(renderer.render(data), status=status_code, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def exception_response(exc, authentication):
+    """
+    Convierte una excepción de DRF en respuesta, igual que su manejador de excepciones.
+    """
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    headers = {}
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        headers['WWW-Authenticate'] = authentication.authenticate_header(None)
+    return json_response(data, exc.status_code, headers)
+
+
+def async_api_view(view):
+    """
+    Decorador para vistas asíncronas de solo lectura autenticadas con JWT.
+
+    La autenticación consulta el usuario con el ORM, por lo que se
+    ejecuta en un hilo mediante sync_to_async. Con thread_sensitive=False
+    usa el pool de hilos del event loop en lugar del hilo único que
+    asgiref reserva para el código síncrono, y las peticiones no se
+    esperan entre sí; el cliente de MongoDB de djongo es compartido por
+    todos los hilos.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        authentication = CachedJWTAuthentication()
+        if request.method != 'GET':
+            return json_response(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                {'Allow': 'GET'}
+            )
+
+        try:
+            user_auth = await sync_to_async(authentication.authenticate, thread_sensitive=False)(request)
+            if user_auth is None:
+                raise NotAuthenticated()
+        except APIException as e:
+            return exception_response(e, authentication)
+
+        request.user, request.auth = user_auth
+        return await view(Request(request), *args, **kwargs)
+
+    return wrapper
+
+
+async def search_facets(plan):
+    """
+    Calcula las facetas de una búsqueda con su propio límite de tiempo.
+
+    Args:
+        plan: SearchPlan de la búsqueda
+
+    Returns:
+        dict: Facetas de las coincidencias, o None si superaron
+        SEARCH_FACETS_MAX_TIME_MS
+    """
+    try:
+        facet_results = await aggregate_async(
+            plan.collection, search_facets_pipeline(plan), length=1,
+            maxTimeMS=settings.SEARCH_FACETS_MAX_TIME_MS
+        )
+    except ExecutionTimeout:
+        return None
+    return search_facets_result(facet_results[0] if facet_results else None)
+
+
+async def get_fuzzy_plan(search_term):
+    """
+    Obtiene los términos parecidos y construye el plan de una búsqueda difusa.
+
+    Args:
+        search_term: Consulta escrita por el usuario
+
+    Returns:
+        SearchPlan: Plan sobre el índice invertido
+    """
+    terms = query_terms(search_term)
+    if not terms:
+        return fuzzy_plan([])
+    index = TrigramIndex()
+    facet_results = await aggregate_async(index.trigrams, index.similar_terms_pipeline(terms), length=1)
+    return fuzzy_plan(TrigramIndex.similar_terms_result(facet_results[0] if facet_results else None, terms))
+
+
+@async_api_view
+async def search(request):
+    """
+    Búsqueda de libros asíncrona, equivalente a BookViewSet.search.
+
+    Args:
+        request: Objeto Request con el parámetro de búsqueda 'q'
+
+    Returns:
+        HttpResponse: Resultados paginados ordenados por relevancia
+    """
+    search_term = request.query_params.get('q', '')
+    if not search_term:
+        return json_response(
+            {'error': 'El parámetro de búsqueda "q" es requerido'},
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    paginator = Pagination()
+    try:
+        page_number, page_size = paginator.get_aggregation_page(request)
+        if fuzzy_requested(request.query_params):
+            plan = await get_fuzzy_plan(search_term)
+        else:
+            plan = get_search_backend().plan(search_term)
+        if page_number is None:
+            count_results = await aggregate_async(
+                plan.collection, [*plan.pipeline, paginator.get_count_stage()], length=1
+            )
+            page_number = paginator.get_last_page(count_results[0] if count_results else None, page_size)
+        facet = paginator.get_facet_stage(page_number, page_size, plan.ranking, plan.lookup)
+        with_facets = facets_requested(request.query_params)
+        if with_facets:
+            # La página y las facetas se calculan a la vez
+            facet_results, facets = await asyncio.gather(
+                aggregate_async(plan.collection, [*plan.pipeline, facet], length=1),
+                search_facets(plan)
+            )
+        else:
+            facet_results = await aggregate_async(plan.collection, [*plan.pipeline, facet], length=1)
+        page = paginator.set_aggregation_page(
+            facet_results[0] if facet_results else {'results': [], 'total': []},
+            page_number, page_size, request
+        )
+        data = paginator.get_paginated_response(page).data
+        if with_facets:
+            data['facets'] = facets
+        return json_response(data)
+    except NotFound as e:
+        return json_response({'detail': e.detail}, status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return json_response(
+            {'error': f'Error en la búsqueda: {str(e)}'},
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view
+async def book_stats(request):
+    """
+    Estadísticas de libros por año asíncronas, equivalentes a BookStatsView.
+
+    Args:
+        request: Objeto Request con 'year' y, opcionalmente, 'page', 'top' y 'summary'
+
+    Returns:
+        HttpResponse: Estadísticas del año o 404 si no hay libros
+    """
+    try:
+        year, page, top, summary_only = parse_stats_params(request.query_params)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+    pipeline = book_stats_pipeline(year, page, top, summary_only)
+    try:
+        collection = MongoConnection().get_collection('libros_book')
+        facet_results = await aggregate_async(collection, pipeline, length=1)
+        result = book_stats_result(facet_results[0] if facet_results else None, year, page, top)
+
+        if result is None:
+            return json_response(
+                {
+                    'year': year,
+                    'message': f'No books found for year {year}'
+                },
+                status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = BookStatsSerializer(data=result)
+        serializer.is_valid(raise_exception=True)
+        return json_response(serializer.data)
+    except Exception as e:
+        return json_response(
+            {'error': f'Error processing aggregation: {str(e)}'},
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -0,0 +1,224 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from pymongo import ASCENDING
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .utils.mongo import MongoConnection, naive_utc
+
+USER_VERSION_COLLECTION = 'libros_user_version'
+# Índices de la colección de versiones: (claves, opciones)
+USER_VERSION_INDEXES = [
+    ([('changed_at', ASCENDING)], {}),
+]
+# Margen para las diferencias de reloj entre servidores y las cargas de
+# usuarios que coinciden con un cambio
+USER_CHANGE_MARGIN = timedelta(minutes=1)
+
+
+def bump_user_version(user_id):
+    """
+    Registra un cambio en un usuario, invalidando su entrada en todos los workers.
+
+    Args:
+        user_id: Identificador del usuario
+    """
+    collection = MongoConnection().get_collection(USER_VERSION_COLLECTION)
+    collection.update_one(
+        {'_id': user_id}, {'$inc': {'version': 1}, '$set': {'changed_at': naive_utc()}}, upsert=True
+    )
+
+
+def changed_users(since):
+    """
+    Obtiene los usuarios modificados desde una fecha.
+
+    Args:
+        since: Fecha en UTC sin zona horaria
+
+    Returns:
+        list: Pares (id del usuario, fecha del último cambio)
+    """
+    collection = MongoConnection().get_collection(USER_VERSION_COLLECTION)
+    documents = collection.find({'changed_at': {'$gte': since}}, {'changed_at': 1})
+    return [(document['_id'], document['changed_at']) for document in documents]
+
+
+class UserCache:
+    """
+    Caché LRU con expiración de los usuarios autenticados en este worker.
+
+    Los usuarios se guardan por su id, por lo que todos los tokens de un
+    mismo usuario comparten la entrada, junto con la fecha en que se
+    cargaron. Cada consulta devuelve una copia para que los cambios hechos
+    durante una petición no lleguen a otras.
+
+    Los cambios hechos en otros workers se consultan a lo sumo cada
+    check_interval segundos (ver check_changes), no en cada petición.
+    """
+
+    def __init__(self, max_entries, timeout, check_interval):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Cambios vistos en la última consulta, para no guardar usuarios
+        # cargados antes de ellos
+        self.changed = {}
+        self.checked_at = naive_utc()
+        self.next_check = 0.0
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Obtiene un usuario vigente de la caché.
+
+        Args:
+            user_id: Identificador del usuario
+
+        Returns:
+            User: Copia del usuario, o None si no está o expiró
+        """
+        with self._lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return copy.copy(entry[2])
+            if entry is not None:
+                del self.entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, user, loaded_at):
+        """
+        Guarda un usuario, descartando el usado hace más tiempo si la caché está llena.
+
+        No se guarda si se sabe que el usuario cambió mientras se cargaba.
+
+        Args:
+            user_id: Identificador del usuario
+            user: Usuario cargado
+            loaded_at: Fecha en UTC anterior a la carga
+        """
+        with self._lock:
+            changed_at = self.changed.get(user_id)
+            if changed_at is not None and loaded_at <= changed_at + USER_CHANGE_MARGIN:
+                return
+            self.entries[user_id] = (time.monotonic() + self.timeout, loaded_at, copy.copy(user))
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def apply_changes(self, changes):
+        """
+        Descarta las entradas cargadas antes de un cambio del usuario.
+
+        Args:
+            changes: Pares (id del usuario, fecha del cambio)
+        """
+        with self._lock:
+            self.changed = dict(changes)
+            for user_id, changed_at in self.changed.items():
+                entry = self.entries.get(user_id)
+                if entry is not None and entry[1] <= changed_at + USER_CHANGE_MARGIN:
+                    del self.entries[user_id]
+
+    def check_changes(self, force=False):
+        """
+        Aplica los cambios de usuarios hechos en otros workers.
+
+        Consulta MongoDB si pasaron check_interval segundos desde la última
+        vez; mientras un hilo consulta, los demás siguen sin esperar.
+
+        Args:
+            force: Consultar aunque no haya pasado el intervalo
+        """
+        if not force and time.monotonic() < self.next_check:
+            return
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            started = naive_utc()
+            self.apply_changes(changed_users(self.checked_at - USER_CHANGE_MARGIN))
+            self.checked_at = started
+            self.next_check = time.monotonic() + self.check_interval
+        finally:
+            self._check_lock.release()
+
+    def invalidate(self, user_id):
+        """
+        Descarta la entrada de un usuario.
+        """
+        with self._lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Obtiene las estadísticas de uso de la caché en este worker.
+
+        Returns:
+            dict: Usuarios en caché, aciertos, fallos y tasa de aciertos
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# La expiración nunca supera la vigencia de un token de acceso; los cambios
+# hechos en otros workers se detectan antes, cada
+# AUTH_USER_CACHE_CHECK_INTERVAL segundos.
+user_cache = UserCache(
+    settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    min(settings.AUTH_USER_CACHE_TIMEOUT, api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    settings.AUTH_USER_CACHE_CHECK_INTERVAL
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que evita consultar el usuario en MongoDB en cada petición.
+
+    El token se valida siempre; solo la carga del usuario se resuelve con
+    user_cache. Los usuarios inactivos o inexistentes no se guardan.
+
+    Los cambios del usuario en este worker lo invalidan al momento (ver
+    signals.invalidate_cached_user); los de otros workers, cuando este
+    consulta los cambios recientes, a lo sumo cada
+    AUTH_USER_CACHE_CHECK_INTERVAL segundos. Un acierto no consulta MongoDB.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user_cache.check_changes()
+        user = user_cache.get(user_id)
+        if user is None:
+            # La fecha se toma antes de cargar el usuario: si cambia
+            # mientras tanto, la entrada se descarta en la próxima consulta
+            loaded_at = naive_utc()
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user, loaded_at)
+        return user
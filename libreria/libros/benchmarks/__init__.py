@@ -0,0 +1,225 @@
+"""
+Utilidades comunes para los benchmarks de rendimiento de la API.
+
+Los benchmarks generan datos en la base de datos configurada, por lo que
+solo se ejecutan contra bases cuyo nombre termina en '_bench'
+(variable de entorno MONGO_DB_NAME).
+"""
+import math
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.utils import timezone
+from faker import Faker
+
+from ..management.commands.seed_books import generate_books
+from ..utils.mongo import MongoConnection, book_document, reserve_ids
+
+BENCHMARK_DB_SUFFIX = '_bench'
+
+BENCHMARKS = {
+    'auth': 'libros.benchmarks.auth',
+    'bulk': 'libros.benchmarks.bulk',
+    'reads': 'libros.benchmarks.reads',
+    'rendering': 'libros.benchmarks.rendering',
+    'search': 'libros.benchmarks.search',
+    'serialization': 'libros.benchmarks.serialization',
+    'startup': 'libros.benchmarks.startup',
+    'stats': 'libros.benchmarks.stats',
+    'suggest': 'libros.benchmarks.suggest',
+    'suite': 'libros.benchmarks.suite',
+}
+
+
+def check_benchmark_database():
+    """
+    Verifica que la base de datos configurada sea una base de benchmarks.
+
+    Raises:
+        CommandError: Si el nombre de la base no termina en '_bench'
+    """
+    name = settings.DATABASES['default']['NAME']
+    if not name.endswith(BENCHMARK_DB_SUFFIX):
+        raise CommandError(
+            f'Los benchmarks modifican los datos; configure MONGO_DB_NAME '
+            f'con una base terminada en "{BENCHMARK_DB_SUFFIX}" (actual: "{name}")'
+        )
+
+
+def ensure_dataset(size, seed=42, batch_size=5000):
+    """
+    Garantiza que la colección de libros contenga un dataset determinista.
+
+    Si la colección ya tiene la cantidad de libros pedida se reutiliza;
+    en caso contrario se vacía y se genera de nuevo con la misma lógica
+    del comando seed_books.
+
+    Args:
+        size: Cantidad de libros del dataset
+        seed: Semilla para que los datos sean reproducibles
+        batch_size: Cantidad de documentos insertados por lote
+
+    Returns:
+        bool: True si el dataset fue generado de nuevo
+    """
+    check_benchmark_database()
+    db = MongoConnection().db
+    books = db['libros_book']
+    if books.estimated_document_count() == size:
+        return False
+
+    books.delete_many({})
+    fake = Faker('es_ES')
+    fake.seed_instance(seed)
+    ids = iter(reserve_ids(db, 'libros_book', size))
+
+    batch = []
+    for values in generate_books(fake, size, random.Random(seed)):
+        batch.append(book_document(values, next(ids)))
+        if len(batch) == batch_size:
+            books.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        books.insert_many(batch, ordered=False)
+    return True
+
+
+def measure(func, repeat, warmup=1):
+    """
+    Mide la duración de varias ejecuciones de una función.
+
+    Args:
+        func: Función sin argumentos a medir
+        repeat: Cantidad de ejecuciones medidas
+        warmup: Ejecuciones previas que no se miden
+
+    Returns:
+        list: Duraciones en milisegundos
+    """
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(values, pct):
+    """
+    Calcula un percentil por el método del rango más cercano.
+
+    Args:
+        values: Valores a evaluar
+        pct: Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(durations):
+    """
+    Resume una serie de duraciones.
+
+    Args:
+        durations: Duraciones en milisegundos
+
+    Returns:
+        dict: Cantidad de ejecuciones, media y percentiles 50, 95 y 99
+    """
+    return {
+        'runs': len(durations),
+        'mean_ms': round(statistics.mean(durations), 3),
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p95_ms': round(percentile(durations, 95), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+    }
+
+
+def git_revision():
+    """
+    Obtiene el commit del código medido.
+
+    Returns:
+        dict: Hash del commit y si hay cambios sin confirmar, o None si
+        el código no está en un repositorio de git
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {'commit': commit, 'dirty': bool(status.strip())}
+
+
+def build_report(name, runs):
+    """
+    Construye el informe de un benchmark para guardarlo y compararlo.
+
+    Args:
+        name: Nombre del benchmark
+        runs: Resultados de cada ejecución (una por tamaño de dataset)
+
+    Returns:
+        dict: Resultados junto con el commit y el entorno de la medición
+    """
+    return {
+        'benchmark': name,
+        'created_at': timezone.now().isoformat(),
+        'revision': git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'machine': platform.machine(),
+        },
+        'runs': runs,
+    }
+
+
+def compare_reports(baseline, report):
+    """
+    Compara el p50 de cada caso con el de un informe anterior.
+
+    Solo se comparan los casos con el mismo tamaño de dataset y un
+    resumen de latencias directo (con 'p50_ms'), como los de la suite.
+
+    Args:
+        baseline: Informe de referencia
+        report: Informe actual
+
+    Returns:
+        list: Tamaño, caso, p50 de ambos informes y su cociente (actual / referencia)
+    """
+    previous = {run.get('size'): run['results'] for run in baseline['runs']}
+    comparison = []
+    for run in report['runs']:
+        for case, summary in run['results'].items():
+            before = previous.get(run.get('size'), {}).get(case)
+            if not isinstance(summary, dict) or not isinstance(before, dict) or 'p50_ms' not in summary:
+                continue
+            comparison.append({
+                'size': run.get('size'),
+                'case': case,
+                'baseline_p50_ms': before['p50_ms'],
+                'p50_ms': summary['p50_ms'],
+                'ratio': round(summary['p50_ms'] / max(before['p50_ms'], 0.001), 3),
+            })
+    return comparison
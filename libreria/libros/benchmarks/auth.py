@@ -0,0 +1,61 @@
+"""
+Benchmark de la latencia por petición con JWTAuthentication contra
+CachedJWTAuthentication, que evita cargar el usuario desde MongoDB.
+"""
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..authentication import CachedJWTAuthentication, user_cache
+from ..utils.mongo import MongoConnection
+from ..views import BookViewSet
+from . import ensure_dataset, measure, summarize
+
+
+def run(size, repeat):
+    """
+    Compara la latencia del detalle y el listado de libros autenticando
+    con y sin la caché de usuarios.
+
+    Args:
+        size: Cantidad de libros del dataset
+        repeat: Ejecuciones medidas por caso y modo
+
+    Returns:
+        dict: Resumen de latencias por caso y modo, y la tasa de aciertos de la caché
+    """
+    ensure_dataset(size)
+    user, _ = User.objects.get_or_create(username='benchmark')
+    header = f'Bearer {AccessToken.for_user(user)}'
+    books = MongoConnection().get_collection('libros_book')
+    book_id = books.find_one({}, {'id': 1}, sort=[('created_at', -1)])['id']
+
+    factory = APIRequestFactory()
+    cases = {
+        'authenticate_only': (None, '/api/books/', {}),
+        'retrieve': ('retrieve', f'/api/books/{book_id}/', {'pk': str(book_id)}),
+        'list_first_page': ('list', '/api/books/', {}),
+    }
+
+    results = {}
+    for label, (action, path, kwargs) in cases.items():
+        results[label] = {}
+        for mode, authentication in (('jwt', JWTAuthentication), ('cached', CachedJWTAuthentication)):
+            user_cache.clear()
+            if action is None:
+                def call():
+                    authentication().authenticate(factory.get(path, HTTP_AUTHORIZATION=header))
+            else:
+                view = BookViewSet.as_view({'get': action}, authentication_classes=[authentication])
+
+                def call():
+                    view(factory.get(path, HTTP_AUTHORIZATION=header), **kwargs).render()
+
+            results[label][mode] = summarize(measure(call, repeat))
+
+        results[label]['saved_p50_ms'] = round(
+            results[label]['jwt']['p50_ms'] - results[label]['cached']['p50_ms'], 3
+        )
+
+    return {'benchmark': 'auth', 'size': size, 'results': results, 'user_cache': user_cache.stats()}
@@ -0,0 +1,111 @@
+"""
+Benchmark de escritura: una petición por libro contra los endpoints en lote.
+"""
+import time
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..views import BookViewSet
+from ..utils.mongo import MongoConnection
+from . import ensure_dataset
+
+BATCH_SIZE = 500
+SINGLE_SAMPLE = 100
+
+PAYLOAD = {
+    'title': 'Benchmark de escritura',
+    'author': 'Jorge Luis Borges',
+    'published_date': '2001-01-01',
+    'genre': 'FIC',
+    'price': '19.99',
+}
+
+create_view = BookViewSet.as_view({'post': 'create'})
+update_view = BookViewSet.as_view({'patch': 'partial_update'})
+bulk_view = BookViewSet.as_view({'post': 'bulk', 'patch': 'bulk', 'delete': 'bulk'})
+
+
+def books_per_second(count, func, repeat):
+    """
+    Mide el rendimiento medio de una función que escribe varios libros.
+
+    Args:
+        count: Cantidad de libros escritos en cada ejecución
+        func: Función sin argumentos que realiza la escritura
+        repeat: Cantidad de ejecuciones medidas
+
+    Returns:
+        float: Libros escritos por segundo
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round(count * repeat / (time.perf_counter() - start), 1)
+
+
+def run(size, repeat):
+    """
+    Compara los libros por segundo de las escrituras individuales y en lote.
+
+    Args:
+        size: Cantidad de libros del dataset
+        repeat: Ejecuciones medidas por caso
+
+    Returns:
+        dict: Libros por segundo por operación y modo
+    """
+    ensure_dataset(size)
+    books = MongoConnection().get_collection('libros_book')
+    ids = [document['id'] for document in books.find({}, {'id': 1}).limit(BATCH_SIZE)]
+
+    factory = APIRequestFactory()
+    user = User(username='benchmark')
+    created = []
+
+    def request(view, method, path, data, **kwargs):
+        request = getattr(factory, method)(path, data, format='json')
+        force_authenticate(request, user)
+        return view(request, **kwargs)
+
+    def single_create():
+        for _ in range(SINGLE_SAMPLE):
+            created.append(request(create_view, 'post', '/api/books/', PAYLOAD).data['id'])
+
+    def bulk_create():
+        response = request(bulk_view, 'post', '/api/books/bulk/', [PAYLOAD] * BATCH_SIZE)
+        created.extend(result['id'] for result in response.data['results'])
+
+    def single_update():
+        for book_id in ids[:SINGLE_SAMPLE]:
+            request(update_view, 'patch', f'/api/books/{book_id}/', {'price': '21.50'}, pk=str(book_id))
+
+    def bulk_update():
+        request(bulk_view, 'patch', '/api/books/bulk/', [{'id': book_id, 'price': '21.50'} for book_id in ids])
+
+    try:
+        results = {
+            'create': {
+                'single': books_per_second(SINGLE_SAMPLE, single_create, repeat),
+                'bulk': books_per_second(BATCH_SIZE, bulk_create, repeat),
+            },
+            'update': {
+                'single': books_per_second(SINGLE_SAMPLE, single_update, repeat),
+                'bulk': books_per_second(len(ids), bulk_update, repeat),
+            },
+        }
+    finally:
+        # Los libros creados se eliminan para conservar el dataset
+        for start in range(0, len(created), BATCH_SIZE):
+            request(bulk_view, 'delete', '/api/books/bulk/', {'ids': created[start:start + BATCH_SIZE]})
+
+    for operation in results.values():
+        operation['speedup'] = round(operation['bulk'] / max(operation['single'], 0.001), 2)
+
+    return {
+        'benchmark': 'bulk',
+        'size': size,
+        'batch_size': BATCH_SIZE,
+        'unit': 'books_per_second',
+        'results': results,
+    }
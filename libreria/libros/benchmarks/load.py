@@ -0,0 +1,89 @@
+"""
+Prueba de carga HTTP contra un despliegue en ejecución.
+
+Lanza peticiones concurrentes a una URL con distintos niveles de
+concurrencia para comparar, por ejemplo, la búsqueda servida con WSGI
+(/api/books/search/) y la asíncrona servida con ASGI
+(/api/async/books/search/).
+"""
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from . import summarize
+
+
+def timed_request(url, token, timeout):
+    """
+    Realiza una petición GET y mide su duración.
+
+    Returns:
+        tuple: Duración en milisegundos y si la respuesta fue exitosa
+    """
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+def run_level(url, token, concurrency, requests, timeout=30):
+    """
+    Ejecuta una cantidad de peticiones con una concurrencia fija.
+
+    Args:
+        url: URL a probar
+        token: Token JWT de acceso
+        concurrency: Peticiones simultáneas
+        requests: Total de peticiones
+        timeout: Tiempo máximo de cada petición en segundos
+
+    Returns:
+        dict: Latencias, peticiones por segundo y cantidad de errores
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: timed_request(url, token, timeout), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    durations = [duration for duration, _ in results]
+    return {
+        'concurrency': concurrency,
+        **summarize(durations),
+        'requests_per_second': round(requests / elapsed, 1),
+        'errors': sum(1 for _, ok in results if not ok),
+    }
+
+
+def run(targets, token, levels, requests, slo_ms):
+    """
+    Ejecuta la prueba de carga sobre cada destino.
+
+    La capacidad de un destino es la mayor concurrencia probada sin
+    errores y con un p99 dentro de slo_ms.
+
+    Args:
+        targets: Diccionario nombre → URL
+        token: Token JWT de acceso
+        levels: Niveles de concurrencia a probar
+        requests: Peticiones por nivel
+        slo_ms: p99 máximo aceptable en milisegundos
+
+    Returns:
+        dict: Resultados por destino y nivel de concurrencia
+    """
+    results = {}
+    for name, url in targets.items():
+        runs = [run_level(url, token, concurrency, requests) for concurrency in levels]
+        within_slo = [r['concurrency'] for r in runs if not r['errors'] and r['p99_ms'] <= slo_ms]
+        results[name] = {
+            'url': url,
+            'capacity': max(within_slo, default=0),
+            'levels': runs,
+        }
+    return {'benchmark': 'load', 'requests_per_level': requests, 'slo_p99_ms': slo_ms, 'results': results}
@@ -0,0 +1,58 @@
+"""
+Benchmark de las lecturas del listado y el detalle de libros: ORM de
+djongo contra las consultas nativas con pymongo.
+"""
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..utils.mongo import MongoConnection
+from ..views import BookViewSet
+from . import ensure_dataset, measure, summarize
+
+list_view = BookViewSet.as_view({'get': 'list'})
+detail_view = BookViewSet.as_view({'get': 'retrieve'})
+
+
+def run(size, repeat):
+    """
+    Compara la latencia de las vistas de lectura con y sin BOOKS_NATIVE_READS.
+
+    Args:
+        size: Cantidad de libros del dataset
+        repeat: Ejecuciones medidas por caso y modo
+
+    Returns:
+        dict: Resumen de latencias por caso y modo
+    """
+    ensure_dataset(size)
+    books = MongoConnection().get_collection('libros_book')
+    book_id = books.find_one({}, {'id': 1}, sort=[('created_at', -1)])['id']
+
+    factory = APIRequestFactory()
+    user = User(username='benchmark')
+    cases = {
+        'list_first_page': (list_view, '/api/books/', {}, {}),
+        'list_deep_page': (list_view, '/api/books/', {'page': max(size // 20, 1)}, {}),
+        'list_genre': (list_view, '/api/books/', {'genre': 'PRO'}, {}),
+        'retrieve': (detail_view, f'/api/books/{book_id}/', {}, {'pk': str(book_id)}),
+    }
+
+    results = {}
+    for label, (view, path, params, kwargs) in cases.items():
+        def call():
+            request = factory.get(path, params)
+            force_authenticate(request, user)
+            response = view(request, **kwargs)
+            response.render()
+
+        results[label] = {}
+        for mode, native in (('orm', False), ('native', True)):
+            with override_settings(BOOKS_NATIVE_READS=native):
+                results[label][mode] = summarize(measure(call, repeat))
+
+        results[label]['speedup_p50'] = round(
+            results[label]['orm']['p50_ms'] / max(results[label]['native']['p50_ms'], 0.001), 2
+        )
+
+    return {'benchmark': 'reads', 'size': size, 'results': results}
@@ -0,0 +1,106 @@
+"""
+Benchmark del renderizado JSON de las respuestas grandes: JSONRenderer
+de DRF contra ORJSONRenderer.
+
+Las respuestas se construyen en memoria con la misma forma que las de
+la búsqueda y las estadísticas, por lo que no necesita datos en la base.
+"""
+import random
+from datetime import date
+
+from bson import Decimal128, ObjectId
+from faker import Faker
+from rest_framework.renderers import JSONRenderer
+
+from ..management.commands.seed_books import generate_books
+from ..renderers import ORJSONRenderer
+from ..serializers import BookStatsSerializer
+from ..stats import STATS_MAX_PAGE_SIZE
+from ..utils.mongo import book_document
+from . import measure, summarize
+
+
+def stringify(page):
+    """
+    Convierte a texto los ObjectId y Decimal128 de una página de búsqueda,
+    como hacía la búsqueda antes de ORJSONRenderer.
+    """
+    return {
+        **page,
+        'results': [
+            {**result, '_id': str(result['_id']), 'price': str(result['price'])}
+            for result in page['results']
+        ],
+    }
+
+
+def search_payload(size, seed=42):
+    """
+    Construye una página de búsqueda como la que devuelve la agregación.
+    """
+    fake = Faker('es_ES')
+    fake.seed_instance(seed)
+    documents = [
+        {'_id': ObjectId(), **book_document(values, book_id), 'score': 3}
+        for book_id, values in enumerate(generate_books(fake, size, random.Random(seed)), start=1)
+    ]
+    return {'links': {'next': None, 'previous': None}, 'total_pages': 1, 'count': size, 'results': documents}
+
+
+def stats_payload(size, seed=42):
+    """
+    Construye una respuesta de estadísticas con size libros.
+    """
+    fake = Faker('es_ES')
+    fake.seed_instance(seed)
+    books = [
+        {'title': values['title'], 'author': values['author'], 'price': Decimal128(values['price'])}
+        for values in generate_books(fake, size, random.Random(seed))
+    ]
+    serializer = BookStatsSerializer(data={
+        'year': date.today().year,
+        'average_price': '75.50',
+        'min_price': '10.00',
+        'max_price': '150.00',
+        'total_books': size,
+        'page': 1,
+        'top': size,
+        'total_pages': 1,
+        'books': [{**book, 'price': str(book['price'])} for book in books],
+    })
+    serializer.is_valid(raise_exception=True)
+    return serializer.data
+
+
+def run(size, repeat):
+    """
+    Compara el tiempo de renderizado de ambos renderers y verifica que
+    produzcan los mismos bytes. En la búsqueda, el tiempo de DRF incluye
+    la conversión previa de los resultados a texto.
+
+    Args:
+        size: Libros por respuesta (la de estadísticas se limita a su máximo por página)
+        repeat: Ejecuciones medidas por caso y renderer
+
+    Returns:
+        dict: Resumen de latencias por caso y renderer
+    """
+    drf, fast = JSONRenderer(), ORJSONRenderer()
+    search, stats = search_payload(size), stats_payload(min(size, STATS_MAX_PAGE_SIZE))
+    cases = {
+        'search_page': (lambda: drf.render(stringify(search)), lambda: fast.render(search)),
+        'stats_page': (lambda: drf.render(stats), lambda: fast.render(stats)),
+    }
+
+    results = {}
+    for label, (drf_render, fast_render) in cases.items():
+        results[label] = {
+            'identical': drf_render() == fast_render(),
+            'drf': summarize(measure(drf_render, repeat)),
+            'orjson': summarize(measure(fast_render, repeat)),
+        }
+        results[label]['speedup_p50'] = round(
+            results[label]['drf']['p50_ms'] / max(results[label]['orjson']['p50_ms'], 0.001), 2
+        )
+
+    return {'benchmark': 'rendering', 'size': size, 'results': results}
@@ -0,0 +1,67 @@
+"""
+Benchmark de la búsqueda: pipeline de expresiones regulares contra el
+índice invertido, y la búsqueda difusa sobre el índice de trigramas.
+"""
+from ..fuzzy import TrigramIndex, get_fuzzy_plan
+from ..pagination import Pagination
+from ..search import BookSearchIndex, RegexBookSearch
+from . import ensure_dataset, measure, summarize
+
+TERMS = {
+    'narrow': 'Borges',
+    'phrase': 'García Márquez',
+    'broad': 'Virtual',
+    'typo': 'Garcia Marqez',
+}
+
+
+def run(size, repeat):
+    """
+    Compara la latencia de la primera página de búsqueda en ambos motores.
+
+    La búsqueda difusa incluye la agregación que obtiene los términos
+    parecidos, por lo que se mide construyendo el plan en cada ejecución.
+
+    Args:
+        size: Cantidad de libros del dataset
+        repeat: Ejecuciones medidas por término y motor
+
+    Returns:
+        dict: Resumen de latencias por término y motor
+    """
+    index = BookSearchIndex()
+    trigram = TrigramIndex()
+    if ensure_dataset(size) or not index.postings.estimated_document_count():
+        index.rebuild()
+        trigram.rebuild()
+    elif not trigram.trigrams.estimated_document_count():
+        trigram.rebuild()
+
+    engines = {'regex': RegexBookSearch(), 'index': index}
+    pagination = Pagination()
+    results = {}
+
+    def first_page(plan):
+        pipeline = [
+            *plan.pipeline,
+            pagination.get_facet_stage(1, pagination.page_size, plan.ranking, plan.lookup)
+        ]
+        return list(plan.collection.aggregate(pipeline))
+
+    for label, term in TERMS.items():
+        results[label] = {'term': term}
+        for name, engine in engines.items():
+            plan = engine.plan(term)
+            durations = measure(lambda: first_page(plan), repeat)
+            results[label][name] = summarize(durations)
+        durations = measure(lambda: first_page(get_fuzzy_plan(term)), repeat)
+        results[label]['fuzzy'] = summarize(durations)
+
+        results[label]['speedup_p50'] = round(
+            results[label]['regex']['p50_ms'] / max(results[label]['index']['p50_ms'], 0.001), 2
+        )
+        results[label]['fuzzy_ratio_p50'] = round(
+            results[label]['fuzzy']['p50_ms'] / max(results[label]['index']['p50_ms'], 0.001), 2
+        )
+
+    return {'benchmark': 'search', 'size': size, 'results': results}
@@ -0,0 +1,67 @@
+"""
+Benchmark de la serialización de una página del listado de libros:
+BookSerializer campo a campo contra BookListSerializer.
+
+Solo mide la conversión a la representación de la API, con libros en
+memoria, por lo que no necesita datos en la base.
+"""
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+from faker import Faker
+from rest_framework.serializers import ListSerializer
+
+from ..management.commands.seed_books import generate_books
+from ..models import Book
+from ..pagination import Pagination
+from ..serializers import BookSerializer
+from . import measure, summarize
+
+PAGE_SIZES = (Pagination.page_size, Pagination.max_page_size)
+
+
+def make_books(count, seed=42):
+    """
+    Crea libros en memoria como los que devuelve una consulta del ORM.
+    """
+    fake = Faker('es_ES')
+    fake.seed_instance(seed)
+    now = timezone.now()
+    return [
+        Book(id=book_id, created_at=now - timedelta(seconds=book_id), updated_at=now, **values)
+        for book_id, values in enumerate(generate_books(fake, count, random.Random(seed)), start=1)
+    ]
+
+
+def run(size, repeat):
+    """
+    Compara el tiempo de serialización por página con y sin BookListSerializer.
+
+    Args:
+        size: No se usa; las páginas tienen los tamaños del listado
+        repeat: Ejecuciones medidas por caso y modo
+
+    Returns:
+        dict: Resumen de latencias por tamaño de página, modo y tipo de fila
+    """
+    books = make_books(max(PAGE_SIZES))
+    fields = BookSerializer.Meta.fields
+
+    results = {}
+    for page_size in PAGE_SIZES:
+        page = books[:page_size]
+        rows = [tuple(book.__dict__[name] for name in fields) for book in page]
+        modes = {
+            'model_serializer': lambda: ListSerializer(page, child=BookSerializer()).data,
+            'fast_instances': lambda: BookSerializer(page, many=True).data,
+            'fast_values_list': lambda: BookSerializer(rows, many=True).data,
+        }
+
+        label = f'page_size_{page_size}'
+        results[label] = {mode: summarize(measure(func, repeat)) for mode, func in modes.items()}
+        results[label]['speedup_p50'] = round(
+            results[label]['model_serializer']['p50_ms'] / max(results[label]['fast_instances']['p50_ms'], 0.001), 2
+        )
+
+    return {'benchmark': 'serialization', 'results': results}
@@ -0,0 +1,88 @@
+"""
+Benchmark del arranque de un worker: importación de la aplicación y
+primera petición, con el esquema OpenAPI generado por drf_spectacular
+contra el esquema precalculado (API_SCHEMA_STATIC).
+
+Cada medición se hace en un proceso nuevo, como un worker recién
+creado, y no necesita datos en la base.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+
+from . import summarize
+
+WORKER_SCRIPT = '''
+import json, os, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+ready = time.perf_counter()
+from django.test import Client
+client = Client()
+timings = {'startup_ms': (ready - start) * 1000}
+for label, path in (('first_schema_ms', '/schema/'), ('first_api_ms', '/api/books/')):
+    begin = time.perf_counter()
+    client.get(path)
+    timings[label] = (time.perf_counter() - begin) * 1000
+print(json.dumps(timings))
+'''
+
+
+def measure_worker(static, schema_file):
+    """
+    Arranca un proceso de Python y mide su inicio y sus primeras peticiones.
+
+    Args:
+        static: Si se activa API_SCHEMA_STATIC
+        schema_file: Esquema precalculado usado en el modo estático
+
+    Returns:
+        dict: Duraciones en milisegundos del arranque y de las primeras
+        peticiones al esquema y a la API
+    """
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'libreria.settings'),
+        'API_SCHEMA_STATIC': 'yes' if static else 'NO',
+        'API_SCHEMA_FILE': schema_file,
+    }
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(size, repeat):
+    """
+    Compara el arranque de los workers con y sin el esquema precalculado.
+
+    Args:
+        size: No se usa; el benchmark no depende del dataset
+        repeat: Procesos medidos por modo
+
+    Returns:
+        dict: Resumen de latencias por medición y modo
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        schema_file = os.path.join(directory, 'schema.yml')
+        call_command('spectacular', file=schema_file)
+
+        samples = {}
+        for mode, static in (('dynamic', False), ('static', True)):
+            runs = [measure_worker(static, schema_file) for _ in range(repeat)]
+            for label in runs[0]:
+                samples.setdefault(label, {})[mode] = summarize([timings[label] for timings in runs])
+
+    for label, modes in samples.items():
+        modes['speedup_p50'] = round(modes['dynamic']['p50_ms'] / max(modes['static']['p50_ms'], 0.001), 2)
+
+    return {'benchmark': 'startup', 'results': samples}
@@ -0,0 +1,80 @@
+"""
+Benchmark de las estadísticas por año: pipeline anterior (ordenamiento
+de la colección completa, filtro con $year y $push de todos los libros)
+contra el filtro por rango de published_date con la primera página.
+"""
+from datetime import date
+
+from ..stats import book_stats_pipeline
+from ..utils.mongo import MongoConnection
+from . import ensure_dataset, measure, summarize
+
+
+def legacy_book_stats_pipeline(year):
+    """
+    Pipeline de estadísticas anterior, conservado como referencia.
+
+    Args:
+        year: Año de publicación
+
+    Returns:
+        list: Etapas del pipeline de agregación
+    """
+    return [
+        {'$sort': {'price': -1}},
+        {'$match': {'$expr': {'$eq': [{'$year': '$published_date'}, year]}}},
+        {
+            '$group': {
+                '_id': None,
+                'average_price': {'$avg': '$price'},
+                'min_price': {'$min': '$price'},
+                'max_price': {'$max': '$price'},
+                'total_books': {'$sum': 1},
+                'books': {'$push': {'title': '$title', 'author': '$author', 'price': '$price'}}
+            }
+        },
+        {
+            '$project': {
+                '_id': 0,
+                'year': {'$literal': year},
+                'average_price': {'$round': ['$average_price', 2]},
+                'min_price': 1,
+                'max_price': 1,
+                'total_books': 1,
+                'books': 1
+            }
+        }
+    ]
+
+
+def run(size, repeat):
+    """
+    Compara la latencia de las estadísticas de varios años en ambos planes.
+
+    Args:
+        size: Cantidad de libros del dataset (por ejemplo 100000 o 1000000)
+        repeat: Ejecuciones medidas por año y plan
+
+    Returns:
+        dict: Resumen de latencias por año y plan
+    """
+    ensure_dataset(size)
+    collection = MongoConnection().get_collection('libros_book')
+    plans = {'legacy': legacy_book_stats_pipeline, 'range': book_stats_pipeline}
+
+    today = date.today()
+    results = {}
+    for year in (today.year - 40, today.year - 10, today.year):
+        results[year] = {}
+        for name, build in plans.items():
+            pipeline = build(year)
+            durations = measure(
+                lambda: list(collection.aggregate(pipeline, allowDiskUse=True)), repeat
+            )
+            results[year][name] = summarize(durations)
+
+        results[year]['speedup_p50'] = round(
+            results[year]['legacy']['p50_ms'] / max(results[year]['range']['p50_ms'], 0.001), 2
+        )
+
+    return {'benchmark': 'stats', 'size': size, 'results': results}
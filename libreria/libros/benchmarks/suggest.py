@@ -0,0 +1,70 @@
+"""
+Benchmark del autocompletado: construcción y memoria del índice de
+prefijos y latencia de las sugerencias, directamente y a través del
+endpoint.
+"""
+import time
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..suggest import suggest_index
+from ..views import BookViewSet
+from . import ensure_dataset, measure, summarize
+
+PREFIX_LENGTHS = (1, 2, 3, 5)
+
+suggest_view = BookViewSet.as_view({'get': 'suggest'})
+
+
+def run(size, repeat):
+    """
+    Construye el índice de sugerencias y mide las consultas por longitud de prefijo.
+
+    Los prefijos se toman del término más frecuente, que es el que más
+    términos comparte con sus prefijos cortos.
+
+    Args:
+        size: Cantidad de libros del dataset
+        repeat: Ejecuciones medidas por caso
+
+    Returns:
+        dict: Tiempo de construcción, memoria (total y por millón de
+        libros) y resumen de latencias por caso
+    """
+    ensure_dataset(size)
+    suggest_index.invalidate()
+    start = time.perf_counter()
+    suggest_index.ensure_built()
+    build_ms = (time.perf_counter() - start) * 1000
+    stats = suggest_index.stats()
+
+    index = suggest_index.index
+    term = index.terms[max(range(len(index.terms)), key=index.counts.__getitem__)]
+    results = {}
+    for length in PREFIX_LENGTHS:
+        prefix = term[:length]
+        results[f'prefix_{length}'] = {
+            'prefix': prefix,
+            **summarize(measure(lambda: suggest_index.suggest(prefix), repeat)),
+        }
+
+    factory = APIRequestFactory()
+    user = User(username='benchmark')
+
+    def call():
+        request = factory.get('/api/books/suggest/', {'prefix': term[:3]})
+        force_authenticate(request, user)
+        return suggest_view(request).render()
+
+    results['endpoint'] = summarize(measure(call, repeat))
+
+    return {
+        'benchmark': 'suggest',
+        'size': size,
+        'build_ms': round(build_ms, 1),
+        'terms': stats['terms'],
+        'memory_mb': round(stats['memory_bytes'] / 2 ** 20, 2),
+        'memory_mb_per_million_books': round(stats['memory_bytes'] / 2 ** 20 / size * 1_000_000, 1),
+        'results': results,
+    }
@@ -0,0 +1,126 @@
+"""
+Suite de benchmarks de las rutas más usadas de la API.
+
+Mide las vistas completas (autenticación forzada, consulta, serialización
+y renderizado) del listado en páginas cercanas y lejanas, la búsqueda con
+términos amplios y específicos, el detalle y las estadísticas. La caché
+de respuestas se desactiva para medir siempre el trabajo real.
+"""
+import resource
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..pagination import Pagination
+from ..search import BookSearchIndex
+from ..utils.mongo import MongoConnection
+from ..views import BookStatsView, BookViewSet
+from . import ensure_dataset, summarize
+from .search import TERMS
+
+NO_RESPONSE_CACHE = {
+    **settings.CACHES,
+    'books': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+list_view = BookViewSet.as_view({'get': 'list'})
+detail_view = BookViewSet.as_view({'get': 'retrieve'})
+search_view = BookViewSet.as_view({'get': 'search'})
+stats_view = BookStatsView.as_view()
+
+
+def peak_rss_mb():
+    """
+    Obtiene el máximo de memoria residente alcanzado por el proceso.
+
+    Returns:
+        float: Megabytes (ru_maxrss se expresa en kilobytes en Linux)
+    """
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def measure_view(call, repeat, warmup=1):
+    """
+    Mide las peticiones a una vista y su rendimiento secuencial.
+
+    Args:
+        call: Función sin argumentos que ejecuta una petición y devuelve la respuesta
+        repeat: Peticiones medidas
+        warmup: Peticiones previas que no se miden
+
+    Returns:
+        dict: Latencias, peticiones por segundo, códigos de estado y memoria máxima
+    """
+    for _ in range(warmup):
+        call()
+
+    durations = []
+    statuses = set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = call()
+        durations.append((time.perf_counter() - start) * 1000)
+        statuses.add(response.status_code)
+
+    return {
+        **summarize(durations),
+        'requests_per_second': round(len(durations) / (sum(durations) / 1000), 1),
+        'status_codes': sorted(statuses),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run(size, repeat):
+    """
+    Ejecuta todos los casos de la suite sobre un dataset de size libros.
+
+    Args:
+        size: Cantidad de libros del dataset
+        repeat: Peticiones medidas por caso
+
+    Returns:
+        dict: Resumen por caso, con el motor de búsqueda y el modo de
+        lectura usados
+    """
+    regenerated = ensure_dataset(size)
+    if settings.BOOK_SEARCH_ENGINE != 'regex':
+        index = BookSearchIndex()
+        if regenerated or not index.postings.estimated_document_count():
+            index.rebuild()
+
+    books = MongoConnection().get_collection('libros_book')
+    book_id = books.find_one({}, {'id': 1}, sort=[('created_at', -1)])['id']
+    deep_page = max(size // Pagination.page_size, 1)
+
+    factory = APIRequestFactory()
+    user = User(username='benchmark')
+    cases = {
+        'list_shallow': (list_view, '/api/books/', {}, {}),
+        'list_deep': (list_view, '/api/books/', {'page': deep_page}, {}),
+        'search_broad': (search_view, '/api/books/search/', {'q': TERMS['broad']}, {}),
+        'search_narrow': (search_view, '/api/books/search/', {'q': TERMS['narrow']}, {}),
+        'retrieve': (detail_view, f'/api/books/{book_id}/', {}, {'pk': str(book_id)}),
+        'stats': (stats_view, '/api/book_stats/', {'year': date.today().year - 10}, {}),
+    }
+
+    results = {}
+    with override_settings(CACHES=NO_RESPONSE_CACHE):
+        for label, (view, path, params, kwargs) in cases.items():
+            def call():
+                request = factory.get(path, params)
+                force_authenticate(request, user)
+                return view(request, **kwargs).render()
+
+            results[label] = measure_view(call, repeat)
+
+    return {
+        'benchmark': 'suite',
+        'size': size,
+        'search_engine': settings.BOOK_SEARCH_ENGINE,
+        'native_reads': settings.BOOKS_NATIVE_READS,
+        'results': results,
+    }
@@ -0,0 +1,227 @@
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .models import Book
+from .serializers import BookSerializer
+from .signals import books_changed
+from .utils.mongo import MongoConnection, book_document, book_fields, naive_utc, reserve_ids
+
+BULK_MAX_ITEMS = 1000
+NOT_FOUND_MESSAGE = 'No existe un libro con este id.'
+INVALID_ID_MESSAGE = 'Se requiere un id entero.'
+
+
+class BulkResult:
+    """
+    Resultado por elemento de una operación masiva.
+
+    Cada elemento se identifica por su posición en la petición, de modo
+    que el cliente puede relacionar resultados y errores con lo enviado.
+    """
+
+    def __init__(self):
+        self.results = []
+        self.errors = []
+
+    def success(self, index, book_id, status):
+        self.results.append({'index': index, 'id': book_id, 'status': status})
+
+    def error(self, index, errors):
+        self.errors.append({'index': index, 'errors': errors})
+
+    @property
+    def ids(self):
+        """
+        Identificadores de los libros escritos correctamente.
+        """
+        return [result['id'] for result in self.results]
+
+    def as_dict(self):
+        return {
+            'results': sorted(self.results, key=lambda result: result['index']),
+            'errors': sorted(self.errors, key=lambda error: error['index']),
+        }
+
+
+def parse_id(value):
+    """
+    Convierte el id recibido en un entero.
+
+    Args:
+        value: Valor enviado por el cliente
+
+    Returns:
+        int: Identificador, o None si no es un entero válido
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BookBulkWriter:
+    """
+    Escrituras masivas de libros con una única operación de MongoDB.
+
+    Los elementos se validan con BookSerializer y solo los válidos se
+    escriben, con un bulk_write no ordenado para que un fallo no detenga
+    al resto (o un único delete_many al eliminar).
+
+    Al terminar se notifica books_changed con los libros afectados, lo
+    que mantiene el índice de búsqueda y la caché al día.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else MongoConnection().db
+        self.books = self.db['libros_book']
+
+    def execute(self, operations, result):
+        """
+        Ejecuta las operaciones y registra los errores de escritura.
+
+        Args:
+            operations: Pares (índice del elemento, operación de pymongo)
+            result: BulkResult donde se registran los fallos
+
+        Returns:
+            set: Índices de los elementos que no se pudieron escribir
+        """
+        if not operations:
+            return set()
+
+        failed = set()
+        try:
+            self.books.bulk_write([operation for _, operation in operations], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details['writeErrors']:
+                index = operations[write_error['index']][0]
+                failed.add(index)
+                result.error(index, {'non_field_errors': [write_error['errmsg']]})
+        return failed
+
+    def existing_ids(self, ids):
+        """
+        Obtiene cuáles de los identificadores existen en la colección.
+        """
+        documents = self.books.find({'id': {'$in': list(ids)}}, {'_id': 0, 'id': 1})
+        return {document['id'] for document in documents}
+
+    def create(self, items):
+        """
+        Crea los libros válidos de la lista.
+
+        Args:
+            items: Datos de los libros a crear
+
+        Returns:
+            BulkResult: Libros creados y errores por elemento
+        """
+        result = BulkResult()
+        valid = []
+        for index, item in enumerate(items):
+            serializer = BookSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                result.error(index, serializer.errors)
+
+        if valid:
+            timestamp = naive_utc()
+            ids = reserve_ids(self.db, 'libros_book', len(valid))
+            operations = [
+                (index, InsertOne(book_document(values, book_id, timestamp)))
+                for (index, values), book_id in zip(valid, ids)
+            ]
+            failed = self.execute(operations, result)
+            for (index, _), book_id in zip(valid, ids):
+                if index not in failed:
+                    result.success(index, book_id, 'created')
+
+        if result.ids:
+            books_changed.send(sender=Book, ids=result.ids, deleted=False)
+        return result
+
+    def update(self, items):
+        """
+        Actualiza parcialmente los libros indicados por su id.
+
+        Args:
+            items: Datos parciales de los libros, cada uno con su 'id'
+
+        Returns:
+            BulkResult: Libros actualizados y errores por elemento
+        """
+        result = BulkResult()
+        valid = []
+        for index, item in enumerate(items):
+            book_id = parse_id(item.get('id')) if isinstance(item, dict) else None
+            if book_id is None:
+                result.error(index, {'id': [INVALID_ID_MESSAGE]})
+                continue
+
+            serializer = BookSerializer(data=item, partial=True)
+            if serializer.is_valid():
+                valid.append((index, book_id, serializer.validated_data))
+            else:
+                result.error(index, serializer.errors)
+
+        existing = self.existing_ids(book_id for _, book_id, _ in valid) if valid else set()
+        timestamp = naive_utc()
+        updated = []
+        operations = []
+        for index, book_id, values in valid:
+            if book_id not in existing:
+                result.error(index, {'id': [NOT_FOUND_MESSAGE]})
+                continue
+            updated.append((index, book_id))
+            operations.append((index, UpdateOne(
+                {'id': book_id},
+                {'$set': {**book_fields(values), 'updated_at': timestamp}}
+            )))
+
+        failed = self.execute(operations, result)
+        for index, book_id in updated:
+            if index not in failed:
+                result.success(index, book_id, 'updated')
+
+        if result.ids:
+            books_changed.send(sender=Book, ids=result.ids, deleted=False)
+        return result
+
+    def delete(self, ids):
+        """
+        Elimina los libros indicados.
+
+        Args:
+            ids: Identificadores de los libros a eliminar
+
+        Returns:
+            BulkResult: Libros eliminados y errores por elemento
+        """
+        result = BulkResult()
+        valid = []
+        for index, value in enumerate(ids):
+            book_id = parse_id(value)
+            if book_id is None:
+                result.error(index, {'id': [INVALID_ID_MESSAGE]})
+            else:
+                valid.append((index, book_id))
+
+        existing = self.existing_ids(book_id for _, book_id in valid) if valid else set()
+        deleted = []
+        for index, book_id in valid:
+            if book_id in existing:
+                deleted.append((index, book_id))
+            else:
+                result.error(index, {'id': [NOT_FOUND_MESSAGE]})
+
+        if deleted:
+            self.books.delete_many({'id': {'$in': [book_id for _, book_id in deleted]}})
+            for index, book_id in deleted:
+                result.success(index, book_id, 'deleted')
+
+        if result.ids:
+            books_changed.send(sender=Book, ids=result.ids, deleted=True)
+        return result
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import threading
+
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .utils.mongo import MongoConnection
+
+CATALOG_VERSION_COLLECTION = 'libros_catalog_version'
+CATALOG_VERSION_ID = 'books'
+CACHEABLE_STATUS_CODES = (200, 404)
+
+
+def get_catalog_state():
+    """
+    Obtiene la versión actual del catálogo de libros y su última modificación.
+
+    La versión se guarda en MongoDB para que todos los workers vean el
+    mismo valor, incluso cuando la caché es local a cada proceso.
+
+    Returns:
+        tuple: Versión del catálogo (0 si nunca se modificó) y fecha de
+        la última modificación en UTC (None si nunca se modificó)
+    """
+    collection = MongoConnection().get_collection(CATALOG_VERSION_COLLECTION)
+    document = collection.find_one({'_id': CATALOG_VERSION_ID})
+    if document is None:
+        return 0, None
+    return document['version'], document.get('updated_at')
+
+
+def get_catalog_version():
+    """
+    Obtiene la versión actual del catálogo de libros.
+
+    Returns:
+        int: Versión del catálogo (0 si nunca se modificó)
+    """
+    return get_catalog_state()[0]
+
+
+def bump_catalog_version():
+    """
+    Incrementa la versión del catálogo, invalidando las respuestas en caché.
+    """
+    collection = MongoConnection().get_collection(CATALOG_VERSION_COLLECTION)
+    collection.update_one(
+        {'_id': CATALOG_VERSION_ID},
+        {'$inc': {'version': 1}, '$currentDate': {'updated_at': True}},
+        upsert=True
+    )
+
+
+class ResponseCache:
+    """
+    Caché de respuestas de lectura versionada por el catálogo.
+
+    Las claves combinan el nombre del endpoint, la versión del catálogo y
+    los parámetros normalizados de la petición, por lo que cualquier
+    escritura deja inaccesibles las respuestas anteriores. El backend es
+    la caché 'books' de CACHES (LRU local con TTL o una caché compartida).
+    """
+
+    hits = 0
+    misses = 0
+    _lock = threading.Lock()
+
+    def __init__(self, namespace, alias='books'):
+        self.namespace = namespace
+        self.cache = caches[alias]
+
+    @staticmethod
+    def normalize_params(query_params):
+        """
+        Normaliza los parámetros de la petición para construir la clave.
+
+        Args:
+            query_params: QueryDict con los parámetros de la petición
+
+        Returns:
+            list: Pares (parámetro, valores) ordenados y sin valores vacíos
+        """
+        normalized = []
+        for name in sorted(query_params):
+            values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+            if values:
+                normalized.append((name, values))
+        return normalized
+
+    def make_key(self, request, version):
+        """
+        Construye la clave de caché de una petición.
+
+        Args:
+            request: Objeto Request de la petición
+            version: Versión del catálogo
+
+        Returns:
+            str: Clave de caché
+        """
+        payload = json.dumps([request.get_host(), self.normalize_params(request.query_params)])
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return f'{self.namespace}:{version}:{digest}'
+
+    @classmethod
+    def record(cls, hit):
+        """
+        Registra un acierto o un fallo de la caché.
+        """
+        with cls._lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+    @classmethod
+    def stats(cls):
+        """
+        Obtiene las estadísticas de uso de la caché en este worker.
+
+        Returns:
+            dict: Aciertos, fallos y tasa de aciertos
+        """
+        total = cls.hits + cls.misses
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_ratio': round(cls.hits / total, 4) if total else 0.0,
+        }
+
+    def respond(self, request, compute):
+        """
+        Devuelve la respuesta en caché o la calcula y la guarda.
+
+        Las respuestas con Cache-Control: no-store (por ejemplo una búsqueda
+        cuyas facetas superaron su límite de tiempo) no se guardan.
+
+        Args:
+            request: Objeto Request de la petición
+            compute: Función sin argumentos que construye la Response
+
+        Returns:
+            Response: Respuesta con el encabezado X-Cache (HIT o MISS)
+        """
+        key = self.make_key(request, get_catalog_version())
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.record(hit=True)
+            data, status_code = cached
+            return Response(data, status=status_code, headers={'X-Cache': 'HIT'})
+
+        self.record(hit=False)
+        response = compute()
+        if response.status_code in CACHEABLE_STATUS_CODES and 'no-store' not in response.get('Cache-Control', ''):
+            self.cache.set(key, (response.data, response.status_code))
+        response['X-Cache'] = 'MISS'
+        return response
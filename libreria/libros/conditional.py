@@ -0,0 +1,103 @@
+"""
+Validadores para las peticiones GET condicionales (ETag / Last-Modified).
+
+Se usan con el decorador condition de Django, de modo que una petición
+con If-None-Match o If-Modified-Since vigente recibe un 304 sin ejecutar
+la consulta ni serializar la respuesta.
+"""
+import hashlib
+import json
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .cache import ResponseCache, get_catalog_state
+from .utils.mongo import MongoConnection
+
+
+def _catalog_state(request):
+    """
+    Obtiene el estado del catálogo una sola vez por petición.
+    """
+    if not hasattr(request, '_catalog_state'):
+        request._catalog_state = get_catalog_state()
+    return request._catalog_state
+
+
+def _book_state(request, pk):
+    """
+    Obtiene el id y la fecha de modificación de un libro una sola vez por petición.
+
+    Aplica el filtro ?genre= igual que el detalle, para que un libro de
+    otro género no reciba un 304 en lugar del 404.
+    """
+    if not hasattr(request, '_book_state'):
+        try:
+            query = {'id': int(pk)}
+            genre = request.query_params.get('genre')
+            if genre:
+                query['genre'] = genre
+            document = MongoConnection().get_collection('libros_book').find_one(
+                query, {'_id': 0, 'id': 1, 'updated_at': 1}
+            )
+        except (TypeError, ValueError):
+            document = None
+        request._book_state = document
+    return request._book_state
+
+
+def catalog_etag(request, *args, **kwargs):
+    """
+    Calcula el ETag de un listado a partir de la versión del catálogo.
+
+    Args:
+        request: Objeto Request de la petición
+
+    Returns:
+        str: ETag débil que cambia con cualquier escritura del catálogo
+    """
+    version, _ = _catalog_state(request)
+    payload = json.dumps([
+        request.path, ResponseCache.normalize_params(request.query_params), version
+    ])
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    """
+    Obtiene la fecha de la última escritura del catálogo.
+    """
+    return _catalog_state(request)[1]
+
+
+def book_etag(request, pk=None, *args, **kwargs):
+    """
+    Calcula el ETag de un libro a partir de su id, su fecha de modificación
+    y los parámetros de la petición.
+
+    Returns:
+        str: ETag débil del libro, o None si no existe
+    """
+    document = _book_state(request, pk)
+    if document is None:
+        return None
+    payload = json.dumps([
+        document['id'], document['updated_at'].isoformat(), ResponseCache.normalize_params(request.query_params)
+    ])
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def book_last_modified(request, pk=None, *args, **kwargs):
+    """
+    Obtiene la fecha de modificación de un libro.
+    """
+    document = _book_state(request, pk)
+    return document['updated_at'] if document else None
+
+
+catalog_condition = method_decorator(
+    condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+)
+book_condition = method_decorator(
+    condition(etag_func=book_etag, last_modified_func=book_last_modified)
+)
@@ -0,0 +1,85 @@
+import csv
+import json
+
+from django.utils import timezone
+
+from .repository import BOOK_FIELDS
+from .serializers import book_representation
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class Echo:
+    """
+    Objeto con la interfaz de archivo que devuelve lo que se escribe.
+
+    Permite usar csv.writer para producir filas sin acumularlas en memoria.
+    """
+
+    def write(self, value):
+        return value
+
+
+def ndjson_rows(documents):
+    """
+    Convierte los libros en líneas NDJSON.
+
+    Args:
+        documents: Documentos de libros obtenidos con pymongo
+
+    Yields:
+        str: Un libro en JSON por línea
+    """
+    tz = timezone.get_current_timezone()
+    for document in documents:
+        yield json.dumps(book_representation(document, tz), ensure_ascii=False) + '\n'
+
+
+def csv_rows(documents):
+    """
+    Convierte los libros en filas CSV precedidas por la cabecera.
+
+    Args:
+        documents: Documentos de libros obtenidos con pymongo
+
+    Yields:
+        str: Una fila CSV por libro
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(BOOK_FIELDS)
+    tz = timezone.get_current_timezone()
+    for document in documents:
+        book = book_representation(document, tz)
+        yield writer.writerow([book[field] for field in BOOK_FIELDS])
+
+
+def buffered(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Agrupa las filas en bloques para reducir las escrituras al socket.
+
+    Args:
+        rows: Filas de texto a enviar
+        chunk_size: Tamaño aproximado de cada bloque en caracteres
+
+    Yields:
+        str: Bloques de varias filas
+    """
+    chunk = []
+    size = 0
+    for row in rows:
+        chunk.append(row)
+        size += len(row)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+# Formatos de exportación: tipo de contenido, extensión y generador de filas
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson', ndjson_rows),
+    'csv': ('text/csv; charset=utf-8', 'csv', csv_rows),
+}
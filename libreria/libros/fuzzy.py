@@ -0,0 +1,367 @@
+"""
+Búsqueda tolerante a errores de escritura mediante un índice de trigramas.
+
+El índice (colección 'libros_trigram_index') relaciona cada trigrama con
+los términos normalizados del título, el autor y el género que lo
+contienen, por lo
+que su tamaño depende del vocabulario y no de la cantidad de libros. Una
+búsqueda difusa se resuelve en dos agregaciones: la primera obtiene, para
+cada término de la consulta, los términos del vocabulario con mayor
+similitud de trigramas; la segunda busca esos términos en el índice
+invertido y ordena los libros por la similitud multiplicada por los pesos
+título 3, autor 2 y género 1.
+"""
+import math
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+from .search import (
+    DUPLICATE_KEY_ERROR, FIELD_WEIGHTS, REBUILD_OVERLAP, BookSearchIndex, SearchPlan, genre_terms, query_terms,
+    tokenize
+)
+from .utils.mongo import MongoConnection, naive_utc
+
+TRIGRAM_INDEX_COLLECTION = 'libros_trigram_index'
+# Índices de la colección de trigramas: (claves, opciones)
+TRIGRAM_INDEXES = [
+    ([('trigram', ASCENDING), ('size', ASCENDING), ('term', ASCENDING)], {'unique': True}),
+    ([('term', ASCENDING)], {}),
+]
+# Términos del vocabulario que se prueban por cada término de la consulta
+FUZZY_MAX_TERMS = 10
+
+
+def trigrams(term):
+    """
+    Obtiene los trigramas de un término, como pg_trgm.
+
+    El término se rodea de dos espacios al inicio y uno al final para que
+    el comienzo y el final de la palabra pesen más en la similitud.
+
+    Args:
+        term: Término normalizado
+
+    Returns:
+        set: Trigramas del término
+    """
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def book_vocabulary(document):
+    """
+    Obtiene los términos del título, el autor y el género de un libro.
+
+    Son los mismos que indexa el índice invertido (ver search.book_postings).
+
+    Args:
+        document: Documento con 'title', 'author' y 'genre'
+
+    Returns:
+        set: Términos normalizados
+    """
+    return {
+        *tokenize(document.get('title')),
+        *tokenize(document.get('author')),
+        *genre_terms(document.get('genre')),
+    }
+
+
+def trigram_documents(terms):
+    """
+    Construye las entradas del índice de trigramas para varios términos.
+
+    Args:
+        terms: Términos normalizados
+
+    Returns:
+        list: Una entrada por trigrama y término, con la cantidad de
+        trigramas del término en 'size'
+    """
+    documents = []
+    for term in terms:
+        grams = trigrams(term)
+        documents.extend({'trigram': gram, 'size': len(grams), 'term': term} for gram in grams)
+    return documents
+
+
+def fuzzy_requested(params):
+    """
+    Indica si la búsqueda debe ser tolerante a errores (parámetro 'fuzzy').
+
+    Args:
+        params: QueryDict de la petición
+
+    Returns:
+        bool: True si se pidió fuzzy=true
+    """
+    return params.get('fuzzy', '').lower() in ('1', 'true', 'yes')
+
+
+class TrigramIndex:
+    """
+    Índice de trigramas del vocabulario de títulos, autores y géneros.
+
+    Se actualiza al crear o modificar libros agregando sus términos
+    nuevos. Los términos que dejan de aparecer en el catálogo permanecen
+    hasta la siguiente reconstrucción; no afectan a los resultados porque
+    ya no tienen libros en el índice invertido.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else MongoConnection().db
+        self.books = self.db['libros_book']
+        self.trigrams = self.db[TRIGRAM_INDEX_COLLECTION]
+
+    def ensure_indexes(self, collection=None):
+        """
+        Crea los índices que necesita la colección de trigramas.
+
+        Args:
+            collection: Colección a indexar (por defecto la de trigramas)
+        """
+        collection = collection if collection is not None else self.trigrams
+        for keys, options in TRIGRAM_INDEXES:
+            collection.create_index(keys, **options)
+
+    def add_terms(self, terms):
+        """
+        Agrega al índice los términos que aún no tiene.
+
+        Args:
+            terms: Términos normalizados
+        """
+        terms = list(terms)
+        existing = set(self.trigrams.distinct('term', {'term': {'$in': terms}}))
+        documents = trigram_documents(term for term in terms if term not in existing)
+        if not documents:
+            return
+        try:
+            self.trigrams.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Otro worker agregó el mismo término al mismo tiempo
+            if any(error['code'] != DUPLICATE_KEY_ERROR for error in e.details['writeErrors']):
+                raise
+
+    def index_books(self, ids=None, query=None):
+        """
+        Agrega al índice los términos de los libros indicados.
+
+        Args:
+            ids: Identificadores de los libros creados o modificados
+            query: Filtro de MongoDB alternativo a ids
+        """
+        query = query if query is not None else {'id': {'$in': list(ids)}}
+        documents = self.books.find(query, {'_id': 0, 'title': 1, 'author': 1, 'genre': 1})
+        terms = set()
+        for document in documents:
+            terms |= book_vocabulary(document)
+        if terms:
+            self.add_terms(terms)
+
+    def rebuild(self, batch_size=1000):
+        """
+        Reconstruye el índice completo a partir de la colección de libros.
+
+        Igual que el índice invertido, se construye en una colección
+        temporal con nombre único que reemplaza a la actual al finalizar, y
+        después se agregan los términos de los libros modificados durante
+        la construcción.
+
+        Args:
+            batch_size: Cantidad de libros leídos por lote
+
+        Returns:
+            int: Cantidad de términos indexados
+        """
+        started = naive_utc() - REBUILD_OVERLAP
+        vocabulary = set()
+        documents = self.books.find({}, {'_id': 0, 'title': 1, 'author': 1, 'genre': 1}, batch_size=batch_size)
+        for document in documents:
+            vocabulary |= book_vocabulary(document)
+
+        staging = self.db[f'{TRIGRAM_INDEX_COLLECTION}_rebuild_{ObjectId()}']
+        terms = sorted(vocabulary)
+        try:
+            for start in range(0, len(terms), batch_size):
+                staging.insert_many(trigram_documents(terms[start:start + batch_size]), ordered=False)
+            self.ensure_indexes(staging)
+            staging.rename(TRIGRAM_INDEX_COLLECTION, dropTarget=True)
+        except Exception:
+            staging.drop()
+            raise
+
+        self.index_books(query={'updated_at': {'$gte': started}})
+        return len(terms)
+
+    def similar_terms_pipeline(self, terms, threshold=None):
+        """
+        Construye el pipeline que obtiene los términos parecidos a cada término de la consulta.
+
+        La similitud es la de Jaccard entre los trigramas: compartidos sobre
+        el total de distintos. Como no puede superar el cociente entre la
+        menor y la mayor cantidad de trigramas, solo se leen las entradas
+        de términos con un tamaño compatible con el umbral.
+
+        Args:
+            terms: Términos de la consulta
+            threshold: Similitud mínima (por defecto SEARCH_FUZZY_THRESHOLD)
+
+        Returns:
+            list: Etapas del pipeline; el resultado tiene una rama por
+            término de la consulta, en el mismo orden
+        """
+        threshold = threshold if threshold is not None else settings.SEARCH_FUZZY_THRESHOLD
+        grams = [sorted(trigrams(term)) for term in terms]
+        sizes = [len(term_grams) for term_grams in grams]
+
+        def size_range(smallest, largest):
+            if threshold <= 0:
+                return {'$gte': 0}
+            return {'$gte': math.ceil(smallest * threshold), '$lte': math.floor(largest / threshold)}
+
+        facet = {}
+        for position, term_grams in enumerate(grams):
+            facet[str(position)] = [
+                {'$match': {'trigram': {'$in': term_grams}, 'size': size_range(sizes[position], sizes[position])}},
+                {'$group': {'_id': '$term', 'shared': {'$sum': 1}, 'size': {'$first': '$size'}}},
+                {
+                    '$addFields': {
+                        'similarity': {
+                            '$divide': ['$shared', {'$subtract': [{'$add': ['$size', sizes[position]]}, '$shared']}]
+                        }
+                    }
+                },
+                {'$match': {'similarity': {'$gte': threshold}}},
+                {'$sort': {'similarity': -1, '_id': 1}},
+                {'$limit': FUZZY_MAX_TERMS}
+            ]
+
+        return [
+            {
+                '$match': {
+                    'trigram': {'$in': sorted({gram for term_grams in grams for gram in term_grams})},
+                    'size': size_range(min(sizes, default=0), max(sizes, default=0))
+                }
+            },
+            {'$facet': facet}
+        ]
+
+    @staticmethod
+    def similar_terms_result(facet_result, terms):
+        """
+        Obtiene los términos parecidos a partir del resultado de la agregación.
+
+        Args:
+            facet_result: Documento con una rama por término de la consulta
+            terms: Términos de la consulta
+
+        Returns:
+            list: Por cada término de la consulta, pares (término, similitud)
+        """
+        facet_result = facet_result or {}
+        return [
+            [(entry['_id'], entry['similarity']) for entry in facet_result.get(str(position), [])]
+            for position in range(len(terms))
+        ]
+
+    def similar_terms(self, terms):
+        """
+        Obtiene los términos del vocabulario parecidos a cada término de la consulta.
+
+        Args:
+            terms: Términos de la consulta
+
+        Returns:
+            list: Por cada término de la consulta, pares (término, similitud)
+        """
+        if not terms:
+            return []
+        facet_result = next(
+            MongoConnection().aggregate(self.trigrams, self.similar_terms_pipeline(terms)), None
+        )
+        return self.similar_terms_result(facet_result, terms)
+
+
+def fuzzy_plan(similar, db=None):
+    """
+    Construye el plan de una búsqueda difusa.
+
+    Cada término del vocabulario cuenta para todos los términos de la
+    consulta a los que se parece, con la similitud de cada uno. Un libro
+    coincide cuando contiene algún término parecido a cada término de la
+    consulta. Su puntuación suma, por
+    término de la consulta, la mayor similitud multiplicada por los pesos
+    de los campos en que aparece: una coincidencia exacta puntúa igual
+    que en la búsqueda normal.
+
+    Args:
+        similar: Resultado de TrigramIndex.similar_terms
+        db: Base de datos de MongoDB (por defecto la configurada en Django)
+
+    Returns:
+        SearchPlan: Plan sobre el índice invertido
+    """
+    index = BookSearchIndex(db)
+    # Términos de la consulta a los que se parece cada candidato
+    positions = {}
+    for position, candidates in enumerate(similar):
+        for term, similarity in candidates:
+            positions.setdefault(term, []).append({'position': position, 'similarity': similarity})
+    candidates = list(positions)
+
+    field_weight = {'$add': [{'$multiply': [f'$in_{field}', weight]} for field, weight in FIELD_WEIGHTS.items()]}
+    pipeline = [
+        {'$match': {'term': {'$in': candidates}}},
+        {
+            '$addFields': {
+                'match': {
+                    '$arrayElemAt': [[positions[term] for term in candidates], {'$indexOfArray': [candidates, '$term']}]
+                }
+            }
+        },
+        {'$unwind': '$match'},
+        {
+            '$group': {
+                '_id': {'book_id': '$book_id', 'query_term': '$match.position'},
+                'title': {'$first': '$title'},
+                'score': {'$max': {'$multiply': ['$match.similarity', field_weight]}}
+            }
+        },
+        {
+            '$group': {
+                '_id': '$_id.book_id',
+                'title': {'$first': '$title'},
+                'matched_terms': {'$sum': 1},
+                'score': {'$sum': '$score'}
+            }
+        },
+        {'$match': {'matched_terms': len(similar)}}
+    ]
+    ranking = [
+        {'$addFields': {'score': {'$round': ['$score', 3]}}},
+        {
+            '$sort': {
+                'score': -1,
+                'title': 1,
+                '_id': 1
+            }
+        }
+    ]
+    return SearchPlan(index.postings, pipeline, ranking, index.lookup_stages())
+
+
+def get_fuzzy_plan(search_term):
+    """
+    Obtiene los términos parecidos y construye el plan de una búsqueda difusa.
+
+    Args:
+        search_term: Consulta escrita por el usuario
+
+    Returns:
+        SearchPlan: Plan sobre el índice invertido
+    """
+    return fuzzy_plan(TrigramIndex().similar_terms(query_terms(search_term)))
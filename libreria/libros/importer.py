@@ -0,0 +1,273 @@
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from pymongo.errors import BulkWriteError
+
+from .models import Book
+from .signals import books_changed
+from .utils.mongo import MongoConnection, book_document, naive_utc, reserve_ids
+
+IMPORT_FIELDS = ['title', 'author', 'published_date', 'genre', 'price']
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REJECTS = 100
+
+
+def detect_format(filename, default='csv'):
+    """
+    Deduce el formato de importación a partir de la extensión del archivo.
+
+    Args:
+        filename: Nombre del archivo
+        default: Formato usado si la extensión no es conocida
+
+    Returns:
+        str: 'csv' o 'ndjson'
+    """
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if extension == 'csv':
+        return 'csv'
+    return default
+
+
+def read_rows(stream, input_format):
+    """
+    Lee las filas de un archivo de forma incremental.
+
+    Args:
+        stream: Archivo de texto abierto
+        input_format: 'csv' o 'ndjson'
+
+    Yields:
+        tuple: Número de fila (desde 1) y fila como dict, o el texto
+        original si la línea NDJSON no es un objeto JSON válido
+    """
+    if input_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = line.rstrip('\n')
+        yield number, row
+
+
+def open_text(binary):
+    """
+    Abre un archivo binario como texto UTF-8, ignorando el BOM si lo tiene.
+
+    Args:
+        binary: Archivo binario abierto
+
+    Returns:
+        io.TextIOWrapper: Archivo de texto
+    """
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+
+def count_rows(binary, input_format, limit=None):
+    """
+    Cuenta las filas de un archivo sin validarlas ni importarlas.
+
+    Recorre el archivo con read_rows, por lo que detecta los errores de
+    codificación y de formato CSV antes de escribir. El archivo binario
+    queda abierto y al comienzo para volver a leerlo.
+
+    Args:
+        binary: Archivo binario abierto
+        input_format: 'csv' o 'ndjson'
+        limit: Deja de contar al llegar a esta cantidad de filas (opcional)
+
+    Returns:
+        int: Cantidad de filas, como máximo limit
+
+    Raises:
+        UnicodeDecodeError: Si el archivo no está en UTF-8
+        csv.Error: Si el CSV está mal formado
+    """
+    stream = open_text(binary)
+    try:
+        return sum(1 for _ in islice(read_rows(stream, input_format), limit))
+    finally:
+        stream.detach().seek(0)
+
+
+def clean_row(row):
+    """
+    Valida una fila con las reglas de los campos del modelo Book.
+
+    Args:
+        row: Fila leída del archivo
+
+    Returns:
+        tuple: Campos limpios (o None) y errores por campo
+    """
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': ['La fila no es un objeto válido.']}
+
+    values = {}
+    errors = {}
+    for name in IMPORT_FIELDS:
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, float):
+            # Un float como 12.34 tendría más de dos decimales al convertirlo a Decimal
+            value = repr(value)
+        try:
+            values[name] = Book._meta.get_field(name).clean(value, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    return (None, errors) if errors else (values, {})
+
+
+def batched(iterable, size):
+    """
+    Agrupa un iterable en listas de como máximo size elementos.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class ImportCheckpoint:
+    """
+    Punto de control de una importación guardado en un archivo JSON.
+
+    Registra la última fila escrita para poder reanudar la importación
+    sin volver a insertar las filas ya procesadas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.row = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                self.row = json.load(f).get('row', 0)
+
+    def save(self, row):
+        """
+        Guarda la última fila procesada de forma atómica.
+        """
+        self.row = row
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'row': row}, f)
+        os.replace(temporary, self.path)
+
+
+class BookImporter:
+    """
+    Importación masiva de libros con memoria acotada.
+
+    Las filas se leen, validan y escriben como una cadena de generadores
+    en lotes de batch_size, por lo que solo un lote reside en memoria.
+    Cada lote se inserta con insert_many no ordenado y se notifica con
+    books_changed para actualizar el índice de búsqueda y la caché.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, checkpoint=None, on_reject=None, db=None):
+        self.db = db if db is not None else MongoConnection().db
+        self.books = self.db['libros_book']
+        self.batch_size = max(batch_size, 1)
+        self.checkpoint = checkpoint
+        self.on_reject = on_reject
+        self.stats = {'read': 0, 'skipped': 0, 'imported': 0, 'rejected': 0}
+
+    def reject(self, number, row, errors):
+        """
+        Registra una fila rechazada.
+        """
+        self.stats['rejected'] += 1
+        if self.on_reject is not None:
+            self.on_reject({'row': number, 'data': row, 'errors': errors})
+
+    def cleaned(self, rows):
+        """
+        Valida las filas, omitiendo las ya importadas según el punto de control.
+
+        Yields:
+            tuple: Número de fila y campos limpios, o None si la fila fue rechazada
+        """
+        start = self.checkpoint.row if self.checkpoint is not None else 0
+        for number, row in rows:
+            self.stats['read'] += 1
+            if number <= start:
+                self.stats['skipped'] += 1
+                continue
+
+            values, errors = clean_row(row)
+            if errors:
+                self.reject(number, row, errors)
+                values = None
+            yield number, values
+
+    def write(self, batch):
+        """
+        Inserta un lote de filas válidas.
+
+        Args:
+            batch: Pares (número de fila, campos limpios)
+        """
+        valid = [(number, values) for number, values in batch if values is not None]
+        if not valid:
+            return
+
+        timestamp = naive_utc()
+        ids = reserve_ids(self.db, 'libros_book', len(valid))
+        documents = [book_document(values, book_id, timestamp) for (_, values), book_id in zip(valid, ids)]
+        failed = set()
+        try:
+            self.books.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details['writeErrors']:
+                failed.add(write_error['index'])
+                number, values = valid[write_error['index']]
+                self.reject(number, {k: str(v) for k, v in values.items()},
+                            {'non_field_errors': [write_error['errmsg']]})
+
+        imported = [book_id for position, book_id in enumerate(ids) if position not in failed]
+        self.stats['imported'] += len(imported)
+        if imported:
+            books_changed.send(sender=Book, ids=imported, deleted=False)
+
+    def run(self, rows):
+        """
+        Importa las filas y devuelve las estadísticas de la ejecución.
+
+        Args:
+            rows: Pares (número de fila, fila) como los de read_rows
+
+        Returns:
+            dict: Filas leídas, omitidas, importadas y rechazadas, la
+            duración en segundos y las filas por segundo
+        """
+        start = time.perf_counter()
+        for batch in batched(self.cleaned(rows), self.batch_size):
+            self.write(batch)
+            if self.checkpoint is not None:
+                self.checkpoint.save(batch[-1][0])
+
+        elapsed = time.perf_counter() - start
+        return {
+            **self.stats,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.stats['read'] / max(elapsed, 1e-9), 1),
+        }
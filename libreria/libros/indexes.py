@@ -0,0 +1,219 @@
+"""
+Registro de los índices que necesitan las consultas de la API.
+
+Los índices de libros se declaran en Book.Meta.indexes (las migraciones
+los crean con djongo), los del índice invertido en search.SEARCH_INDEXES,
+los de los trigramas de la búsqueda difusa en fuzzy.TRIGRAM_INDEXES y los
+de los cambios de usuarios en authentication.USER_VERSION_INDEXES y los
+de los cambios de libros en suggest.BOOK_CHANGES_INDEXES.
+IndexManager compara ese registro con los índices existentes, crea los que
+faltan y usa $indexStats para detectar los que no se utilizan.
+"""
+from collections import namedtuple
+
+from pymongo import ASCENDING, DESCENDING
+
+from .authentication import USER_VERSION_COLLECTION, USER_VERSION_INDEXES
+from .fuzzy import TRIGRAM_INDEX_COLLECTION, TRIGRAM_INDEXES
+from .models import Book
+from .search import SEARCH_INDEX_COLLECTION, SEARCH_INDEXES
+from .suggest import BOOK_CHANGES_COLLECTION, BOOK_CHANGES_INDEXES
+from .utils.mongo import MongoConnection
+
+IndexSpec = namedtuple('IndexSpec', ['collection', 'name', 'keys', 'options'])
+
+# Índices que crea MongoDB o djongo y que no se declaran en el registro
+IMPLICIT_INDEXES = {'_id_'}
+
+
+def model_indexes(model):
+    """
+    Convierte los índices declarados en un modelo a especificaciones de pymongo.
+
+    Incluye el índice único de la clave primaria que djongo crea junto con
+    la colección ('__primary_key__').
+
+    Args:
+        model: Modelo de Django
+
+    Returns:
+        list: IndexSpec por cada índice del modelo
+    """
+    table = model._meta.db_table
+    specs = [IndexSpec(table, '__primary_key__', [(model._meta.pk.column, ASCENDING)], {'unique': True})]
+    for index in model._meta.indexes:
+        keys = [
+            (model._meta.get_field(field.lstrip('-')).column, DESCENDING if field.startswith('-') else ASCENDING)
+            for field in index.fields
+        ]
+        specs.append(IndexSpec(table, index.name, keys, {}))
+    return specs
+
+
+def required_indexes():
+    """
+    Obtiene todos los índices que deben existir con la configuración actual.
+
+    Returns:
+        list: IndexSpec de los libros, del índice invertido, de los
+        trigramas y de los cambios de usuarios y de libros. El índice invertido se exige también con
+        BOOK_SEARCH_ENGINE='regex', porque la búsqueda difusa lo usa siempre
+    """
+    specs = model_indexes(Book)
+    collections = [
+        (SEARCH_INDEX_COLLECTION, SEARCH_INDEXES),
+        (TRIGRAM_INDEX_COLLECTION, TRIGRAM_INDEXES),
+        (USER_VERSION_COLLECTION, USER_VERSION_INDEXES),
+        (BOOK_CHANGES_COLLECTION, BOOK_CHANGES_INDEXES),
+    ]
+    for collection, indexes in collections:
+        specs.extend(
+            IndexSpec(collection, '_'.join(f'{field}_{direction}' for field, direction in keys), keys, options)
+            for keys, options in indexes
+        )
+    return specs
+
+
+def normalize_keys(keys):
+    """
+    Normaliza las claves de un índice para compararlas (1.0 y 1 son iguales).
+    """
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in keys]
+
+
+class IndexManager:
+    """
+    Comprueba, crea e informa el uso de los índices del registro.
+    """
+
+    def __init__(self, db=None, specs=None):
+        self.db = db if db is not None else MongoConnection().db
+        self.specs = specs if specs is not None else required_indexes()
+
+    def existing(self, collection):
+        """
+        Obtiene los índices de una colección.
+
+        Args:
+            collection: Nombre de la colección
+
+        Returns:
+            dict: Claves normalizadas de cada índice por nombre
+        """
+        return {
+            name: normalize_keys(info['key'])
+            for name, info in self.db[collection].index_information().items()
+        }
+
+    def usage(self, collection):
+        """
+        Obtiene las operaciones atendidas por cada índice con $indexStats.
+
+        Los contadores son del nodo que responde y se reinician con él.
+
+        Args:
+            collection: Nombre de la colección
+
+        Returns:
+            dict: Operaciones por nombre de índice, o None si $indexStats
+            no está disponible
+        """
+        try:
+            stats = self.db[collection].aggregate([{'$indexStats': {}}])
+            return {entry['name']: int(entry['accesses']['ops']) for entry in stats}
+        except Exception:
+            return None
+
+    def status(self, spec, existing):
+        """
+        Obtiene el estado de un índice declarado.
+
+        Un índice con las mismas claves y otro nombre también sirve a las
+        consultas, por lo que cuenta como presente.
+
+        Returns:
+            tuple: Estado ('present', 'missing' o 'conflict') y nombre del
+            índice existente que lo cubre, si lo hay
+        """
+        keys = normalize_keys(spec.keys)
+        for name, existing_keys in existing.items():
+            if existing_keys == keys:
+                return 'present', name
+        if spec.name in existing:
+            # Mismo nombre con otras claves: create_index fallaría
+            return 'conflict', spec.name
+        return 'missing', None
+
+    def report(self):
+        """
+        Compara el registro con los índices existentes y su uso.
+
+        Returns:
+            list: Un elemento por índice declarado o existente con su
+            colección, nombre, claves, estado y operaciones atendidas. Los
+            índices existentes que no están declarados tienen el estado
+            'undeclared'.
+        """
+        rows = []
+        for collection in dict.fromkeys(spec.collection for spec in self.specs):
+            existing = self.existing(collection)
+            usage = self.usage(collection) or {}
+            covered = set()
+            for spec in (spec for spec in self.specs if spec.collection == collection):
+                state, name = self.status(spec, existing)
+                covered.add(name)
+                rows.append({
+                    'collection': collection,
+                    'name': name or spec.name,
+                    'keys': spec.keys,
+                    'status': state,
+                    'ops': usage.get(name) if state == 'present' else None,
+                })
+            for name, keys in existing.items():
+                if name not in covered and name not in IMPLICIT_INDEXES:
+                    rows.append({
+                        'collection': collection,
+                        'name': name,
+                        'keys': keys,
+                        'status': 'undeclared',
+                        'ops': usage.get(name),
+                    })
+        return rows
+
+    def missing(self):
+        """
+        Obtiene los índices declarados que no existen.
+
+        Returns:
+            list: IndexSpec ausentes o en conflicto con un índice existente
+        """
+        existing = {}
+        missing = []
+        for spec in self.specs:
+            if spec.collection not in existing:
+                existing[spec.collection] = self.existing(spec.collection)
+            if self.status(spec, existing[spec.collection])[0] != 'present':
+                missing.append(spec)
+        return missing
+
+    def ensure(self):
+        """
+        Crea los índices declarados que faltan.
+
+        Las construcciones se piden en segundo plano; desde MongoDB 4.2
+        todas bloquean la colección solo al comenzar y al terminar, por lo
+        que la API sigue atendiendo lecturas y escrituras mientras tanto.
+        Los índices en conflicto no se tocan.
+
+        Returns:
+            tuple: Listas de IndexSpec creados y en conflicto
+        """
+        created = []
+        conflicts = []
+        for spec in self.missing():
+            if spec.name in self.existing(spec.collection):
+                conflicts.append(spec)
+                continue
+            self.db[spec.collection].create_index(spec.keys, name=spec.name, background=True, **spec.options)
+            created.append(spec)
+        return created, conflicts
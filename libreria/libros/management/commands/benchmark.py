@@ -0,0 +1,83 @@
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from libros.benchmarks import BENCHMARKS, build_report, compare_reports
+
+
+class Command(BaseCommand):
+    """
+    Comando de Django para ejecutar los benchmarks de rendimiento.
+
+    Genera un dataset determinista en la base de benchmarks y muestra
+    el resultado de cada benchmark en formato JSON, junto con el commit
+    medido, para poder comparar ejecuciones entre commits.
+    """
+
+    help = 'Ejecuta un benchmark de rendimiento sobre una base de datos de pruebas'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos que acepta el comando.
+
+        Args:
+            parser: Parser de argumentos de Django
+        """
+        parser.add_argument(
+            'name',
+            choices=sorted(BENCHMARKS),
+            help='Benchmark a ejecutar'
+        )
+        parser.add_argument(
+            '--size',
+            type=int,
+            nargs='+',
+            default=[10000],
+            help='Cantidades de libros de los datasets; se ejecuta una vez por cada una (default: 10000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Ejecuciones medidas por caso (default: 20)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Archivo donde guardar el informe en JSON'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Informe JSON anterior con el que comparar el p50 de cada caso'
+        )
+        parser.add_argument(
+            '--max-ratio',
+            type=float,
+            help='Falla si algún caso supera este cociente de p50 respecto a --compare (p. ej. 1.2)'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Ejecuta el benchmark seleccionado y muestra sus resultados.
+        """
+        baseline = None
+        if kwargs['compare']:
+            with open(kwargs['compare']) as f:
+                baseline = json.load(f)
+
+        benchmark = import_module(BENCHMARKS[kwargs['name']])
+        runs = [benchmark.run(size=size, repeat=kwargs['repeat']) for size in kwargs['size']]
+        report = build_report(kwargs['name'], runs)
+        if baseline is not None:
+            report['comparison'] = compare_reports(baseline, report)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if kwargs['output']:
+            with open(kwargs['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+        if baseline is not None and kwargs['max_ratio']:
+            regressions = [row for row in report['comparison'] if row['ratio'] > kwargs['max_ratio']]
+            if regressions:
+                cases = ', '.join(f"{row['case']} ({row['size']}): x{row['ratio']}" for row in regressions)
+                raise CommandError(f'Regresiones respecto a {kwargs["compare"]}: {cases}')
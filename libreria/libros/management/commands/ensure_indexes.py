@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from libros.indexes import IndexManager
+
+
+class Command(BaseCommand):
+    """
+    Comando de Django para crear y revisar los índices de MongoDB.
+
+    Crea en segundo plano los índices declarados que faltan y muestra el
+    estado de cada índice, marcando los que no atendieron operaciones
+    según $indexStats. Con --check solo comprueba y falla si falta alguno,
+    por lo que sirve como verificación al iniciar el contenedor.
+    """
+
+    help = 'Crea los índices declarados que faltan e informa los ausentes y los no utilizados'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos que acepta el comando.
+
+        Args:
+            parser: Parser de argumentos de Django
+        """
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='No crea índices; falla si falta alguno de los declarados'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Muestra el informe en formato JSON'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Crea los índices que faltan, o solo los comprueba, y muestra el informe.
+        """
+        manager = IndexManager()
+
+        if kwargs['check']:
+            missing = manager.missing()
+            if missing:
+                names = ', '.join(f'{spec.collection}.{spec.name}' for spec in missing)
+                raise CommandError(
+                    f'Faltan índices requeridos: {names}. Ejecute "python manage.py ensure_indexes"'
+                )
+            if not kwargs['json']:
+                self.stdout.write(self.style.SUCCESS('Todos los índices requeridos existen'))
+                return
+        else:
+            created, conflicts = manager.ensure()
+            for spec in created:
+                self.stdout.write(self.style.SUCCESS(f'Índice creado: {spec.collection}.{spec.name}'))
+            for spec in conflicts:
+                self.stderr.write(self.style.ERROR(
+                    f'{spec.collection}.{spec.name} ya existe con otras claves; elimínelo para crearlo de nuevo'
+                ))
+
+        rows = manager.report()
+        if kwargs['json']:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        for row in rows:
+            keys = ', '.join(f'{field} {direction}' for field, direction in row['keys'])
+            ops = 'sin datos de uso' if row['ops'] is None else f"{row['ops']} operaciones"
+            line = f"{row['collection']}.{row['name']} ({keys}): {row['status']}, {ops}"
+            if row['status'] in ('missing', 'conflict'):
+                self.stdout.write(self.style.ERROR(line))
+            elif row['ops'] == 0:
+                self.stdout.write(self.style.WARNING(f'{line} (no utilizado)'))
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,98 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from libros.importer import (
+    IMPORT_BATCH_SIZE, IMPORT_FORMATS, BookImporter, ImportCheckpoint, detect_format, read_rows
+)
+
+
+class Command(BaseCommand):
+    """
+    Comando de Django para importar libros desde archivos CSV o NDJSON.
+
+    El archivo se procesa de forma incremental en lotes, guardando un
+    punto de control después de cada lote para poder reanudar la
+    importación, y las filas inválidas se registran en un archivo aparte.
+    """
+
+    help = 'Importa libros desde un archivo CSV o NDJSON'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos que acepta el comando.
+
+        Args:
+            parser: Parser de argumentos de Django
+        """
+        parser.add_argument(
+            'path',
+            type=str,
+            help='Archivo a importar'
+        )
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            default=None,
+            help='Formato del archivo (default: según la extensión)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f'Cantidad de libros por inserción (default: {IMPORT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            default=None,
+            help='Archivo del punto de control (default: <path>.checkpoint)'
+        )
+        parser.add_argument(
+            '--rejects',
+            type=str,
+            default=None,
+            help='Archivo NDJSON con las filas rechazadas (default: <path>.rejects.ndjson)'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignorar el punto de control y empezar desde la primera fila'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Ejecuta la importación y muestra sus estadísticas.
+        """
+        path = kwargs['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe el archivo {path}')
+
+        input_format = kwargs['format'] or detect_format(path)
+        checkpoint_path = kwargs['checkpoint'] or f'{path}.checkpoint'
+        rejects_path = kwargs['rejects'] or f'{path}.rejects.ndjson'
+        if kwargs['restart'] and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        checkpoint = ImportCheckpoint(checkpoint_path)
+        if checkpoint.row:
+            self.stdout.write(f'Reanudando después de la fila {checkpoint.row}...')
+
+        with open(path, encoding='utf-8-sig', newline='') as source, \
+                open(rejects_path, 'a', encoding='utf-8') as rejects:
+            importer = BookImporter(
+                batch_size=kwargs['batch_size'],
+                checkpoint=checkpoint,
+                on_reject=lambda reject: rejects.write(json.dumps(reject, ensure_ascii=False) + '\n')
+            )
+            stats = importer.run(read_rows(source, input_format))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"¡Importación completada! {stats['imported']} libros importados, "
+                f"{stats['rejected']} rechazados y {stats['skipped']} omitidos "
+                f"en {stats['seconds']:.2f} s ({stats['rows_per_second']:.0f} filas/s)"
+            )
+        )
+        if stats['rejected']:
+            self.stdout.write(self.style.WARNING(f'Filas rechazadas en {rejects_path}'))
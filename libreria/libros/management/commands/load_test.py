@@ -0,0 +1,75 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from libros.benchmarks import load
+
+
+class Command(BaseCommand):
+    """
+    Comando de Django para ejecutar una prueba de carga HTTP.
+
+    Compara la latencia y la capacidad de concurrencia de uno o varios
+    despliegues en ejecución y muestra el resultado en formato JSON.
+    """
+
+    help = 'Ejecuta una prueba de carga contra uno o varios despliegues'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos que acepta el comando.
+
+        Args:
+            parser: Parser de argumentos de Django
+        """
+        parser.add_argument(
+            'targets',
+            nargs='+',
+            help='Destinos con el formato nombre=url, por ejemplo wsgi=http://localhost:8000/api/books/search/?q=Borges'
+        )
+        parser.add_argument(
+            '--token',
+            type=str,
+            default=os.environ.get('LOAD_TEST_TOKEN'),
+            help='Token JWT de acceso (default: variable LOAD_TEST_TOKEN)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=str,
+            default='1,10,50,100',
+            help='Niveles de concurrencia separados por comas (default: 1,10,50,100)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Peticiones por nivel de concurrencia (default: 500)'
+        )
+        parser.add_argument(
+            '--slo-ms',
+            type=float,
+            default=1000,
+            help='p99 máximo aceptable para calcular la capacidad (default: 1000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Ejecuta la prueba de carga y muestra sus resultados.
+        """
+        if not kwargs['token']:
+            raise CommandError('Se requiere un token JWT (--token o LOAD_TEST_TOKEN)')
+
+        targets = {}
+        for target in kwargs['targets']:
+            name, separator, url = target.partition('=')
+            if not separator or not url:
+                raise CommandError(f'Destino inválido "{target}"; use nombre=url')
+            targets[name] = url
+
+        try:
+            levels = [int(level) for level in kwargs['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency debe ser una lista de números separados por comas')
+
+        result = load.run(targets, kwargs['token'], levels, kwargs['requests'], kwargs['slo_ms'])
+        self.stdout.write(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from libros.fuzzy import TrigramIndex
+
+
+class Command(BaseCommand):
+    """
+    Comando de Django para reconstruir el índice de trigramas de libros.
+
+    Recorre la colección de libros completa y genera de nuevo el índice de
+    trigramas del vocabulario que utiliza la búsqueda difusa (fuzzy=true).
+    """
+
+    help = 'Reconstruye el índice de trigramas de la búsqueda difusa'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos que acepta el comando.
+
+        Args:
+            parser: Parser de argumentos de Django
+        """
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de libros y términos procesados por lote (default: 1000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Ejecuta la reconstrucción del índice.
+        """
+        self.stdout.write('Reconstruyendo el índice de trigramas...')
+        total = TrigramIndex().rebuild(batch_size=kwargs['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'¡Proceso completado! Se indexaron {total} términos')
+        )
@@ -1,15 +1,79 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
 from faker import Faker
 from decimal import Decimal
 import random
+import time
 from libros.models import Book
+from libros.signals import books_changed
+from libros.utils.mongo import MongoConnection, book_document, naive_utc, reserve_ids
+
+AUTHORS = [
+    'Gabriel García Márquez', 'Jorge Luis Borges',
+    'Isabel Allende', 'Julio Cortázar',
+    'Mario Vargas Llosa', 'Pablo Neruda',
+    'Octavio Paz', 'Miguel de Cervantes',
+    'Federico García Lorca', 'Carlos Ruiz Zafón'
+]
+
+
+def generate_books(fake, count, rng=random):
+    """
+    Genera los campos de libros con datos aleatorios.
+
+    Args:
+        fake: Instancia de Faker usada para títulos y fechas
+        count: Cantidad de libros a generar
+        rng: Generador de números aleatorios para autor, género y precio
+
+    Yields:
+        dict: Campos de un libro listos para crear un Book
+    """
+    genres = [choice[0] for choice in Book.GENRE_CHOICES]
+    for _ in range(count):
+        yield {
+            'title': fake.catch_phrase(),
+            'author': rng.choice(AUTHORS),
+            'published_date': fake.date_between(start_date='-50y', end_date='today'),
+            'genre': rng.choice(genres),
+            'price': Decimal(str(round(rng.uniform(10.0, 150.0), 2)))
+        }
+
+
+_fakers = {}
+
+
+def generate_chunk(locale, size, seed):
+    """
+    Genera un chunk de libros de forma determinista.
+
+    Se ejecuta en los procesos del pool, por lo que cada proceso
+    reutiliza su instancia de Faker y solo la vuelve a sembrar.
+
+    Args:
+        locale: Idioma de los datos generados
+        size: Cantidad de libros del chunk
+        seed: Semilla del chunk
+
+    Returns:
+        list: Campos de los libros del chunk
+    """
+    fake = _fakers.get(locale)
+    if fake is None:
+        fake = _fakers[locale] = Faker(locale)
+    fake.seed_instance(seed)
+    return list(generate_books(fake, size, random.Random(seed)))
+
 
 class Command(BaseCommand):
     """
     Comando de Django para generar datos de prueba para libros.
-    
+
     Este comando utiliza la librería Faker para generar datos aleatorios
-    y crear registros de libros en la base de datos usando bulk_create.
+    y crear registros de libros en la base de datos usando bulk_create o,
+    con --direct, insert_many de pymongo. Con --workers los datos se
+    generan en paralelo mientras el proceso principal inserta.
     """
 
     help = 'Crea una cantidad específica de libros con datos aleatorios'
@@ -18,13 +82,13 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         """
         Define los argumentos que acepta el comando.
-        
+
         Args:
             parser: Parser de argumentos de Django
         """
         parser.add_argument(
-            'total', 
-            type=int, 
+            'total',
+            type=int,
             help='Cantidad de libros a crear'
         )
         parser.add_argument(
@@ -33,48 +97,129 @@ class Command(BaseCommand):
             default='es_ES',
             help='Idioma para los datos generados (default: es_ES)'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=self.CHUNK_SIZE,
+            help=f'Cantidad de libros por inserción (default: {self.CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Procesos que generan los datos en paralelo (default: 1)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Semilla para generar siempre los mismos libros'
+        )
+        parser.add_argument(
+            '--direct',
+            action='store_true',
+            help='Insertar con insert_many de pymongo en lugar del ORM'
+        )
+
+    def generate_chunks(self, total, chunk_size, locale, seed, workers):
+        """
+        Genera los chunks de libros en orden.
+
+        Cada chunk usa la semilla seed + número de chunk, por lo que el
+        resultado no depende de la cantidad de procesos.
+
+        Args:
+            total: Cantidad de libros a generar
+            chunk_size: Cantidad de libros por chunk
+            locale: Idioma de los datos generados
+            seed: Semilla base
+            workers: Cantidad de procesos generadores
+
+        Yields:
+            list: Campos de los libros de cada chunk
+        """
+        specs = [
+            (locale, min(chunk_size, total - start), seed + number)
+            for number, start in enumerate(range(0, total, chunk_size))
+        ]
+        if workers <= 1:
+            for spec in specs:
+                yield generate_chunk(*spec)
+            return
+
+        # Se mantiene una ventana acotada de chunks pendientes para no
+        # acumular en memoria lo que la base todavía no pudo insertar
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            specs = iter(specs)
+            for spec in specs:
+                pending.append(executor.submit(generate_chunk, *spec))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                chunk = pending.popleft().result()
+                spec = next(specs, None)
+                if spec is not None:
+                    pending.append(executor.submit(generate_chunk, *spec))
+                yield chunk
+
+    def insert_direct(self, chunk):
+        """
+        Inserta un chunk con pymongo usando el formato de djongo.
+
+        Args:
+            chunk: Campos de los libros a insertar
+        """
+        db = MongoConnection().db
+        timestamp = naive_utc()
+        ids = reserve_ids(db, 'libros_book', len(chunk))
+        documents = [book_document(values, book_id, timestamp) for values, book_id in zip(chunk, ids)]
+        db['libros_book'].insert_many(documents, ordered=False)
 
     def handle(self, *args, **kwargs):
         """
         Ejecuta la lógica principal del comando.
-        
+
         Genera libros con datos aleatorios utilizando Faker y
         los guarda en la base de datos en chunks para mejor rendimiento.
         """
         total = kwargs['total']
         locale = kwargs['locale']
-        fake = Faker(locale)
-        genres = [choice[0] for choice in Book.GENRE_CHOICES]
-        authors = [
-            'Gabriel García Márquez', 'Jorge Luis Borges',
-            'Isabel Allende', 'Julio Cortázar',
-            'Mario Vargas Llosa', 'Pablo Neruda',
-            'Octavio Paz', 'Miguel de Cervantes',
-            'Federico García Lorca', 'Carlos Ruiz Zafón'
-        ]
+        chunk_size = max(kwargs['chunk_size'], 1)
+        workers = max(kwargs['workers'], 1)
+        seed = kwargs['seed']
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        verbose = kwargs['verbosity'] > 1
+
+        self.stdout.write(
+            f'Creando {total} libros en chunks de {chunk_size} con {workers} proceso(s) (semilla {seed})...'
+        )
 
-        self.stdout.write(f'Creando {total} libros en chunks de {self.CHUNK_SIZE}...')
-        
+        start = time.perf_counter()
         books_created = 0
-        while books_created < total:
-            chunk_size = min(self.CHUNK_SIZE, total - books_created)
-            chunk = [
-                Book(
-                    title=fake.catch_phrase(),
-                    author=random.choice(authors),
-                    published_date=fake.date_between(start_date='-50y', end_date='today'),
-                    genre=random.choice(genres),
-                    price=Decimal(str(round(random.uniform(10.0, 150.0), 2)))
+        next_report = total // 10
+        for chunk in self.generate_chunks(total, chunk_size, locale, seed, workers):
+            if kwargs['direct']:
+                self.insert_direct(chunk)
+            else:
+                Book.objects.bulk_create([Book(**values) for values in chunk])
+            books_created += len(chunk)
+
+            if verbose or books_created >= next_report or books_created == total:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Creados {books_created} libros de {total}')
                 )
-                for _ in range(chunk_size)
-            ]
-            
-            Book.objects.bulk_create(chunk)
-            books_created += chunk_size
-            self.stdout.write(
-                self.style.SUCCESS(f'Creados {books_created} libros de {total}')
-            )
+                next_report = books_created + max(total // 10, 1)
+
+        elapsed = time.perf_counter() - start
+
+        # bulk_create no emite post_save, por lo que se notifica la carga completa
+        books_changed.send(sender=Book, ids=None, deleted=False)
 
         self.stdout.write(
-            self.style.SUCCESS(f'¡Proceso completado! Se crearon {total} libros exitosamente')
-        ) 
\ No newline at end of file
+            self.style.SUCCESS(
+                f'¡Proceso completado! Se crearon {total} libros exitosamente '
+                f'en {elapsed:.2f} s ({total / max(elapsed, 1e-9):.0f} docs/s)'
+            )
+        )
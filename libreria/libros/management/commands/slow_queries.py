@@ -0,0 +1,109 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from libros.utils.slow_queries import read_slow_queries, summarize_slow_queries
+
+SORT_KEYS = {'total': 'total_ms', 'max': 'max_ms', 'count': 'count'}
+
+
+class Command(BaseCommand):
+    """
+    Comando de Django para revisar las agregaciones lentas capturadas.
+
+    Agrupa las capturas de MONGO_SLOW_QUERY_LOG por forma del pipeline y
+    muestra las que más tiempo consumieron junto con su plan de ejecución.
+    """
+
+    help = 'Resume por forma del pipeline las agregaciones lentas capturadas'
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos que acepta el comando.
+
+        Args:
+            parser: Parser de argumentos de Django
+        """
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Cantidad de formas a mostrar (default: 10)'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=sorted(SORT_KEYS),
+            default='total',
+            help='Criterio de orden: tiempo total, máximo o cantidad de capturas (default: total)'
+        )
+        parser.add_argument(
+            '--log',
+            help='Archivo de capturas (default: MONGO_SLOW_QUERY_LOG)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Muestra el resumen en formato JSON, incluida la forma de cada pipeline'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Elimina las capturas después de mostrarlas'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Muestra las agregaciones lentas más costosas.
+        """
+        path = kwargs['log'] or settings.MONGO_SLOW_QUERY_LOG
+        summaries = summarize_slow_queries(read_slow_queries(path))
+        summaries.sort(key=lambda summary: summary[SORT_KEYS[kwargs['sort']]], reverse=True)
+        summaries = summaries[:kwargs['limit']]
+
+        if kwargs['json']:
+            self.stdout.write(json.dumps(summaries, indent=2, ensure_ascii=False))
+        elif not summaries:
+            self.stdout.write('No hay agregaciones lentas registradas')
+        else:
+            for position, summary in enumerate(summaries, 1):
+                self.write_summary(position, summary)
+
+        if kwargs['clear'] and os.path.exists(path):
+            os.remove(path)
+            self.stdout.write(self.style.SUCCESS(f'Se eliminaron las capturas de {path}'))
+
+    def write_summary(self, position, summary):
+        """
+        Muestra el resumen de una forma de pipeline.
+
+        Args:
+            position: Posición en el listado
+            summary: Resumen obtenido con summarize_slow_queries
+        """
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"#{position} {summary['shape_id']} ({summary['collection']}): "
+            f"{summary['count']} ejecuciones, total {summary['total_ms']:.1f} ms, "
+            f"p50 {summary['p50_ms']:.1f} ms, máximo {summary['max_ms']:.1f} ms"
+        ))
+        self.stdout.write(f"  etapas: {' > '.join(map(str, summary['stages']))}")
+
+        explain = summary['explain']
+        if not explain:
+            self.stdout.write('  explain: sin plan capturado')
+            return
+        if 'error' in explain:
+            self.stdout.write(self.style.WARNING(f"  explain: {explain['error']}"))
+            return
+
+        returned = explain['docs_returned']
+        ratio = f" ({explain['docs_examined'] / returned:.1f} por documento)" if returned else ''
+        self.stdout.write(
+            f"  documentos examinados {explain['docs_examined']}, devueltos {returned}{ratio}, "
+            f"claves examinadas {explain['keys_examined']}"
+        )
+        self.stdout.write(
+            f"  índices: {', '.join(explain['indexes']) or 'ninguno'}"
+            f" | recorrido completo: {'sí' if explain['collection_scan'] else 'no'}"
+            f" | ordenamiento en memoria: {'sí' if explain['in_memory_sort'] else 'no'}"
+        )
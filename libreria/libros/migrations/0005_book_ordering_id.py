@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0004_book_genre_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Libro', 'verbose_name_plural': 'Libros'},
+        ),
+    ]
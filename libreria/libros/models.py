@@ -30,7 +30,17 @@ class Book(models.Model):
     class Meta:
         verbose_name = 'Libro'
         verbose_name_plural = 'Libros'
-        ordering = ['-created_at']
+        # El id desempata los libros creados en el mismo milisegundo, igual
+        # que la lectura nativa (repository.BookRepository.list)
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Sirve el orden por -created_at y la paginación por cursor
+            models.Index(fields=['created_at', 'id'], name='book_created_at_id_idx'),
+            # Sirve la selección por año de las estadísticas
+            models.Index(fields=['published_date'], name='book_published_date_idx'),
+            # Sirve el filtro por género con el mismo orden
+            models.Index(fields=['genre', 'created_at', 'id'], name='book_genre_created_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.author}"
@@ -1,25 +1,212 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+
+from django.core.paginator import InvalidPage, Page, Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .utils.mongo import MongoConnection
+
+
+class CountedPaginator(DjangoPaginator):
+    """
+    Paginador de Django cuyo total ya fue calculado por MongoDB.
+
+    Evita que el paginador vuelva a contar los resultados cuando la
+    página y el total provienen de la misma agregación.
+    """
+
+    def __init__(self, object_list, per_page, count):
+        super().__init__(object_list, per_page)
+        self.__dict__['count'] = count
+
 
 class Pagination(PageNumberPagination):
     """
     Clase de paginación personalizada para la API.
-    
+
     Proporciona paginación con información adicional como total de páginas
     y enlaces de navegación.
     """
-    
+
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+    def get_aggregation_page(self, request):
+        """
+        Obtiene el número y tamaño de página solicitados para una agregación.
+
+        Args:
+            request: Objeto Request con los parámetros de paginación
+
+        Returns:
+            tuple: Número de página (desde 1, o None si se pidió la última
+            con 'last') y tamaño de página
+        """
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            return None, self.get_page_size(request)
+        try:
+            page_number = int(page_number)
+            if page_number < 1:
+                raise ValueError(page_number)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message)
+
+        return page_number, self.get_page_size(request)
+
+    def get_count_stage(self):
+        """
+        Construye la etapa que obtiene solo la rama 'total' de get_facet_stage.
+
+        Se usa para resolver la última página antes de pedirla.
+
+        Returns:
+            dict: Etapa $facet con la rama 'total'
+        """
+        return {'$facet': {'total': [{'$count': 'count'}]}}
+
+    def get_last_page(self, facet_result, page_size):
+        """
+        Obtiene el número de la última página a partir de la rama 'total'.
+
+        Args:
+            facet_result: Documento con la rama 'total', o None
+            page_size: Cantidad de resultados por página
+
+        Returns:
+            int: Número de la última página (1 si no hay resultados)
+        """
+        total = (facet_result or {}).get('total')
+        count = total[0]['count'] if total else 0
+        return CountedPaginator([], page_size, count).num_pages
+
+    def get_facet_stage(self, page_number, page_size, ranking=(), lookup=()):
+        """
+        Construye la etapa $facet que devuelve una página y el total en una sola consulta.
+
+        Args:
+            page_number: Número de página solicitado
+            page_size: Cantidad de resultados por página
+            ranking: Etapas de ordenamiento aplicadas solo a la rama de resultados
+            lookup: Etapas aplicadas a los documentos de la página ya recortada
+
+        Returns:
+            dict: Etapa $facet con las ramas 'results' y 'total'
+        """
+        return {
+            '$facet': {
+                'results': [
+                    *ranking,
+                    {'$skip': (page_number - 1) * page_size},
+                    {'$limit': page_size},
+                    *lookup
+                ],
+                'total': [{'$count': 'count'}]
+            }
+        }
+
+    def set_aggregation_page(self, facet_result, page_number, page_size, request):
+        """
+        Construye la página actual a partir del resultado de la etapa $facet.
+
+        Args:
+            facet_result: Documento con las ramas 'results' y 'total'
+            page_number: Número de página solicitado
+            page_size: Cantidad de resultados por página
+            request: Objeto Request usado para construir los enlaces
+
+        Returns:
+            list: Resultados de la página actual
+        """
+        results = facet_result['results']
+        total = facet_result['total']
+        count = total[0]['count'] if total else 0
+
+        paginator = CountedPaginator(results, page_size, count)
+        try:
+            self.page = Page(results, paginator.validate_number(page_number), paginator)
+        except InvalidPage:
+            raise NotFound(self.invalid_page_message)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return results
+
+    def paginate_aggregation(self, collection, pipeline, request, ranking=(), lookup=()):
+        """
+        Pagina un pipeline de agregación dentro de MongoDB.
+
+        Solo la página solicitada y el total de coincidencias viajan desde
+        MongoDB, por lo que la memoria depende del tamaño de página y no
+        de la cantidad de coincidencias.
+
+        Args:
+            collection: Colección de MongoDB sobre la que se ejecuta el pipeline
+            pipeline: Etapas que seleccionan los documentos coincidentes
+            request: Objeto Request con los parámetros de paginación
+            ranking: Etapas de ordenamiento aplicadas solo a la página
+            lookup: Etapas aplicadas a los documentos de la página ya recortada
+
+        Returns:
+            list: Resultados de la página actual
+        """
+        page_number, page_size = self.get_aggregation_page(request)
+        if page_number is None:
+            count_result = next(MongoConnection().aggregate(collection, [*pipeline, self.get_count_stage()]), None)
+            page_number = self.get_last_page(count_result, page_size)
+        facet = self.get_facet_stage(page_number, page_size, ranking, lookup)
+        facet_result = next(
+            MongoConnection().aggregate(collection, [*pipeline, facet]),
+            {'results': [], 'total': []}
+        )
+        return self.set_aggregation_page(facet_result, page_number, page_size, request)
+
+    def paginate_counted(self, count, fetch, request):
+        """
+        Pagina resultados cuyo total se conoce antes de obtener la página.
+
+        Args:
+            count: Cantidad total de resultados
+            fetch: Función (offset, limit) que devuelve los resultados de la página
+            request: Objeto Request con los parámetros de paginación
+
+        Returns:
+            list: Resultados de la página actual
+        """
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param, 1)
+        paginator = CountedPaginator([], page_size, count)
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+
+        try:
+            page_number = paginator.validate_number(page_number)
+        except InvalidPage:
+            raise NotFound(self.invalid_page_message)
+
+        results = fetch((page_number - 1) * page_size, page_size)
+        self.page = Page(results, page_number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return results
+
     def get_paginated_response(self, data):
         """
         Personaliza la respuesta de paginación incluyendo metadatos adicionales.
-        
+
         Args:
             data: Los datos a paginar
-            
+
         Returns:
             Response: Respuesta con metadatos de paginación y resultados
         """
@@ -31,4 +218,157 @@ class Pagination(PageNumberPagination):
             'total_pages': self.page.paginator.num_pages,
             'count': self.page.paginator.count,
             'results': data
-        }) 
\ No newline at end of file
+        })
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre created_at e id.
+
+    Cada página se obtiene buscando a partir del último libro de la
+    página anterior en lugar de usar OFFSET, por lo que las páginas
+    profundas cuestan lo mismo que la primera. No calcula el total.
+    Se activa con ?pagination=cursor o al enviar un cursor.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Cursor inválido'
+
+    @classmethod
+    def is_requested(cls, request):
+        """
+        Indica si la petición solicita paginación por cursor.
+
+        Args:
+            request: Objeto Request de la petición
+
+        Returns:
+            bool: True si se pidió el modo cursor
+        """
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in params
+
+    def get_page_size(self, request):
+        """
+        Obtiene el tamaño de página solicitado respetando el máximo permitido.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def encode_cursor(self, book, reverse):
+        """
+        Codifica la posición de un libro como un cursor opaco.
+
+        Args:
+            book: Libro que marca la posición
+            reverse: True si el cursor apunta a la página anterior
+
+        Returns:
+            str: Cursor codificado en base64
+        """
+        raw = f"{book.created_at.isoformat()}|{book.pk}|{int(reverse)}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        """
+        Decodifica el cursor recibido en la petición.
+
+        Args:
+            request: Objeto Request con el parámetro 'cursor'
+
+        Returns:
+            tuple: Posición (created_at, id) o None y si el cursor es inverso
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            created_at, pk, reverse = raw.split('|')
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError(raw)
+            return (created_at, int(pk)), reverse == '1'
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Obtiene la página siguiente o anterior a la posición del cursor.
+
+        Args:
+            queryset: Queryset de libros ya filtrado
+            request: Objeto Request con el cursor y el tamaño de página
+            view: Vista que solicita la paginación
+
+        Returns:
+            list: Libros de la página actual
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if position is None:
+            queryset = queryset.order_by('-created_at', '-id')
+        else:
+            created_at, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).order_by('created_at', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by('-created_at', '-id')
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1], False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[0], True))
+
+    def get_paginated_response(self, data):
+        """
+        Construye la respuesta con los enlaces de navegación y los resultados.
+
+        Args:
+            data: Los datos de la página
+
+        Returns:
+            Response: Respuesta con enlaces y resultados, sin total
+        """
+        return Response({
+            'links': {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link()
+            },
+            'results': data
+        })
@@ -0,0 +1,85 @@
+"""
+Renderizado JSON de las respuestas de la API con orjson.
+
+Produce los mismos bytes que el JSONRenderer de DRF con la
+configuración del proyecto (JSON compacto y UTF-8 sin escapar), pero
+codifica los resultados en C. Los tipos que orjson no conoce (Decimal,
+ObjectId, Decimal128, cadenas traducibles...) se delegan en el mismo
+codificador que usa DRF, por lo que no hace falta recorrer los
+resultados de MongoDB antes de responder.
+
+Las únicas diferencias posibles con DRF son de notación y no aparecen
+en las respuestas de la API: los float menores que 1e-4 o mayores que
+1e16 (0.00001 en lugar de 1e-05) y las zonas horarias con segundos en
+el desfase, que orjson redondea al minuto.
+"""
+import functools
+
+import orjson
+from bson import Decimal128, ObjectId
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .utils.metrics import request_phase
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+DECIMAL128_CACHE_SIZE = 16384
+
+
+@functools.lru_cache(maxsize=DECIMAL128_CACHE_SIZE)
+def decimal128_text(bid):
+    """
+    Representa un Decimal128 como texto a partir de su codificación binaria.
+
+    Convertir un Decimal128 a texto es mucho más lento que consultar la
+    caché, y los precios del catálogo se repiten entre respuestas.
+    """
+    return str(Decimal128.from_bid(bid))
+
+
+class MongoJSONEncoder(JSONEncoder):
+    """
+    Codificador JSON de DRF que además convierte los tipos de BSON a texto.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, Decimal128):
+            return decimal128_text(obj.bid)
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        return super().default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer de DRF implementado con orjson.
+
+    Las fechas en UTC terminan en 'Z', igual que con DRF. Las respuestas
+    con sangría (como las del navegador de la API), los ajustes de JSON
+    no compactos o no estrictos y los valores que orjson no admite, como
+    enteros de más de 64 bits, se renderizan con el JSONRenderer de DRF.
+    """
+
+    encoder_class = MongoJSONEncoder
+    default = staticmethod(MongoJSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with request_phase('render'):
+            return self.render_json(data, accepted_media_type, renderer_context)
+
+    def render_json(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (self.get_indent(accepted_media_type, renderer_context)
+                or not self.compact or self.ensure_ascii or not self.strict):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF, escapa U+2028 y U+2029 para poder incluir la respuesta en JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,96 @@
+from pymongo import ASCENDING, DESCENDING
+
+from .utils.mongo import MongoConnection
+
+BOOK_FIELDS = ['id', 'title', 'author', 'published_date', 'genre', 'price', 'created_at', 'updated_at']
+BOOK_PROJECTION = {'_id': 0, **{field: 1 for field in BOOK_FIELDS}}
+
+
+class BookRepository:
+    """
+    Acceso de solo lectura a la colección de libros usando pymongo.
+
+    Evita la traducción ORM → SQL → MongoDB de djongo en las lecturas más
+    frecuentes, proyectando solo los campos que expone la API.
+    """
+
+    def __init__(self, db=None):
+        db = db if db is not None else MongoConnection().db
+        self.collection = db['libros_book']
+
+    @staticmethod
+    def get_filter(genre=None):
+        """
+        Construye el filtro de libros equivalente a BookViewSet.get_queryset.
+
+        Args:
+            genre: Código de género a filtrar (opcional)
+
+        Returns:
+            dict: Filtro de MongoDB
+        """
+        return {'genre': genre} if genre else {}
+
+    def count(self, genre=None):
+        """
+        Cuenta los libros que cumplen el filtro.
+
+        Args:
+            genre: Código de género a filtrar (opcional)
+
+        Returns:
+            int: Cantidad de libros
+        """
+        return self.collection.count_documents(self.get_filter(genre))
+
+    def list(self, genre=None, offset=0, limit=10):
+        """
+        Obtiene una página de libros ordenada como Book.Meta.ordering.
+
+        Args:
+            genre: Código de género a filtrar (opcional)
+            offset: Cantidad de libros a omitir
+            limit: Cantidad máxima de libros a devolver
+
+        Returns:
+            list: Documentos de libros con los campos de BOOK_FIELDS
+        """
+        cursor = self.collection.find(
+            self.get_filter(genre), BOOK_PROJECTION
+        ).sort([('created_at', DESCENDING), ('id', DESCENDING)]).skip(offset).limit(limit)
+        return list(cursor)
+
+    def iterate(self, genre=None, batch_size=1000):
+        """
+        Recorre todos los libros con un cursor del servidor.
+
+        Los documentos llegan en lotes de batch_size, por lo que la
+        memoria no depende del tamaño del catálogo.
+
+        Args:
+            genre: Código de género a filtrar (opcional)
+            batch_size: Cantidad de documentos por lote del cursor
+
+        Returns:
+            Cursor: Cursor de pymongo ordenado por id
+        """
+        return self.collection.find(
+            self.get_filter(genre), BOOK_PROJECTION, batch_size=batch_size
+        ).sort('id', ASCENDING)
+
+    def get(self, pk, genre=None):
+        """
+        Obtiene un libro por su identificador.
+
+        Args:
+            pk: Identificador del libro
+            genre: Código de género a filtrar (opcional)
+
+        Returns:
+            dict: Documento del libro, o None si no existe o el id no es válido
+        """
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        return self.collection.find_one({**self.get_filter(genre), 'id': pk}, BOOK_PROJECTION)
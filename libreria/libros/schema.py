@@ -0,0 +1,100 @@
+"""
+Documentación OpenAPI de la API.
+
+Con API_SCHEMA_STATIC el esquema se genera una sola vez al construir la
+imagen (python manage.py spectacular --file schema.yml) y los workers lo
+sirven como archivo, sin importar drf_spectacular: sus decoradores se
+sustituyen por equivalentes que no hacen nada, ya que solo afectan a la
+generación del esquema. Sin API_SCHEMA_STATIC se usa drf_spectacular
+directamente, como en desarrollo.
+"""
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.views.generic import TemplateView
+
+SCHEMA_CONTENT_TYPE = 'application/vnd.oai.openapi; charset=utf-8'
+# Las mismas versiones que usa drf_spectacular sin API_SCHEMA_STATIC
+SWAGGER_UI_DIST = settings.SPECTACULAR_SETTINGS['SWAGGER_UI_DIST']
+REDOC_DIST = settings.SPECTACULAR_SETTINGS['REDOC_DIST']
+
+if settings.API_SCHEMA_STATIC:
+    def extend_schema(*args, **kwargs):
+        return lambda target: target
+
+    def extend_schema_view(**kwargs):
+        return lambda target: target
+
+    def OpenApiParameter(*args, **kwargs):
+        return None
+
+    class OpenApiTypes:
+        OBJECT = 'object'
+        STR = 'string'
+else:
+    from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+    from drf_spectacular.types import OpenApiTypes  # noqa: F401
+    from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view  # noqa: F401
+
+    class CachedJWTScheme(SimpleJWTScheme):
+        """
+        Documenta CachedJWTAuthentication igual que JWTAuthentication.
+        """
+        target_class = 'libros.authentication.CachedJWTAuthentication'
+
+
+def static_schema(request):
+    """
+    Sirve el esquema OpenAPI precalculado.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        FileResponse: Contenido de API_SCHEMA_FILE
+
+    Raises:
+        Http404: Si el esquema no fue generado
+    """
+    try:
+        schema = open(settings.API_SCHEMA_FILE, 'rb')
+    except FileNotFoundError:
+        raise Http404('El esquema OpenAPI no fue generado')
+    return FileResponse(schema, content_type=SCHEMA_CONTENT_TYPE)
+
+
+class SchemaDocsView(TemplateView):
+    """
+    Interfaz de documentación (Swagger UI o Redoc) que carga el esquema precalculado.
+    """
+
+    def get_context_data(self, **kwargs):
+        return {
+            **super().get_context_data(**kwargs),
+            'schema_url': reverse('schema'),
+            'swagger_ui_dist': SWAGGER_UI_DIST,
+            'redoc_dist': REDOC_DIST,
+        }
+
+
+def schema_urlpatterns():
+    """
+    Rutas de la documentación de la API según API_SCHEMA_STATIC.
+
+    Returns:
+        list: Rutas 'schema', 'swagger-ui' y 'redoc'
+    """
+    if settings.API_SCHEMA_STATIC:
+        return [
+            path('schema/', static_schema, name='schema'),
+            path('swagger/', SchemaDocsView.as_view(template_name='libros/swagger_ui.html'), name='swagger-ui'),
+            path('redoc/', SchemaDocsView.as_view(template_name='libros/redoc.html'), name='redoc'),
+        ]
+
+    from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+
+    return [
+        path('schema/', SpectacularAPIView.as_view(), name='schema'),
+        path('swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+        path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    ]
@@ -0,0 +1,547 @@
+import re
+import unicodedata
+from array import array
+from collections import namedtuple
+from datetime import timedelta
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import ASCENDING, DeleteMany, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from .models import Book
+from .utils.mongo import MongoConnection, naive_utc
+
+SEARCH_INDEX_COLLECTION = 'libros_search_index'
+FIELD_WEIGHTS = {'title': 3, 'author': 2, 'genre': 1}
+# Índices de la colección del índice invertido: (claves, opciones)
+SEARCH_INDEXES = [
+    ([('term', ASCENDING), ('book_id', ASCENDING)], {'unique': True}),
+    ([('book_id', ASCENDING)], {}),
+]
+GENRE_LABELS = dict(Book.GENRE_CHOICES)
+DUPLICATE_KEY_ERROR = 11000
+# Las reconstrucciones vuelven a indexar los libros modificados desde este
+# margen antes de comenzar, por las diferencias de reloj entre servidores
+REBUILD_OVERLAP = timedelta(minutes=1)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Límites de los rangos de precio de las facetas; el último rango es abierto
+FACET_PRICE_BOUNDARIES = (0, 10, 20, 30, 50, 100)
+
+SearchPlan = namedtuple('SearchPlan', ['collection', 'pipeline', 'ranking', 'lookup'])
+
+
+def normalize(text):
+    """
+    Normaliza un texto para la búsqueda eliminando acentos y mayúsculas.
+
+    Args:
+        text: Texto a normalizar
+
+    Returns:
+        str: Texto sin marcas diacríticas y en minúsculas
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    """
+    Divide un texto normalizado en términos de búsqueda.
+
+    Args:
+        text: Texto a dividir
+
+    Returns:
+        list: Términos normalizados en el orden en que aparecen
+    """
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def query_terms(text):
+    """
+    Obtiene los términos de una consulta descartando los redundantes.
+
+    Un término que es prefijo de otro término de la consulta queda
+    implícito en él, por lo que se descarta para que cada entrada del
+    índice coincida con un único término.
+
+    Args:
+        text: Consulta escrita por el usuario
+
+    Returns:
+        list: Términos únicos de la consulta
+    """
+    terms = list(dict.fromkeys(tokenize(text)))
+    return [
+        term for term in terms
+        if not any(other != term and other.startswith(term) for other in terms)
+    ]
+
+
+def genre_terms(genre):
+    """
+    Obtiene los términos de un género: su código y su nombre.
+
+    Args:
+        genre: Código del género (p. ej. 'FIC')
+
+    Returns:
+        list: Términos normalizados
+    """
+    genre = genre or ''
+    return tokenize(f"{genre} {GENRE_LABELS.get(genre, '')}")
+
+
+def book_postings(document):
+    """
+    Construye las entradas del índice invertido para un libro.
+
+    Args:
+        document: Documento de MongoDB con 'id', 'title', 'author' y 'genre'
+
+    Returns:
+        list: Una entrada por término con los campos en los que aparece
+    """
+    fields = {
+        'title': tokenize(document.get('title')),
+        'author': tokenize(document.get('author')),
+        'genre': genre_terms(document.get('genre')),
+    }
+
+    postings = {}
+    for field, terms in fields.items():
+        for term in terms:
+            posting = postings.setdefault(term, {
+                'term': term,
+                'book_id': document['id'],
+                'title': document.get('title'),
+                'in_title': 0,
+                'in_author': 0,
+                'in_genre': 0,
+            })
+            posting[f'in_{field}'] = 1
+    return list(postings.values())
+
+
+class RegexBookSearch:
+    """
+    Búsqueda mediante expresiones regulares sobre la colección de libros.
+
+    Recorre la colección completa en cada consulta; se conserva como
+    referencia para los benchmarks y como alternativa configurable.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else MongoConnection().db
+
+    def plan(self, search_term):
+        """
+        Construye el plan de búsqueda para un término.
+
+        Args:
+            search_term: Término de búsqueda
+
+        Returns:
+            SearchPlan: Colección y etapas del pipeline de búsqueda
+        """
+        pipeline = [
+            {
+                '$match': {
+                    '$or': [
+                        {'title': {'$regex': search_term, '$options': 'i'}},
+                        {'author': {'$regex': search_term, '$options': 'i'}},
+                        {'genre': {'$regex': search_term, '$options': 'i'}}
+                    ]
+                }
+            }
+        ]
+        ranking = [
+            {
+                '$addFields': {
+                    'score': {
+                        '$add': [
+                            {'$cond': [{'$regexMatch': {'input': '$title', 'regex': search_term, 'options': 'i'}}, 3, 0]},
+                            {'$cond': [{'$regexMatch': {'input': '$author', 'regex': search_term, 'options': 'i'}}, 2, 0]},
+                            {'$cond': [{'$regexMatch': {'input': '$genre', 'regex': search_term, 'options': 'i'}}, 1, 0]}
+                        ]
+                    }
+                }
+            },
+            {
+                '$sort': {
+                    'score': -1,
+                    'title': 1
+                }
+            }
+        ]
+        return SearchPlan(self.db['libros_book'], pipeline, ranking, [])
+
+
+class BookSearchIndex:
+    """
+    Índice invertido de términos para la búsqueda de libros.
+
+    Cada entrada relaciona un término normalizado con un libro e indica
+    si aparece en el título, el autor o el género, lo que permite
+    resolver las búsquedas con recorridos de índice por prefijo en lugar
+    de recorrer la colección completa.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else MongoConnection().db
+        self.books = self.db['libros_book']
+        self.postings = self.db[SEARCH_INDEX_COLLECTION]
+
+    def ensure_indexes(self, collection=None):
+        """
+        Crea los índices que necesita la colección del índice invertido.
+
+        Args:
+            collection: Colección a indexar (por defecto la del índice)
+        """
+        collection = collection if collection is not None else self.postings
+        for keys, options in SEARCH_INDEXES:
+            collection.create_index(keys, **options)
+
+    def index_books(self, ids):
+        """
+        Indexa o reindexa los libros indicados.
+
+        Las entradas se reemplazan por término y libro y luego se eliminan
+        los términos que el libro ya no tiene, por lo que dos
+        actualizaciones simultáneas del mismo libro no chocan con el
+        índice único. Los libros que ya no existen se eliminan del índice.
+
+        Args:
+            ids: Identificadores de los libros a indexar
+        """
+        ids = list(ids)
+        documents = self.books.find(
+            {'id': {'$in': ids}},
+            {'_id': 0, 'id': 1, 'title': 1, 'author': 1, 'genre': 1}
+        )
+        operations = []
+        found = set()
+        for document in documents:
+            postings = book_postings(document)
+            found.add(document['id'])
+            operations.extend(
+                ReplaceOne({'term': posting['term'], 'book_id': posting['book_id']}, posting, upsert=True)
+                for posting in postings
+            )
+            operations.append(DeleteMany({
+                'book_id': document['id'],
+                'term': {'$nin': [posting['term'] for posting in postings]}
+            }))
+        missing = [book_id for book_id in ids if book_id not in found]
+        if missing:
+            operations.append(DeleteMany({'book_id': {'$in': missing}}))
+        if not operations:
+            return
+        try:
+            self.postings.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Otro worker insertó la misma entrada al mismo tiempo
+            if any(error['code'] != DUPLICATE_KEY_ERROR for error in e.details['writeErrors']):
+                raise
+
+    def remove_books(self, ids):
+        """
+        Elimina del índice las entradas de los libros indicados.
+
+        Args:
+            ids: Identificadores de los libros a eliminar
+        """
+        self.postings.delete_many({'book_id': {'$in': list(ids)}})
+
+    def rebuild(self, batch_size=1000):
+        """
+        Reconstruye el índice completo a partir de la colección de libros.
+
+        El índice se construye en una colección temporal, con un nombre
+        propio de cada reconstrucción, que reemplaza a la actual al
+        finalizar, por lo que las búsquedas siguen funcionando mientras
+        tanto. Las escrituras hechas durante la construcción se aplicaron
+        al índice reemplazado, por lo que se vuelven a aplicar después
+        (ver catch_up).
+
+        Args:
+            batch_size: Cantidad de libros procesados por lote
+
+        Returns:
+            int: Cantidad de libros indexados
+        """
+        started = naive_utc() - REBUILD_OVERLAP
+        staging = self.db[f'{SEARCH_INDEX_COLLECTION}_rebuild_{ObjectId()}']
+        indexed = array('q')
+        try:
+            batch = []
+            documents = self.books.find(
+                {},
+                {'_id': 0, 'id': 1, 'title': 1, 'author': 1, 'genre': 1},
+                batch_size=batch_size
+            ).sort('id', ASCENDING)
+            for document in documents:
+                batch.extend(book_postings(document))
+                indexed.append(document['id'])
+                if len(indexed) % batch_size == 0:
+                    staging.insert_many(batch, ordered=False)
+                    batch = []
+            if batch:
+                staging.insert_many(batch, ordered=False)
+
+            self.ensure_indexes(staging)
+            staging.rename(SEARCH_INDEX_COLLECTION, dropTarget=True)
+        except Exception:
+            staging.drop()
+            raise
+
+        self.catch_up(indexed, started)
+        return len(indexed)
+
+    def catch_up(self, indexed, started):
+        """
+        Aplica al índice los cambios de los libros hechos durante una reconstrucción.
+
+        Vuelve a indexar los libros creados o modificados desde que
+        comenzó y elimina los libros indexados que ya no existen.
+
+        Args:
+            indexed: array con los ids indexados, en orden ascendente
+            started: Fecha (UTC) en que comenzó la reconstrucción
+        """
+        changed = [
+            document['id']
+            for document in self.books.find({'updated_at': {'$gte': started}}, {'_id': 0, 'id': 1})
+        ]
+        if changed:
+            self.index_books(changed)
+
+        # Recorre a la vez los ids indexados y los actuales, ambos ordenados
+        current = (document['id'] for document in self.books.find({}, {'_id': 0, 'id': 1}).sort('id', ASCENDING))
+        deleted = []
+        book_id = next(current, None)
+        for indexed_id in indexed:
+            while book_id is not None and book_id < indexed_id:
+                book_id = next(current, None)
+            if book_id != indexed_id:
+                deleted.append(indexed_id)
+        if deleted:
+            self.remove_books(deleted)
+
+    def plan(self, search_term):
+        """
+        Construye el plan de búsqueda para una consulta.
+
+        Un libro coincide cuando todos los términos de la consulta son
+        prefijo de algún término del libro. La puntuación conserva los
+        pesos título 3, autor 2 y género 1 por cada término encontrado.
+
+        Args:
+            search_term: Consulta escrita por el usuario
+
+        Returns:
+            SearchPlan: Colección y etapas del pipeline de búsqueda
+        """
+        terms = query_terms(search_term)
+        if terms:
+            match = {'$or': [{'term': {'$regex': f'^{re.escape(term)}'}} for term in terms]}
+        else:
+            match = {'term': {'$in': []}}
+
+        pipeline = [
+            {'$match': match},
+            {
+                '$addFields': {
+                    'query_term': {
+                        '$switch': {
+                            'branches': [
+                                {
+                                    'case': {'$eq': [{'$substrCP': ['$term', 0, len(term)]}, term]},
+                                    'then': position
+                                }
+                                for position, term in enumerate(terms)
+                            ],
+                            'default': None
+                        }
+                    }
+                }
+            },
+            {
+                '$group': {
+                    '_id': {'book_id': '$book_id', 'query_term': '$query_term'},
+                    'title': {'$first': '$title'},
+                    'in_title': {'$max': '$in_title'},
+                    'in_author': {'$max': '$in_author'},
+                    'in_genre': {'$max': '$in_genre'}
+                }
+            },
+            {
+                '$group': {
+                    '_id': '$_id.book_id',
+                    'title': {'$first': '$title'},
+                    'matched_terms': {'$sum': 1},
+                    'in_title': {'$sum': '$in_title'},
+                    'in_author': {'$sum': '$in_author'},
+                    'in_genre': {'$sum': '$in_genre'}
+                }
+            },
+            {'$match': {'matched_terms': len(terms)}}
+        ]
+        ranking = [
+            {
+                '$addFields': {
+                    'score': {
+                        '$add': [
+                            {'$multiply': [f'$in_{field}', weight]}
+                            for field, weight in FIELD_WEIGHTS.items()
+                        ]
+                    }
+                }
+            },
+            {
+                '$sort': {
+                    'score': -1,
+                    'title': 1,
+                    '_id': 1
+                }
+            }
+        ]
+        return SearchPlan(self.postings, pipeline, ranking, self.lookup_stages())
+
+    @staticmethod
+    def lookup_stages():
+        """
+        Construye las etapas que reemplazan cada resultado por su libro.
+
+        Returns:
+            list: Etapas que obtienen el libro de cada '_id' con su puntuación
+        """
+        return [
+            {
+                '$lookup': {
+                    'from': 'libros_book',
+                    'localField': '_id',
+                    'foreignField': 'id',
+                    'as': 'book'
+                }
+            },
+            {'$unwind': '$book'},
+            {'$addFields': {'book.score': '$score'}},
+            {'$replaceRoot': {'newRoot': '$book'}}
+        ]
+
+
+def facets_requested(params):
+    """
+    Indica si la búsqueda debe incluir las facetas (parámetro 'facets').
+
+    Args:
+        params: QueryDict de la petición
+
+    Returns:
+        bool: True si se pidió facets=true
+    """
+    return params.get('facets', '').lower() in ('1', 'true', 'yes')
+
+
+def search_facets_pipeline(plan):
+    """
+    Construye el pipeline que calcula las facetas de una búsqueda.
+
+    Recorre todas las coincidencias del plan una sola vez y cuenta en
+    paralelo, con $facet, los libros por género, por rango de precio y
+    por década de publicación.
+
+    Args:
+        plan: SearchPlan de la búsqueda
+
+    Returns:
+        list: Etapas del pipeline de agregación
+    """
+    return [
+        *plan.pipeline,
+        *plan.lookup,
+        {'$project': {'_id': 0, 'genre': 1, 'price': 1, 'published_date': 1}},
+        {
+            '$facet': {
+                'genres': [
+                    {'$group': {'_id': '$genre', 'count': {'$sum': 1}}}
+                ],
+                'prices': [
+                    {
+                        '$bucket': {
+                            'groupBy': '$price',
+                            'boundaries': list(FACET_PRICE_BOUNDARIES),
+                            # Los precios desde el último límite forman el rango abierto
+                            'default': FACET_PRICE_BOUNDARIES[-1],
+                            'output': {'count': {'$sum': 1}}
+                        }
+                    }
+                ],
+                'decades': [
+                    {'$addFields': {'year': {'$year': '$published_date'}}},
+                    {
+                        '$group': {
+                            '_id': {'$subtract': ['$year', {'$mod': ['$year', 10]}]},
+                            'count': {'$sum': 1}
+                        }
+                    },
+                    {'$sort': {'_id': 1}}
+                ]
+            }
+        }
+    ]
+
+
+def search_facets_result(facet_result):
+    """
+    Construye las facetas de la respuesta a partir del resultado de la agregación.
+
+    Los géneros y los rangos de precio se devuelven completos, con cero
+    coincidencias cuando corresponde, para que el cliente muestre siempre
+    las mismas opciones.
+
+    Args:
+        facet_result: Documento con las ramas 'genres', 'prices' y 'decades'
+
+    Returns:
+        dict: Cantidad de libros por género, por rango de precio y por década
+    """
+    facet_result = facet_result or {'genres': [], 'prices': [], 'decades': []}
+    genres = {entry['_id']: entry['count'] for entry in facet_result['genres']}
+    prices = {entry['_id']: entry['count'] for entry in facet_result['prices']}
+    bounds = [*FACET_PRICE_BOUNDARIES, None]
+
+    return {
+        'genres': [
+            {'code': code, 'label': label, 'count': genres.get(code, 0)}
+            for code, label in Book.GENRE_CHOICES
+        ],
+        'prices': [
+            {'min': low, 'max': high, 'count': prices.get(low, 0)}
+            for low, high in zip(bounds, bounds[1:])
+        ],
+        'decades': [
+            {'decade': int(entry['_id']), 'count': entry['count']}
+            for entry in facet_result['decades'] if entry['_id'] is not None
+        ],
+    }
+
+
+def get_search_backend(db=None):
+    """
+    Obtiene el motor de búsqueda configurado en BOOK_SEARCH_ENGINE.
+
+    Args:
+        db: Base de datos de MongoDB (por defecto la configurada en Django)
+
+    Returns:
+        BookSearchIndex | RegexBookSearch: Motor de búsqueda
+    """
+    if settings.BOOK_SEARCH_ENGINE == 'regex':
+        return RegexBookSearch(db)
+    return BookSearchIndex(db)
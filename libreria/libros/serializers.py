@@ -1,7 +1,59 @@
+from datetime import datetime
+from decimal import Context, Decimal
+from bson import Decimal128
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Book
+from .utils.metrics import request_phase
 
-class BookSerializer(serializers.ModelSerializer):
+PRICE_QUANTUM = Decimal('0.01')
+PRICE_CONTEXT = Context(prec=10)
+
+class TimedDataMixin:
+    """
+    Mide la construcción de serializer.data como fase 'serialize' de la petición.
+    """
+
+    @property
+    def data(self):
+        with request_phase('serialize'):
+            return super().data
+
+
+class BookListSerializer(TimedDataMixin, serializers.ListSerializer):
+    """
+    Serializador de listas de libros de solo lectura.
+
+    Construye la representación de cada libro con book_representation en
+    lugar de recorrer los campos de BookSerializer uno a uno, con el mismo
+    resultado. Acepta instancias de Book, documentos o diccionarios de
+    values() y tuplas de values_list() con los campos de BookSerializer.
+    La validación de escrituras sigue a cargo de BookSerializer.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        tz = timezone.get_current_timezone()
+        return [book_representation(self.as_document(item), tz) for item in iterable]
+
+    def as_document(self, item):
+        """
+        Obtiene los campos de un libro como diccionario.
+
+        Args:
+            item: Instancia de Book, diccionario o tupla de values_list()
+
+        Returns:
+            dict: Campos del libro por nombre
+        """
+        if isinstance(item, Book):
+            return item.__dict__
+        if isinstance(item, tuple):
+            return dict(zip(BookSerializer.Meta.fields, item))
+        return item
+
+class BookSerializer(TimedDataMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Book.
     
@@ -13,6 +65,74 @@ class BookSerializer(serializers.ModelSerializer):
         model = Book
         fields = ['id', 'title', 'author', 'published_date', 'genre', 'price', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+        list_serializer_class = BookListSerializer
+
+def format_price(value):
+    """
+    Representa un precio igual que el DecimalField de BookSerializer.
+    """
+    if isinstance(value, Decimal128):
+        value = value.to_decimal()
+    elif not isinstance(value, Decimal):
+        value = Decimal(str(value).strip())
+    return '{:f}'.format(value.quantize(PRICE_QUANTUM, context=PRICE_CONTEXT))
+
+
+def format_date(value):
+    """
+    Representa una fecha igual que el DateField de BookSerializer.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def format_datetime(value, tz=None):
+    """
+    Representa una fecha y hora igual que el DateTimeField de BookSerializer.
+
+    Las fechas sin zona horaria (como las que devuelve pymongo) se
+    interpretan en UTC, igual que hace djongo al leerlas. Al formatear
+    muchas fechas conviene pasar tz, ya que obtener la zona horaria
+    actual es más costoso que la conversión.
+    """
+    if not value:
+        return None
+    if tz is None:
+        tz = timezone.get_current_timezone()
+    if timezone.is_aware(value):
+        value = value.astimezone(tz)
+    else:
+        value = timezone.make_aware(value, timezone.utc).astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def book_representation(document, tz=None):
+    """
+    Convierte un documento de 'libros_book' en la representación de BookSerializer.
+
+    Args:
+        document: Documento obtenido con pymongo
+        tz: Zona horaria de las fechas (por defecto, la actual)
+
+    Returns:
+        dict: Los mismos campos y valores que produce BookSerializer
+    """
+    return {
+        'id': document['id'],
+        'title': document['title'],
+        'author': document['author'],
+        'published_date': format_date(document['published_date']),
+        'genre': document['genre'],
+        'price': format_price(document['price']),
+        'created_at': format_datetime(document.get('created_at'), tz),
+        'updated_at': format_datetime(document.get('updated_at'), tz),
+    }
 
 class BookStatItemSerializer(serializers.Serializer):
     """
@@ -22,7 +142,7 @@ class BookStatItemSerializer(serializers.Serializer):
     author = serializers.CharField()
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
 
-class BookStatsSerializer(serializers.Serializer):
+class BookStatsSerializer(TimedDataMixin, serializers.Serializer):
     """
     Serializador para las estadísticas de libros por año.
     """
@@ -31,4 +151,7 @@ class BookStatsSerializer(serializers.Serializer):
     min_price = serializers.DecimalField(max_digits=10, decimal_places=2)
     max_price = serializers.DecimalField(max_digits=10, decimal_places=2)
     total_books = serializers.IntegerField()
-    books = BookStatItemSerializer(many=True) 
\ No newline at end of file
+    page = serializers.IntegerField(required=False)
+    top = serializers.IntegerField(required=False)
+    total_pages = serializers.IntegerField(required=False)
+    books = BookStatItemSerializer(many=True, required=False)
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import bump_user_version, user_cache
+from .cache import bump_catalog_version
+from .fuzzy import TrigramIndex
+from .models import Book
+from .search import BookSearchIndex
+from .suggest import record_book_changes, suggest_index
+
+# Se envía cuando cambian libros del catálogo. Recibe 'ids' con los
+# identificadores afectados (None cuando se desconocen, como en una carga
+# masiva) y 'deleted' indicando si los libros fueron eliminados.
+books_changed = Signal()
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, **kwargs):
+    """
+    Notifica la creación o actualización de un libro.
+    """
+    books_changed.send(sender=Book, ids=[instance.pk], deleted=False)
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    """
+    Notifica la eliminación de un libro.
+    """
+    books_changed.send(sender=Book, ids=[instance.pk], deleted=True)
+
+
+@receiver(books_changed)
+def update_search_index(sender, ids, deleted=False, **kwargs):
+    """
+    Mantiene el índice de búsqueda sincronizado con el catálogo.
+    """
+    index = BookSearchIndex()
+    if ids is None:
+        index.rebuild()
+    elif deleted:
+        index.remove_books(ids)
+    else:
+        index.index_books(ids)
+
+
+@receiver(books_changed)
+def update_trigram_index(sender, ids, deleted=False, **kwargs):
+    """
+    Agrega al índice de trigramas los términos nuevos del catálogo.
+    """
+    index = TrigramIndex()
+    if ids is None:
+        index.rebuild()
+    elif not deleted:
+        index.index_books(ids)
+
+
+@receiver(books_changed)
+def update_suggest_index(sender, ids, deleted=False, **kwargs):
+    """
+    Aplica los cambios al índice de autocompletado de este worker y los
+    registra para los demás.
+    """
+    record_book_changes(ids)
+    if ids is None:
+        suggest_index.invalidate()
+    elif deleted:
+        suggest_index.remove_books(ids)
+    else:
+        suggest_index.update_books(ids)
+
+
+@receiver(books_changed)
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Invalida las respuestas en caché incrementando la versión del catálogo.
+    """
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Invalida el usuario en la caché de autenticación de todos los workers
+    al modificarlo o eliminarlo.
+    """
+    user_id = getattr(instance, jwt_settings.USER_ID_FIELD)
+    user_id = user_id if isinstance(user_id, int) else str(user_id)
+    bump_user_version(user_id)
+    user_cache.invalidate(user_id)
@@ -0,0 +1,141 @@
+import math
+from datetime import MAXYEAR, MINYEAR, datetime
+
+STATS_PAGE_SIZE = 10
+STATS_MAX_PAGE_SIZE = 100
+
+
+def parse_stats_params(params):
+    """
+    Valida los parámetros de la consulta de estadísticas.
+
+    Args:
+        params: QueryDict con 'year' y, opcionalmente, 'page', 'top' y 'summary'
+
+    Returns:
+        tuple: Año, página, libros por página (limitado al máximo) y si
+        solo se pide el resumen
+
+    Raises:
+        ValueError: Con el mensaje de error para el cliente
+    """
+    year = params.get('year')
+    if not year or not year.isdigit():
+        raise ValueError('Year parameter is required and must be a number')
+
+    try:
+        page = int(params.get('page', 1))
+        top = int(params.get('top', STATS_PAGE_SIZE))
+        if page < 1 or top < 1:
+            raise ValueError(page, top)
+    except ValueError:
+        raise ValueError('Page and top parameters must be positive numbers')
+
+    summary_only = params.get('summary', '').lower() in ('1', 'true', 'yes')
+    return int(year), page, min(top, STATS_MAX_PAGE_SIZE), summary_only
+
+
+def year_range(year):
+    """
+    Obtiene el rango de fechas de publicación que corresponde a un año.
+
+    djongo guarda los DateField como fechas a medianoche en UTC, por lo que
+    el rango [1 de enero, 1 de enero del año siguiente) puede resolverse
+    con el índice de published_date.
+
+    Args:
+        year: Año de publicación
+
+    Returns:
+        dict: Condición de rango para published_date (vacía si el año no es representable)
+    """
+    if not MINYEAR <= year <= MAXYEAR:
+        return {'$gte': datetime.min, '$lt': datetime.min}
+
+    start = datetime(year, 1, 1)
+    end = datetime(year + 1, 1, 1) if year < MAXYEAR else datetime.max
+    return {'$gte': start, '$lt': end}
+
+
+def book_stats_pipeline(year, page=1, top=STATS_PAGE_SIZE, summary_only=False):
+    """
+    Construye el pipeline de estadísticas de libros para un año.
+
+    El filtro por rango de fechas va primero para aprovechar el índice.
+    Los agregados se calculan con $group sin acumular los libros, y solo
+    la página de los libros más caros se ordena y se devuelve.
+
+    Args:
+        year: Año de publicación
+        page: Página del listado de libros (desde 1)
+        top: Cantidad de libros por página, ordenados por precio descendente
+        summary_only: Si es True no se incluye el listado de libros
+
+    Returns:
+        list: Etapas del pipeline de agregación
+    """
+    facet = {
+        'summary': [
+            {
+                '$group': {
+                    '_id': None,
+                    'average_price': {'$avg': '$price'},
+                    'min_price': {'$min': '$price'},
+                    'max_price': {'$max': '$price'},
+                    'total_books': {'$sum': 1}
+                }
+            },
+            {
+                '$project': {
+                    '_id': 0,
+                    'average_price': {'$round': ['$average_price', 2]},
+                    'min_price': 1,
+                    'max_price': 1,
+                    'total_books': 1
+                }
+            }
+        ]
+    }
+    if not summary_only:
+        facet['books'] = [
+            {'$sort': {'price': -1, '_id': 1}},
+            {'$skip': (page - 1) * top},
+            {'$limit': top},
+            {'$project': {'_id': 0, 'title': 1, 'author': 1, 'price': 1}}
+        ]
+
+    return [
+        {
+            '$match': {
+                'published_date': year_range(year)
+            }
+        },
+        {'$facet': facet}
+    ]
+
+
+def book_stats_result(facet_result, year, page=1, top=STATS_PAGE_SIZE):
+    """
+    Construye la respuesta de estadísticas a partir del resultado de la agregación.
+
+    Args:
+        facet_result: Documento con las ramas 'summary' y opcionalmente 'books'
+        year: Año de publicación
+        page: Página del listado de libros
+        top: Cantidad de libros por página
+
+    Returns:
+        dict: Estadísticas del año, o None si no hay libros
+    """
+    if not facet_result or not facet_result['summary']:
+        return None
+
+    stats = {'year': year, **facet_result['summary'][0]}
+    if 'books' in facet_result:
+        stats.update({
+            'page': page,
+            'top': top,
+            'total_pages': math.ceil(stats['total_books'] / top),
+            'books': facet_result['books'],
+        })
+    return stats
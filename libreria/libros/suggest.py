@@ -0,0 +1,476 @@
+"""
+Índice de prefijos en memoria para el autocompletado de la búsqueda.
+
+El índice es un vocabulario con los términos normalizados del título y
+el autor de todos los libros, ordenado para resolver cada prefijo con
+bisect, y la cantidad de libros en que aparece cada término. Las
+sugerencias son los términos del prefijo con más libros.
+
+Cada worker lo mantiene al día aplicando los libros modificados que
+registra la colección 'libros_book_changes', sin volver a leer el catálogo.
+
+Para ocupar poca memoria, los términos se guardan una sola vez y el resto
+de estructuras son arrays de enteros: las frecuencias, el orden
+alfabético y los términos de cada libro, que permiten descontar los
+términos anteriores al modificar o eliminar un libro.
+"""
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from pymongo import ASCENDING
+
+from .search import normalize, tokenize
+from .utils.mongo import MongoConnection, naive_utc
+
+BOOK_CHANGES_COLLECTION = 'libros_book_changes'
+# Los cambios se conservan un día; un índice más antiguo se reconstruye
+BOOK_CHANGES_RETENTION = timedelta(days=1)
+# Índices de la colección de cambios: (claves, opciones)
+BOOK_CHANGES_INDEXES = [
+    ([('at', ASCENDING)], {'expireAfterSeconds': int(BOOK_CHANGES_RETENTION.total_seconds())}),
+]
+# Ids por documento de cambios y por lote aplicado al índice
+BOOK_CHANGES_BATCH = 1000
+# Cada actualización vuelve a aplicar los cambios de este margen anterior,
+# por las diferencias de reloj entre servidores
+SUGGEST_REFRESH_OVERLAP = timedelta(minutes=1)
+
+SUGGEST_MAX_RESULTS = 10
+# Los prefijos de hasta esta longitud guardan su resultado hasta que cambia
+# alguno de sus términos; los más largos abarcan pocos términos
+SUGGEST_MEMO_PREFIX = 3
+
+_WORD_RE = re.compile(r'\w+')
+_PREFIX_END = '\U0010ffff'
+
+
+def record_book_changes(ids):
+    """
+    Registra los libros modificados para que los demás workers los apliquen.
+
+    Args:
+        ids: Identificadores de los libros creados, modificados o
+            eliminados, o None si cambió todo el catálogo
+    """
+    collection = MongoConnection().get_collection(BOOK_CHANGES_COLLECTION)
+    at = naive_utc()
+    if ids is None:
+        collection.insert_one({'ids': None, 'at': at})
+        return
+    ids = list(ids)
+    collection.insert_many([
+        {'ids': ids[start:start + BOOK_CHANGES_BATCH], 'at': at}
+        for start in range(0, len(ids), BOOK_CHANGES_BATCH)
+    ])
+
+
+def changed_books(since):
+    """
+    Obtiene los libros modificados desde una fecha.
+
+    Args:
+        since: Fecha en UTC sin zona horaria
+
+    Returns:
+        set: Ids de los libros, o None si cambió todo el catálogo
+    """
+    collection = MongoConnection().get_collection(BOOK_CHANGES_COLLECTION)
+    ids = set()
+    for document in collection.find({'at': {'$gte': since - SUGGEST_REFRESH_OVERLAP}}, {'_id': 0, 'ids': 1}):
+        if document.get('ids') is None:
+            return None
+        ids.update(document['ids'])
+    return ids
+
+
+def book_terms(document, normalized=None):
+    """
+    Obtiene los términos del título y el autor de un libro.
+
+    Args:
+        document: Documento con 'title' y 'author'
+        normalized: dict opcional palabra -> término normalizado que se
+            reutiliza entre libros (las palabras se repiten mucho)
+
+    Returns:
+        dict: Forma con la que se muestra cada término, por término normalizado
+    """
+    terms = {}
+    for field in ('title', 'author'):
+        for word in _WORD_RE.findall(document.get(field) or ''):
+            if normalized is None:
+                term = normalize(word)
+            else:
+                term = normalized.get(word)
+                if term is None:
+                    term = normalized[word] = normalize(word)
+            if term and term not in terms:
+                # Sin copia cuando la forma original ya está normalizada
+                terms[term] = term if word == term else word
+    return terms
+
+
+class PrefixIndex:
+    """
+    Vocabulario ordenado con las frecuencias y los términos de cada libro.
+
+    Los identificadores de término son estables (orden de aparición);
+    sorted_terms y sorted_ids mantienen el orden alfabético. Los libros
+    se guardan como un array de ids ordenado con los términos de todos
+    ellos concatenados; los libros modificados fuera de ese orden se
+    guardan aparte, en overrides.
+    """
+
+    def __init__(self):
+        self.terms = []
+        self.labels = []
+        self.counts = array('I')
+        self.sorted_terms = []
+        self.sorted_ids = array('I')
+        self.book_ids = array('q')
+        self.offsets = array('I', [0])
+        self.book_terms = array('I')
+        self.overrides = {}
+        self.memo = {}
+        self.book_count = 0
+
+    @classmethod
+    def build(cls, documents):
+        """
+        Construye el índice a partir de los libros ordenados por id.
+
+        Args:
+            documents: Documentos con 'id', 'title' y 'author'
+
+        Returns:
+            PrefixIndex: Índice construido
+        """
+        index = cls()
+        term_ids = {}
+        normalized = {}
+        counts, flat = index.counts, index.book_terms
+        for document in documents:
+            for term, label in book_terms(document, normalized).items():
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = term_ids[term] = len(index.terms)
+                    index.terms.append(term)
+                    index.labels.append(label)
+                    counts.append(0)
+                counts[term_id] += 1
+                flat.append(term_id)
+            index.book_ids.append(document['id'])
+            index.offsets.append(len(flat))
+        index.book_count = len(index.book_ids)
+
+        order = sorted(range(len(index.terms)), key=index.terms.__getitem__)
+        index.sorted_terms = [index.terms[term_id] for term_id in order]
+        index.sorted_ids = array('I', order)
+        return index
+
+    def term_id(self, term, label):
+        """
+        Obtiene el identificador de un término, agregándolo si es nuevo.
+        """
+        position = bisect_left(self.sorted_terms, term)
+        if position < len(self.sorted_terms) and self.sorted_terms[position] == term:
+            return self.sorted_ids[position]
+
+        term_id = len(self.terms)
+        self.terms.append(term)
+        self.labels.append(label)
+        self.counts.append(0)
+        self.sorted_terms.insert(position, term)
+        self.sorted_ids.insert(position, term_id)
+        return term_id
+
+    def get_book(self, book_id):
+        """
+        Obtiene los identificadores de término de un libro.
+
+        Returns:
+            tuple: Términos del libro (vacío si no está indexado)
+        """
+        if book_id in self.overrides:
+            return self.overrides[book_id]
+        position = bisect_left(self.book_ids, book_id)
+        if position < len(self.book_ids) and self.book_ids[position] == book_id:
+            return tuple(self.book_terms[self.offsets[position]:self.offsets[position + 1]])
+        return ()
+
+    def set_book(self, book_id, terms):
+        """
+        Reemplaza los términos de un libro actualizando las frecuencias.
+
+        Args:
+            book_id: Identificador del libro
+            terms: dict de book_terms, vacío si el libro se eliminó
+        """
+        old = self.get_book(book_id)
+        if not old and not terms:
+            return
+        new = tuple(self.term_id(term, label) for term, label in terms.items())
+        for term_id in old:
+            self.counts[term_id] -= 1
+        for term_id in new:
+            self.counts[term_id] += 1
+        for term_id in {*old, *new}:
+            term = self.terms[term_id]
+            for length in range(1, SUGGEST_MEMO_PREFIX + 1):
+                self.memo.pop(term[:length], None)
+
+        self.book_count += bool(new) - bool(old)
+        if new and not old and book_id not in self.overrides and (not self.book_ids or book_id > self.book_ids[-1]):
+            # Los libros nuevos tienen ids crecientes y se agregan al final
+            self.book_ids.append(book_id)
+            self.book_terms.extend(new)
+            self.offsets.append(len(self.book_terms))
+        else:
+            self.overrides[book_id] = new
+
+    def rank(self, prefix):
+        """
+        Obtiene los términos del prefijo con más libros.
+
+        Returns:
+            list: Hasta SUGGEST_MAX_RESULTS identificadores de término; a
+            igual frecuencia, en orden alfabético
+        """
+        low = bisect_left(self.sorted_terms, prefix)
+        high = bisect_left(self.sorted_terms, prefix + _PREFIX_END, low)
+        top = heapq.nlargest(SUGGEST_MAX_RESULTS, self.sorted_ids[low:high], key=self.counts.__getitem__)
+        return [term_id for term_id in top if self.counts[term_id]]
+
+    def suggest(self, prefix, limit):
+        """
+        Obtiene las sugerencias para un prefijo normalizado.
+
+        Returns:
+            list: Pares (término, cantidad de libros)
+        """
+        if len(prefix) > SUGGEST_MEMO_PREFIX:
+            top = self.rank(prefix)
+        else:
+            top = self.memo.get(prefix)
+            if top is None:
+                top = self.rank(prefix)
+                if top:
+                    # Solo los prefijos existentes, para que la memoria no dependa de las consultas
+                    self.memo[prefix] = top
+        return [(self.labels[term_id], self.counts[term_id]) for term_id in top[:limit]]
+
+    def memory_bytes(self):
+        """
+        Estima la memoria que ocupa el índice.
+
+        Returns:
+            int: Bytes de los términos, las listas y los arrays
+        """
+        strings = sum(map(sys.getsizeof, self.terms))
+        strings += sum(sys.getsizeof(label) for label, term in zip(self.labels, self.terms) if label is not term)
+        containers = sum(map(sys.getsizeof, (
+            self.terms, self.labels, self.counts, self.sorted_terms, self.sorted_ids,
+            self.book_ids, self.offsets, self.book_terms, self.overrides, self.memo
+        )))
+        overrides = sum(map(sys.getsizeof, self.overrides.values()))
+        memo = sum(map(sys.getsizeof, self.memo.values()))
+        return strings + containers + overrides + memo
+
+
+class SuggestIndex:
+    """
+    Índice de autocompletado de un worker.
+
+    Nunca se construye durante una petición. El proceso maestro de
+    gunicorn lo construye antes de crear los workers (ver
+    gunicorn.conf.py), que lo heredan ya construido y compartido por
+    copy-on-write. Sin él, la primera consulta inicia la construcción en
+    segundo plano.
+
+    Las escrituras de este worker se aplican al momento (ver
+    signals.update_suggest_index). Las de otros workers, en segundo plano
+    cada SUGGEST_INDEX_MAX_AGE segundos: se vuelven a leer solo los libros
+    registrados en la colección de cambios desde la última actualización.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.synced_at = None
+        self.built_at = 0.0
+        self.reset()
+
+    def reset(self):
+        """
+        Crea de nuevo los locks.
+
+        Se llama también en el proceso hijo después de un fork, donde los
+        heredados podrían haber quedado tomados por otro hilo del padre.
+        """
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.refreshing = False
+
+    def load(self):
+        """
+        Construye un índice nuevo con todos los libros.
+
+        Returns:
+            tuple: Índice y fecha (UTC) desde la que faltan los cambios
+        """
+        synced_at = naive_utc()
+        books = MongoConnection().get_collection('libros_book')
+        documents = books.find({}, {'_id': 0, 'id': 1, 'title': 1, 'author': 1}, batch_size=5000).sort('id', 1)
+        return PrefixIndex.build(documents), synced_at
+
+    def rebuild(self):
+        """
+        Reemplaza el índice por uno nuevo; se llama con _build_lock tomado.
+        """
+        index, synced_at = self.load()
+        with self._lock:
+            self.index, self.synced_at = index, synced_at
+        self.built_at = time.monotonic()
+
+    def build(self):
+        """
+        Construye el índice completo.
+
+        Mientras tanto se sigue consultando el índice anterior.
+        """
+        with self._build_lock:
+            self.rebuild()
+
+    def ensure_built(self):
+        """
+        Programa la actualización del índice en segundo plano si aún no
+        existe o pasaron SUGGEST_INDEX_MAX_AGE segundos desde la anterior.
+        """
+        stale = self.index is None or time.monotonic() - self.built_at > settings.SUGGEST_INDEX_MAX_AGE
+        if stale and not self.refreshing:
+            self.refreshing = True
+            threading.Thread(target=self.refresh, name='suggest-refresh', daemon=True).start()
+
+    def refresh(self):
+        """
+        Aplica los cambios registrados desde la última actualización.
+
+        Reconstruye el índice completo si no existe, si cambió todo el
+        catálogo o si los cambios pendientes ya no se conservan.
+        """
+        try:
+            with self._build_lock:
+                started = naive_utc()
+                ids = None
+                if self.index is not None and self.synced_at is not None and (
+                    started - self.synced_at < BOOK_CHANGES_RETENTION - SUGGEST_REFRESH_OVERLAP
+                ):
+                    ids = changed_books(self.synced_at)
+                if ids is None:
+                    self.rebuild()
+                else:
+                    self.update_books(ids)
+                    self.synced_at = started
+                    self.built_at = time.monotonic()
+        finally:
+            self.refreshing = False
+
+    def suggest(self, text, limit=SUGGEST_MAX_RESULTS):
+        """
+        Obtiene las sugerencias para completar la última palabra de un texto.
+
+        Args:
+            text: Texto escrito por el usuario
+            limit: Cantidad máxima de sugerencias
+
+        Returns:
+            list: Pares (término, cantidad de libros) ordenados por
+            frecuencia, o None si el índice aún se está construyendo
+        """
+        terms = tokenize(text)
+        if not terms:
+            return []
+        self.ensure_built()
+        with self._lock:
+            index = self.index
+            if index is None:
+                return None
+            return index.suggest(terms[-1], limit)
+
+    def update_books(self, ids):
+        """
+        Vuelve a indexar los libros creados, modificados o eliminados.
+
+        Los libros se leen por lotes antes de tomar el lock, para que las
+        consultas no esperen a MongoDB.
+
+        Args:
+            ids: Identificadores de los libros
+        """
+        if self.index is None:
+            return
+        books = MongoConnection().get_collection('libros_book')
+        ids = list(ids)
+        for start in range(0, len(ids), BOOK_CHANGES_BATCH):
+            batch = ids[start:start + BOOK_CHANGES_BATCH]
+            documents = list(books.find({'id': {'$in': batch}}, {'_id': 0, 'id': 1, 'title': 1, 'author': 1}))
+            found = {document['id']: book_terms(document) for document in documents}
+            with self._lock:
+                for book_id in batch:
+                    # Los que ya no existen se descuentan
+                    self.index.set_book(book_id, found.get(book_id, {}))
+
+    def remove_books(self, ids):
+        """
+        Descuenta los términos de los libros eliminados.
+
+        Args:
+            ids: Identificadores de los libros
+        """
+        if self.index is None:
+            return
+        with self._lock:
+            for book_id in ids:
+                self.index.set_book(book_id, {})
+
+    def invalidate(self):
+        """
+        Marca el índice como desactualizado, por ejemplo tras una carga masiva.
+
+        El índice actual se sigue consultando hasta que la próxima
+        consulta lo reconstruye en segundo plano.
+        """
+        with self._lock:
+            self.synced_at = None
+            self.built_at = float('-inf')
+
+    def stats(self):
+        """
+        Obtiene el tamaño del índice de este worker.
+
+        Returns:
+            dict: Libros y términos indexados, memoria estimada y antigüedad
+        """
+        with self._lock:
+            index = self.index
+            if index is None:
+                return {'built': False}
+            return {
+                'built': True,
+                'books': index.book_count,
+                'terms': len(index.terms),
+                'memory_bytes': index.memory_bytes(),
+                'age_seconds': round(time.monotonic() - self.built_at, 1),
+            }
+
+
+suggest_index = SuggestIndex()
+
+os.register_at_fork(after_in_child=suggest_index.reset)
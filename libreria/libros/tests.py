@@ -1,10 +1,16 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.core.management import call_command
+from io import StringIO
+import json
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from .models import Book
+from .search import BookSearchIndex
+from .fuzzy import TrigramIndex
 from datetime import datetime
 from decimal import Decimal
 
@@ -58,6 +64,10 @@ class BookAPITests(APITestCase):
             )
         ]
 
+        # El flush entre pruebas no conoce los índices de búsqueda
+        BookSearchIndex().rebuild()
+        TrigramIndex().rebuild()
+
     def test_search_books(self):
         """
         Prueba la funcionalidad de búsqueda de libros.
@@ -82,6 +92,72 @@ class BookAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_search_pagination(self):
+        """
+        Prueba la paginación de los resultados de búsqueda.
+
+        Verifica que el total se calcule sobre todas las coincidencias
+        mientras que solo se devuelve la página solicitada.
+        """
+        url = reverse('book-search')
+        response = self.client.get(url, {'q': 'John', 'page_size': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['total_pages'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['links']['next'])
+
+        # La última página se resuelve a partir del total
+        response = self.client.get(url, {'q': 'John', 'page_size': 1, 'page': 'last'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['links']['next'])
+        self.assertIsNotNone(response.data['links']['previous'])
+
+        # Página fuera de rango
+        response = self.client.get(url, {'q': 'John', 'page_size': 1, 'page': 3})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_index_maintenance(self):
+        """
+        Prueba que el índice de búsqueda se mantenga actualizado.
+
+        Verifica que la búsqueda ignore acentos y que refleje la
+        creación, actualización y eliminación de libros.
+        """
+        url = reverse('book-search')
+        list_url = reverse('book-list')
+        response = self.client.post(list_url, {
+            'title': 'Cien años de soledad',
+            'author': 'Gabriel García Márquez',
+            'published_date': '1967-05-30',
+            'genre': 'FIC',
+            'price': '25.00'
+        })
+        book_id = response.data['id']
+
+        response = self.client.get(url, {'q': 'garcia marquez'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['score'], 4)
+
+        # Actualización
+        self.client.patch(f"{list_url}{book_id}/", {'title': 'El otoño del patriarca'})
+        response = self.client.get(url, {'q': 'soledad'})
+        self.assertEqual(response.data['count'], 0)
+        response = self.client.get(url, {'q': 'otono'})
+        self.assertEqual(response.data['count'], 1)
+
+        # Reindexar el mismo libro otra vez no choca con el índice único
+        BookSearchIndex().index_books([book_id])
+        response = self.client.get(url, {'q': 'otono'})
+        self.assertEqual(response.data['count'], 1)
+
+        # Eliminación
+        self.client.delete(f"{list_url}{book_id}/")
+        response = self.client.get(url, {'q': 'garcia'})
+        self.assertEqual(response.data['count'], 0)
+
     def test_book_statistics(self):
         """
         Prueba la funcionalidad de estadísticas de libros.
@@ -109,6 +185,35 @@ class BookAPITests(APITestCase):
         response = self.client.get(url, {'year': 'invalid'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_book_statistics_listing(self):
+        """
+        Prueba el listado paginado de libros en las estadísticas.
+
+        Verifica que los libros se devuelvan por precio descendente en
+        páginas de tamaño 'top' y que el modo resumen los omita.
+        """
+        url = reverse('book-stats')
+
+        response = self.client.get(url, {'year': '2023', 'top': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_books'], 2)
+        self.assertEqual(response.data['total_pages'], 2)
+        self.assertEqual(len(response.data['books']), 1)
+        self.assertEqual(response.data['books'][0]['title'], 'Django Master')
+
+        response = self.client.get(url, {'year': '2023', 'top': '1', 'page': '2'})
+        self.assertEqual(response.data['books'][0]['title'], 'Python Programming')
+
+        # Solo el resumen
+        response = self.client.get(url, {'year': '2023', 'summary': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_books'], 2)
+        self.assertNotIn('books', response.data)
+
+        # Parámetros inválidos
+        response = self.client.get(url, {'year': '2023', 'top': '0'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_authentication_required(self):
         """
         Prueba que los endpoints requieran autenticación.
@@ -215,3 +320,570 @@ class BookAPITests(APITestCase):
             response = self.client.get(url, {'genre': genre})
             for book in response.data['results']:
                 self.assertEqual(book['genre'], genre)
+
+    def test_cursor_pagination(self):
+        """
+        Prueba la paginación por cursor del listado de libros.
+
+        Verifica que los cursores recorran todos los libros sin repetir
+        ni omitir resultados y que la respuesta no incluya el total.
+        """
+        url = reverse('book-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['links']['previous'])
+        first_page = [book['id'] for book in response.data['results']]
+
+        response = self.client.get(response.data['links']['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['links']['next'])
+        seen = first_page + [book['id'] for book in response.data['results']]
+        self.assertCountEqual(seen, [book.id for book in self.books])
+
+        # Volver a la página anterior
+        response = self.client.get(response.data['links']['previous'])
+        self.assertEqual([book['id'] for book in response.data['results']], first_page)
+
+        # Cursor inválido
+        response = self.client.get(url, {'cursor': 'invalido'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_response_cache(self):
+        """
+        Prueba la caché de respuestas de búsqueda.
+
+        Verifica que una búsqueda repetida se sirva desde la caché y que
+        una escritura invalide las respuestas guardadas.
+        """
+        url = reverse('book-search')
+        response = self.client.get(url, {'q': 'Django'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        response = self.client.get(url, {'q': 'Django'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 1)
+
+        # Una escritura invalida la caché
+        self.client.post(reverse('book-list'), {
+            'title': 'Django Avanzado',
+            'author': 'Jane Smith',
+            'published_date': '2023-06-01',
+            'genre': 'PRO',
+            'price': '44.99'
+        })
+        response = self.client.get(url, {'q': 'Django'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_conditional_get(self):
+        """
+        Prueba las peticiones GET condicionales.
+
+        Verifica que el listado y el detalle respondan 304 cuando la
+        copia del cliente está vigente y 200 después de una escritura.
+        """
+        url = reverse('book-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        detail_url = f"{url}{self.books[0].id}/"
+        response = self.client.get(detail_url)
+        detail_etag = response['ETag']
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # El filtro por género forma parte del validador: otro género da 404
+        response = self.client.get(detail_url, {'genre': 'FIC'}, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(detail_url, {'genre': 'FIC'}, HTTP_IF_MODIFIED_SINCE='Sun, 01 Jan 2090 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Una escritura cambia los validadores
+        self.client.patch(detail_url, {'price': '31.99'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_native_reads(self):
+        """
+        Prueba las lecturas nativas con pymongo del listado y el detalle.
+
+        Verifica que las respuestas sean idénticas a las del ORM.
+        """
+        url = reverse('book-list')
+        detail_url = f"{url}{self.books[0].id}/"
+        requests = [
+            (url, {}),
+            (url, {'genre': 'PRO'}),
+            (url, {'page': 2, 'page_size': 2}),
+            (url, {'page': 'last', 'page_size': 2}),
+            (detail_url, {}),
+        ]
+        for request_url, params in requests:
+            orm_response = self.client.get(request_url, params)
+            with override_settings(BOOKS_NATIVE_READS=True):
+                native_response = self.client.get(request_url, params)
+            self.assertEqual(native_response.status_code, orm_response.status_code)
+            self.assertEqual(native_response.json(), orm_response.json())
+
+        with override_settings(BOOKS_NATIVE_READS=True):
+            response = self.client.get(url, {'page': 99})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            response = self.client.get(f"{url}999999/")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_operations(self):
+        """
+        Prueba la creación, actualización y eliminación de libros en lote.
+
+        Verifica que los elementos válidos se escriban, que los inválidos
+        se informen por posición y que el índice de búsqueda se actualice.
+        """
+        url = reverse('book-bulk')
+        book = {
+            'title': 'Flask en Lote',
+            'author': 'Ana Pérez',
+            'published_date': '2022-03-01',
+            'genre': 'PRO',
+            'price': '25.00'
+        }
+
+        response = self.client.post(url, [book, {**book, 'genre': 'XXX'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('genre', response.data['errors'][0]['errors'])
+        created_id = response.data['results'][0]['id']
+        self.assertEqual(Book.objects.get(id=created_id).price, Decimal('25.00'))
+
+        response = self.client.get(reverse('book-search'), {'q': 'Flask'})
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.patch(url, [
+            {'id': created_id, 'price': '27.50'},
+            {'id': 999999, 'price': '10.00'}
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['status'], 'updated')
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertEqual(Book.objects.get(id=created_id).price, Decimal('27.50'))
+
+        response = self.client.delete(url, {'ids': [created_id, self.books[0].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(Book.objects.count(), 2)
+
+        # Una petición sin elementos válidos se rechaza
+        response = self.client.post(url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seed_books(self):
+        """
+        Prueba la generación de libros con el comando seed_books.
+
+        Verifica que la misma semilla genere los mismos libros tanto por
+        el ORM como por la inserción directa con pymongo.
+        """
+        last_id = max(book.id for book in self.books)
+        call_command('seed_books', 5, seed=7, chunk_size=2, stdout=StringIO())
+        call_command('seed_books', 5, seed=7, chunk_size=2, direct=True, stdout=StringIO())
+
+        books = list(Book.objects.filter(id__gt=last_id).order_by('id'))
+        self.assertEqual(len(books), 10)
+        orm_books = [(book.title, book.author, book.price) for book in books[:5]]
+        direct_books = [(book.title, book.author, book.price) for book in books[5:]]
+        self.assertEqual(orm_books, direct_books)
+
+    def test_export_books(self):
+        """
+        Prueba la exportación del catálogo en NDJSON y CSV.
+
+        Verifica que se exporten todos los libros con la misma
+        representación que la API y que se respete el filtro de género.
+        """
+        url = reverse('book-export')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        detail = self.client.get(f"{reverse('book-list')}{self.books[0].id}/")
+        self.assertEqual(json.loads(lines[0]), detail.json())
+
+        response = self.client.get(url, {'output': 'csv', 'genre': 'DAT'})
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(rows[0].split(',')[:3], ['id', 'title', 'author'])
+        self.assertEqual(len(rows), 2)
+
+        response = self.client.get(url, {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_books(self):
+        """
+        Prueba la importación de libros desde un archivo CSV.
+
+        Verifica que las filas válidas se inserten y que las inválidas se
+        informen con sus errores sin detener la importación.
+        """
+        content = (
+            'title,author,published_date,genre,price\n'
+            'Rust Moderno,Ana Pérez,2021-05-01,PRO,35.00\n'
+            'Género Inválido,Ana Pérez,2021-05-01,XXX,35.00\n'
+            'Precio Inválido,Ana Pérez,2021-05-01,PRO,35.555\n'
+        )
+        upload = SimpleUploadedFile('libros.csv', content.encode(), content_type='text/csv')
+        response = self.client.post(reverse('book-import-books'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['rejected'], 2)
+        self.assertIn('genre', response.data['rejects'][0]['errors'])
+        self.assertIn('price', response.data['rejects'][1]['errors'])
+        self.assertTrue(Book.objects.filter(title='Rust Moderno').exists())
+
+        response = self.client.get(reverse('book-search'), {'q': 'Rust'})
+        self.assertEqual(response.data['count'], 1)
+
+        # Los archivos que no se pueden leer o superan el límite no importan nada
+        upload = SimpleUploadedFile('libros.csv', b'title\n\xff\xfe\n', content_type='text/csv')
+        response = self.client.post(reverse('book-import-books'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(IMPORT_UPLOAD_MAX_ROWS=2):
+            upload = SimpleUploadedFile('libros.csv', content.encode(), content_type='text/csv')
+            response = self.client.post(reverse('book-import-books'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(Book.objects.filter(title='Rust Moderno').count(), 1)
+
+    def test_async_views(self):
+        """
+        Prueba las versiones asíncronas de la búsqueda y las estadísticas.
+
+        Verifica que devuelvan las mismas respuestas que las vistas de DRF
+        y que exijan autenticación.
+        """
+        requests = [
+            (reverse('book-search'), reverse('async-book-search'), {'q': 'Python'}),
+            (reverse('book-search'), reverse('async-book-search'), {}),
+            (reverse('book-stats'), reverse('async-book-stats'), {'year': 2023}),
+            (reverse('book-stats'), reverse('async-book-stats'), {'year': 1990}),
+        ]
+        for sync_url, async_url, params in requests:
+            sync_response = self.client.get(sync_url, params)
+            async_response = self.client.get(async_url, params)
+            self.assertEqual(async_response.status_code, sync_response.status_code)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+        self.client.credentials()
+        response = self.client.get(reverse('async-book-search'), {'q': 'Python'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_runtime_stats(self):
+        """
+        Prueba las métricas de ejecución del worker.
+
+        Verifica que incluyan la caché de respuestas y el pool de
+        conexiones de MongoDB compartido por el ORM y pymongo.
+        """
+        self.client.get(reverse('book-search'), {'q': 'Python'})
+        response = self.client.get(reverse('runtime-stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_ratio', response.data['response_cache'])
+        pool = response.data['mongo_pool']
+        self.assertGreater(pool['checkouts'], 0)
+        self.assertGreaterEqual(pool['open_connections'], 1)
+
+    def test_static_schema(self):
+        """
+        Prueba el esquema OpenAPI precalculado.
+
+        Verifica que el archivo generado por el comando spectacular se
+        sirva tal cual y que su ausencia devuelva 404.
+        """
+        import os
+        import tempfile
+        from django.http import Http404
+        from django.test import RequestFactory
+        from .schema import static_schema
+
+        with tempfile.TemporaryDirectory() as directory:
+            schema_file = os.path.join(directory, 'schema.yml')
+            call_command('spectacular', file=schema_file)
+            request = RequestFactory().get('/schema/')
+
+            with override_settings(API_SCHEMA_FILE=schema_file):
+                response = static_schema(request)
+                content = b''.join(response.streaming_content)
+                response.close()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn(b'/api/books/search/', content)
+
+            with override_settings(API_SCHEMA_FILE=os.path.join(directory, 'missing.yml')):
+                with self.assertRaises(Http404):
+                    static_schema(request)
+
+    def test_list_serializer(self):
+        """
+        Prueba la serialización rápida de listas de libros.
+
+        Verifica que instancias, diccionarios y tuplas produzcan la misma
+        representación que BookSerializer campo a campo.
+        """
+        from rest_framework.serializers import ListSerializer
+        from .serializers import BookSerializer
+
+        books = list(Book.objects.order_by('id'))
+        fields = BookSerializer.Meta.fields
+        expected = ListSerializer(books, child=BookSerializer()).data
+
+        self.assertEqual(BookSerializer(books, many=True).data, expected)
+        self.assertEqual(BookSerializer(list(Book.objects.order_by('id').values(*fields)), many=True).data, expected)
+        self.assertEqual(BookSerializer(list(Book.objects.order_by('id').values_list(*fields)), many=True).data, expected)
+
+    def test_orjson_renderer(self):
+        """
+        Prueba el renderizado JSON con orjson.
+
+        Verifica que produzca los mismos bytes que el JSONRenderer de DRF
+        y que codifique los ObjectId y Decimal128 como texto.
+        """
+        from bson import Decimal128, ObjectId
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import ORJSONRenderer
+        from .serializers import BookSerializer
+
+        data = {
+            'results': BookSerializer(Book.objects.all(), many=True).data,
+            'text': 'Cien años de soledad \u2028\u2029',
+            'ratio': 0.25,
+            'published_date': datetime(2023, 1, 1),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+        object_id = ObjectId()
+        content = ORJSONRenderer().render({'_id': object_id, 'price': Decimal128('29.99')})
+        self.assertEqual(json.loads(content), {'_id': str(object_id), 'price': '29.99'})
+
+    def test_auth_user_cache(self):
+        """
+        Prueba la caché de usuarios autenticados con JWT.
+
+        Verifica que las peticiones repetidas no vuelvan a cargar el
+        usuario y que desactivarlo, en este u otro worker, invalide su
+        entrada.
+        """
+        from .authentication import bump_user_version, user_cache
+
+        url = reverse('book-list')
+        self.client.get(url)
+        hits = user_cache.stats()['hits']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(user_cache.stats()['hits'], hits + 1)
+
+        # Otro worker solo registra el cambio; se aplica al consultar los cambios
+        User.objects.filter(pk=self.user.pk).update(first_name='Otro')
+        bump_user_version(self.user.pk)
+        user_cache.check_changes(force=True)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user.first_name, 'Otro')
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_request_timing(self):
+        """
+        Prueba el encabezado Server-Timing y las métricas por vista.
+
+        Verifica que la búsqueda informe el tiempo en MongoDB y que sus
+        histogramas aparezcan en /metrics.
+        """
+        import re
+
+        response = self.client.get(reverse('book-search'), {'q': 'Python'})
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('render;dur=', timing)
+        self.assertGreater(int(re.search(r'MongoDB \((\d+) commands\)', timing).group(1)), 0)
+
+        # Solo con METRICS_TOKEN y ese token, no el JWT de la API
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        with override_settings(METRICS_TOKEN='secreto'):
+            response = self.client.get(reverse('metrics'))
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            response = APIClient().get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.content.decode()
+        self.assertIn('libros_request_duration_seconds_count{view="BookViewSet.search",method="GET",status="200"}', content)
+        self.assertIn('libros_request_phase_seconds_bucket{view="BookViewSet.search",phase="db",le="+Inf"}', content)
+
+    def test_slow_query_capture(self):
+        """
+        Prueba la captura de agregaciones lentas y el comando slow_queries.
+
+        Con un umbral mínimo toda búsqueda resulta lenta; la captura no
+        debe incluir el término buscado y el comando debe agruparla.
+        """
+        import os
+        import tempfile
+        from .utils.slow_queries import read_slow_queries, slow_query_log
+
+        with tempfile.TemporaryDirectory() as directory:
+            log = os.path.join(directory, 'slow_queries.log')
+            with override_settings(MONGO_SLOW_QUERY_MS=0.001, MONGO_SLOW_QUERY_LOG=log):
+                slow_query_log.reset()
+                for term in ('Python', 'Django'):
+                    response = self.client.get(reverse('book-search'), {'q': term})
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    slow_query_log.wait()
+
+                # Se guardan ambas, pero solo la primera vuelve a ejecutarse con explain
+                records = read_slow_queries()
+                self.assertEqual(len(records), 2)
+                self.assertNotIn('python', json.dumps(records[0]['shape']).lower())
+                self.assertIn('docs_examined', records[0]['explain'])
+                self.assertNotIn('explain', records[1])
+
+                out = StringIO()
+                call_command('slow_queries', '--json', '--clear', stdout=out)
+                summary = json.loads(out.getvalue().split('\nSe eliminaron')[0])
+                self.assertEqual(summary[0]['shape_id'], records[0]['shape_id'])
+                self.assertEqual(summary[0]['count'], 2)
+                self.assertEqual(summary[0]['explained'], 1)
+                self.assertFalse(os.path.exists(log))
+
+    def test_ensure_indexes(self):
+        """
+        Prueba que ensure_indexes cree los índices declarados y los informe.
+        """
+        call_command('ensure_indexes', stdout=StringIO())
+        call_command('ensure_indexes', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('ensure_indexes', '--check', '--json', stdout=out)
+        rows = {row['name']: row for row in json.loads(out.getvalue())}
+        self.assertEqual(rows['book_genre_created_at_idx']['status'], 'present')
+        self.assertEqual(rows['book_published_date_idx']['keys'], [['published_date', 1]])
+
+    def test_search_facets(self):
+        """
+        Prueba las facetas de la búsqueda.
+
+        Verifica que se calculen sobre todas las coincidencias y no solo
+        sobre la página, y que no se incluyan si no se piden.
+        """
+        url = reverse('book-search')
+        response = self.client.get(url, {'q': 'John', 'page_size': 1, 'facets': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+        facets = response.data['facets']
+        genres = {genre['code']: genre['count'] for genre in facets['genres']}
+        self.assertEqual(genres['PRO'], 1)
+        self.assertEqual(genres['DAT'], 1)
+        self.assertEqual(genres['FIC'], 0)
+        prices = {price['min']: price['count'] for price in facets['prices']}
+        self.assertEqual(prices[20], 2)
+        self.assertEqual(facets['decades'], [{'decade': 2020, 'count': 2}])
+
+        response = self.client.get(url, {'q': 'John'})
+        self.assertNotIn('facets', response.data)
+
+    def test_suggest(self):
+        """
+        Prueba el autocompletado y su actualización después de las escrituras.
+        """
+        from .suggest import suggest_index
+
+        suggest_index.invalidate()
+        suggest_index.build()
+        url = reverse('book-suggest')
+        response = self.client.get(url, {'prefix': 'jo'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['suggestions'][0], {'text': 'John', 'count': 2})
+
+        # Completa solo la última palabra, ignorando acentos y mayúsculas
+        response = self.client.get(url, {'prefix': 'python MÓN'})
+        self.assertEqual(response.data['suggestions'], [{'text': 'MongoDB', 'count': 1}])
+
+        response = self.client.post(reverse('book-list'), {
+            'title': 'Johnny Guitar',
+            'author': 'Roy Chanslor',
+            'published_date': '1953-01-01',
+            'genre': 'FIC',
+            'price': '12.50'
+        })
+        response = self.client.get(url, {'prefix': 'jo'})
+        self.assertEqual([s['text'] for s in response.data['suggestions']], ['John', 'Johnny'])
+
+        self.client.delete(reverse('book-detail', args=[self.books[0].pk]))
+        response = self.client.get(url, {'prefix': 'jo', 'limit': 1})
+        self.assertEqual(response.data['suggestions'], [{'text': 'John', 'count': 1}])
+
+        # Otro worker registra el cambio y este lo aplica al actualizarse
+        from .suggest import record_book_changes
+
+        Book.objects.filter(pk=self.books[2].pk).update(author='Joanna Doe')
+        record_book_changes([self.books[2].pk])
+        suggest_index.refresh()
+        response = self.client.get(url, {'prefix': 'jo'})
+        self.assertEqual([s['text'] for s in response.data['suggestions']], ['Joanna', 'Johnny'])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fuzzy_search(self):
+        """
+        Prueba la búsqueda tolerante a errores de escritura.
+
+        Verifica que encuentre términos mal escritos solo con fuzzy=true y
+        que el índice de trigramas refleje los libros nuevos.
+        """
+        url = reverse('book-search')
+        response = self.client.get(url, {'q': 'Pythn'})
+        self.assertEqual(response.data['count'], 0)
+
+        response = self.client.get(url, {'q': 'Pythn', 'fuzzy': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Python Programming')
+
+        # Todos los términos deben tener alguno parecido
+        response = self.client.get(url, {'q': 'Jane Smit', 'fuzzy': 'true'})
+        self.assertEqual([book['title'] for book in response.data['results']], ['Django Master'])
+        response = self.client.get(url, {'q': 'Pythn Smit', 'fuzzy': 'true'})
+        self.assertEqual(response.data['count'], 0)
+        # El género también forma parte del vocabulario, solo o junto a otros términos
+        response = self.client.get(url, {'q': 'programacon', 'fuzzy': 'true'})
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get(url, {'q': 'Pythn programacon', 'fuzzy': 'true'})
+        self.assertEqual([book['title'] for book in response.data['results']], ['Python Programming'])
+
+        # Un término del catálogo puede ser el parecido de varios de la consulta
+        response = self.client.get(url, {'q': 'Pythn Pyton', 'fuzzy': 'true'})
+        self.assertEqual([book['title'] for book in response.data['results']], ['Python Programming'])
+
+        self.client.post(reverse('book-list'), {
+            'title': 'Rayuela',
+            'author': 'Julio Cortázar',
+            'published_date': '1963-06-28',
+            'genre': 'FIC',
+            'price': '18.00'
+        })
+        response = self.client.get(url, {'q': 'cortazr', 'fuzzy': 'true'})
+        self.assertEqual([book['title'] for book in response.data['results']], ['Rayuela'])
+
+        out = StringIO()
+        call_command('rebuild_trigram_index', stdout=out)
+        self.assertIn('Se indexaron', out.getvalue())
@@ -16,7 +16,8 @@ Including another URLconf
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookViewSet, BookStatsView
+from . import async_views
+from .views import BookViewSet, BookStatsView, RuntimeStatsView
 
 router = DefaultRouter()
 router.register(r'books', BookViewSet)
@@ -24,4 +25,7 @@ router.register(r'books', BookViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('book_stats/', BookStatsView.as_view(), name='book-stats'),
+    path('runtime_stats/', RuntimeStatsView.as_view(), name='runtime-stats'),
+    path('async/books/search/', async_views.search, name='async-book-search'),
+    path('async/book_stats/', async_views.book_stats, name='async-book-stats'),
 ]
@@ -0,0 +1,334 @@
+"""
+Medición por petición del tiempo de cada fase y histogramas por vista.
+
+RequestTimingMiddleware crea un RequestTimings por petición y lo guarda en
+una ContextVar, donde lo completan el listener de comandos de pymongo
+(tiempo en MongoDB), el wrapper de ejecución del ORM (traducción de
+djongo), los serializadores y el renderer. Al terminar la petición los
+tiempos se envían en el encabezado Server-Timing y se acumulan en los
+histogramas que expone /metrics en el formato de texto de Prometheus.
+
+Cada worker acumula sus observaciones en memoria y las suma cada
+METRICS_FLUSH_INTERVAL segundos con $inc en la colección libros_metrics,
+compartida por todos los workers. /metrics muestra esos totales, por lo
+que cualquier worker responde lo mismo y los contadores no se reinician
+al reciclar workers.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from pymongo import UpdateOne
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+PHASES = ('db', 'orm', 'serialize', 'render', 'app')
+METRICS_COLLECTION = 'libros_metrics'
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Tiempos acumulados de una petición, en segundos.
+
+    El tiempo de 'app' es el resto: el total menos el resto de fases.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.commands = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.active = set()
+
+    def add_command(self, duration_micros):
+        self.commands += 1
+        self.phases['db'] += duration_micros / 1e6
+
+    def finish(self):
+        """
+        Cierra la medición y calcula el tiempo total y el de 'app'.
+
+        Returns:
+            float: Duración total de la petición en segundos
+        """
+        self.total = time.perf_counter() - self.started
+        measured = sum(value for phase, value in self.phases.items() if phase != 'app')
+        self.phases['app'] = max(self.total - measured, 0.0)
+        return self.total
+
+    def server_timing(self):
+        """
+        Construye el valor del encabezado Server-Timing.
+
+        Returns:
+            str: Duración en milisegundos de cada fase y del total
+        """
+        entries = [
+            f'db;dur={self.phases["db"] * 1000:.2f};desc="MongoDB ({self.commands} commands)"',
+            *(f'{phase};dur={self.phases[phase] * 1000:.2f}' for phase in PHASES[1:]),
+            f'total;dur={self.total * 1000:.2f}',
+        ]
+        return ', '.join(entries)
+
+
+@contextmanager
+def request_phase(name):
+    """
+    Suma a la fase indicada el tiempo del bloque en la petición actual.
+
+    Las fases anidadas del mismo nombre (un serializador dentro de otro)
+    se cuentan una sola vez. Fuera de una petición no hace nada.
+    """
+    timings = current_timings.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+
+    timings.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases[name] += time.perf_counter() - start
+        timings.active.discard(name)
+
+
+def time_orm_query(execute, sql, params, many, context):
+    """
+    Wrapper de ejecución del ORM que mide la traducción de djongo.
+
+    Registra como fase 'orm' el tiempo de cursor.execute() que no se pasó
+    esperando a MongoDB (que ya cuenta como 'db').
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    db_before = timings.phases['db']
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.phases['orm'] += max(elapsed - (timings.phases['db'] - db_before), 0.0)
+
+
+class Histogram:
+    """
+    Histograma acumulativo con etiquetas, compatible con Prometheus.
+
+    series guarda las observaciones de este worker que aún no se sumaron
+    a la colección compartida.
+    """
+
+    def __init__(self, name, documentation, buckets, labels):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def take(self):
+        """
+        Retira las observaciones pendientes de este worker.
+
+        Returns:
+            dict: Contadores por bucket, suma y cantidad por etiquetas
+        """
+        with self._lock:
+            series, self.series = self.series, {}
+        return series
+
+    def restore(self, series):
+        """
+        Devuelve observaciones retiradas con take() que no se pudieron guardar.
+        """
+        with self._lock:
+            for label_values, (counts, total, count) in series.items():
+                current = self.series.setdefault(label_values, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                current[0] = [pending + taken for pending, taken in zip(current[0], counts)]
+                current[1] += total
+                current[2] += count
+
+    def updates(self, series):
+        """
+        Construye las operaciones que suman las observaciones a la colección compartida.
+
+        Returns:
+            list: Un UpdateOne con $inc por cada combinación de etiquetas
+        """
+        return [
+            UpdateOne(
+                {'_id': {'metric': self.name, 'labels': list(label_values)}},
+                {'$inc': {
+                    **{f'counts.{position}': value for position, value in enumerate(counts) if value},
+                    'sum': total,
+                    'count': count,
+                }},
+                upsert=True
+            )
+            for label_values, (counts, total, count) in series.items()
+        ]
+
+    def reset(self):
+        # Sin tomar el lock: tras un fork podría haber quedado tomado
+        self._lock = threading.Lock()
+        self.series = {}
+
+    def format_labels(self, label_values, **extra):
+        pairs = [*zip(self.labels, label_values), *extra.items()]
+        escaped = (
+            (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in pairs
+        )
+        return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+    def render(self, documents):
+        """
+        Representa el histograma en el formato de texto de Prometheus.
+
+        Args:
+            documents: Documentos de la colección compartida de este histograma
+
+        Returns:
+            list: Líneas del histograma
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        series = sorted(
+            (
+                tuple(document['_id']['labels']),
+                (
+                    [document.get('counts', {}).get(str(position), 0) for position in range(len(self.buckets) + 1)],
+                    document.get('sum', 0.0),
+                    document.get('count', 0)
+                )
+            )
+            for document in documents
+        )
+
+        for label_values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{self.format_labels(label_values, le=bound)} {cumulative}')
+            lines.append(f'{self.name}_sum{self.format_labels(label_values)} {total}')
+            lines.append(f'{self.name}_count{self.format_labels(label_values)} {count}')
+        return lines
+
+
+request_duration = Histogram(
+    'libros_request_duration_seconds', 'Duración de las peticiones por vista.',
+    REQUEST_BUCKETS, ('view', 'method', 'status')
+)
+request_phase_duration = Histogram(
+    'libros_request_phase_seconds', 'Tiempo de cada fase de las peticiones por vista.',
+    REQUEST_BUCKETS, ('view', 'phase')
+)
+request_mongo_commands = Histogram(
+    'libros_request_mongo_commands', 'Comandos de MongoDB por petición y vista.',
+    COMMAND_BUCKETS, ('view',)
+)
+HISTOGRAMS = (request_duration, request_phase_duration, request_mongo_commands)
+
+
+_flusher_pid = None
+
+
+def record_request(view, method, status_code, timings):
+    """
+    Acumula los tiempos de una petición en los histogramas de su vista.
+    """
+    request_duration.observe(timings.total, view, method, status_code)
+    for phase, seconds in timings.phases.items():
+        request_phase_duration.observe(seconds, view, phase)
+    request_mongo_commands.observe(timings.commands, view)
+    start_flusher()
+
+
+def get_metrics_collection():
+    # Importación diferida: utils.mongo importa este módulo
+    from .mongo import MongoConnection
+    return MongoConnection().get_collection(METRICS_COLLECTION)
+
+
+def flush_metrics():
+    """
+    Suma las observaciones pendientes de este worker a la colección compartida.
+
+    Si la escritura falla, las observaciones vuelven a quedar pendientes.
+    """
+    taken = [(histogram, histogram.take()) for histogram in HISTOGRAMS]
+    operations = [operation for histogram, series in taken for operation in histogram.updates(series)]
+    if not operations:
+        return
+    try:
+        get_metrics_collection().bulk_write(operations, ordered=False)
+    except Exception:
+        for histogram, series in taken:
+            histogram.restore(series)
+        raise
+
+
+def flush_periodically():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        try:
+            flush_metrics()
+        except Exception:
+            # Se reintenta en el siguiente intervalo
+            pass
+
+
+def start_flusher():
+    """
+    Inicia en este proceso el hilo que guarda las métricas periódicamente.
+    """
+    global _flusher_pid
+    if _flusher_pid != os.getpid():
+        _flusher_pid = os.getpid()
+        threading.Thread(target=flush_periodically, name='metrics-flush', daemon=True).start()
+
+
+def render_metrics():
+    """
+    Obtiene todas las métricas en el formato de texto de Prometheus.
+
+    Guarda antes las observaciones pendientes de este worker, de modo que
+    la respuesta incluye sus últimas peticiones.
+
+    Returns:
+        str: Métricas separadas por líneas
+    """
+    try:
+        flush_metrics()
+    except Exception:
+        pass
+    documents = {}
+    for document in get_metrics_collection().find():
+        documents.setdefault(document['_id']['metric'], []).append(document)
+    return '\n'.join(
+        line for histogram in HISTOGRAMS for line in histogram.render(documents.get(histogram.name, []))
+    ) + '\n'
+
+
+def reset_metrics():
+    """
+    Vacía los histogramas (por ejemplo en un worker recién creado con fork).
+    """
+    for histogram in HISTOGRAMS:
+        histogram.reset()
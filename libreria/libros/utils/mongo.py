@@ -1,24 +1,64 @@
-from pymongo import MongoClient
+import asyncio
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from datetime import datetime, time
+from time import perf_counter
+from decimal import Decimal
+from bson import Decimal128
+from bson.codec_options import CodecOptions
+from djongo import database as djongo_database
+from pymongo import ReturnDocument
 from django.conf import settings
+from django.db import connections
+from django.utils import timezone
 import os
+from .metrics import reset_metrics
+from .monitoring import pool_stats
+from .slow_queries import slow_query_log
+
+def get_client():
+    """
+    Obtiene el MongoClient del proceso, el mismo que usa el ORM de djongo.
+
+    djongo guarda un cliente por base de datos en djongo.database.clients;
+    reutilizarlo hace que el ORM y las consultas con pymongo compartan un
+    único pool de conexiones por worker, con las opciones de CLIENT.
+
+    Returns:
+        MongoClient: Cliente compartido del proceso
+    """
+    params = connections['default'].get_connection_params()
+    name = params.pop('name')
+    params.pop('enforce_schema')
+    # Mismos parámetros que DatabaseWrapper.get_new_connection de djongo
+    params['document_class'] = OrderedDict
+    return djongo_database.connect(db=name, **params)
+
 
 class MongoConnection:
     """
     Clase para manejar la conexión a MongoDB usando pymongo.
     
     Proporciona una interfaz para interactuar directamente con MongoDB
-    utilizando la configuración de Django.
+    utilizando la configuración de Django. El cliente es el mismo que usa
+    djongo y se crea de nuevo en cada proceso hijo después de un fork.
     """
     
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(MongoConnection, cls).__new__(cls)
+            instance = super(MongoConnection, cls).__new__(cls)
             # Obtener la configuración de MongoDB desde settings
             mongo_settings = settings.DATABASES['default']
-            cls._instance.client = MongoClient(mongo_settings['CLIENT']['host'])
-            cls._instance.db = cls._instance.client[mongo_settings['NAME']]
+            instance.client = get_client()
+            # djongo usa OrderedDict; las consultas directas devuelven dict
+            instance.db = instance.client.get_database(
+                mongo_settings['NAME'], codec_options=CodecOptions(document_class=dict)
+            )
+            cls._instance = instance
         return cls._instance
 
     def get_collection(self, collection_name: str):
@@ -33,9 +73,202 @@ class MongoConnection:
         """
         return self.db[collection_name]
 
-    def __del__(self):
+    def aggregate(self, collection, pipeline, **kwargs):
         """
-        Cierra la conexión al destruir la instancia.
+        Ejecuta una agregación registrando las que resultan lentas.
+
+        La duración medida es la del comando aggregate y su primer lote,
+        que incluye todo el trabajo de los pipelines con $facet o $group.
+        Las que superan MONGO_SLOW_QUERY_MS se guardan con su plan de
+        ejecución (ver utils.slow_queries).
+
+        Args:
+            collection: Colección de pymongo o nombre de la colección
+            pipeline: Etapas de la agregación
+            **kwargs: Opciones de Collection.aggregate
+
+        Returns:
+            CommandCursor: Cursor con los documentos resultantes
         """
-        if hasattr(self, 'client'):
-            self.client.close() 
\ No newline at end of file
+        if isinstance(collection, str):
+            collection = self.db[collection]
+
+        start = perf_counter()
+        cursor = collection.aggregate(pipeline, **kwargs)
+        slow_query_log.observe(collection, pipeline, (perf_counter() - start) * 1000)
+        return cursor
+
+
+def warm_up():
+    """
+    Abre la primera conexión del pool del proceso.
+
+    Resuelve el registro SRV y realiza el handshake TLS antes de la
+    primera petición; con minPoolSize el resto del pool se completa en
+    segundo plano.
+    """
+    MongoConnection().client.admin.command('ping')
+
+
+# Clientes heredados del proceso padre. Se conservan sin cerrarlos porque
+# close() usaría sockets que el padre sigue utilizando.
+_inherited_clients = []
+
+
+def _reset_after_fork():
+    """
+    Descarta en el proceso hijo los clientes creados antes del fork.
+
+    pymongo no admite usar un MongoClient heredado, por lo que el hijo
+    crea los suyos en el primer uso.
+    """
+    global _async_executor
+    _inherited_clients.extend(djongo_database.clients.values())
+    djongo_database.clients.clear()
+    MongoConnection._instance = None
+    _async_executor = None
+    pool_stats.reset()
+    slow_query_log.reset()
+    reset_metrics()
+    for connection in connections.all():
+        if getattr(connection, 'client_connection', None) is not None:
+            connection.connection = None
+            connection.client_connection = None
+            connection.djongo_connection = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+_async_executor = None
+
+
+def get_async_executor():
+    """
+    Obtiene el pool de hilos donde las vistas asíncronas ejecutan pymongo.
+
+    Se crea en el primer uso, por lo que cada worker tiene el suyo. Su
+    tamaño (MONGO_ASYNC_WORKERS) limita las consultas simultáneas por
+    proceso, independientemente de los hilos del servidor.
+
+    Returns:
+        ThreadPoolExecutor: Pool de hilos para las consultas a MongoDB
+    """
+    global _async_executor
+    if _async_executor is None:
+        _async_executor = ThreadPoolExecutor(
+            max_workers=settings.MONGO_ASYNC_WORKERS, thread_name_prefix='mongo-async'
+        )
+    return _async_executor
+
+
+async def aggregate_async(collection, pipeline, length=None, **kwargs):
+    """
+    Ejecuta una agregación sin bloquear el event loop.
+
+    Args:
+        collection: Colección de pymongo
+        pipeline: Etapas de la agregación
+        length: Cantidad máxima de documentos a leer (por defecto todos)
+        **kwargs: Opciones de Collection.aggregate (p. ej. maxTimeMS)
+
+    Returns:
+        list: Documentos resultantes
+    """
+    def run():
+        cursor = MongoConnection().aggregate(collection, pipeline, **kwargs)
+        return list(cursor if length is None else islice(cursor, length))
+
+    # Copia el contexto para que los comandos cuenten en la petición en curso
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(get_async_executor(), context.run, run)
+
+
+def reserve_ids(db, collection_name: str, count: int):
+    """
+    Reserva identificadores consecutivos del contador que mantiene djongo.
+
+    Permite insertar documentos directamente con pymongo sin que los
+    siguientes INSERT del ORM reutilicen los mismos identificadores.
+
+    Args:
+        db: Base de datos de MongoDB
+        collection_name: Nombre de la colección
+        count: Cantidad de identificadores a reservar
+
+    Returns:
+        range: Identificadores reservados
+    """
+    auto = db['__schema__'].find_one_and_update(
+        {'name': collection_name, 'auto': {'$exists': True}},
+        {'$inc': {'auto.seq': count}},
+        return_document=ReturnDocument.AFTER
+    )
+    if auto is None:
+        raise LookupError(f'La colección {collection_name} no tiene un contador de djongo')
+
+    last = int(auto['auto']['seq'])
+    return range(last - count + 1, last + 1)
+
+
+def book_fields(values: dict):
+    """
+    Convierte campos validados de un libro al formato que guarda djongo.
+
+    Args:
+        values: Campos del libro, completos o parciales
+
+    Returns:
+        dict: Campos con las fechas como datetime y el precio como Decimal128
+    """
+    fields = dict(values)
+    published_date = fields.get('published_date')
+    if published_date is not None and not isinstance(published_date, datetime):
+        fields['published_date'] = datetime.combine(published_date, time())
+    if fields.get('price') is not None:
+        fields['price'] = Decimal128(Decimal(fields['price']).quantize(Decimal('0.01')))
+    return fields
+
+
+def naive_utc(timestamp: datetime = None):
+    """
+    Obtiene una fecha sin zona horaria en UTC, como las guarda djongo.
+
+    Args:
+        timestamp: Fecha a convertir (por defecto la actual)
+
+    Returns:
+        datetime: Fecha en UTC sin zona horaria
+    """
+    if timestamp is None:
+        timestamp = timezone.now()
+    if timezone.is_aware(timestamp):
+        timestamp = timezone.make_naive(timestamp, timezone.utc)
+    return timestamp
+
+
+def book_document(values: dict, book_id: int, timestamp: datetime = None):
+    """
+    Construye un documento de libro con el mismo formato que guarda djongo.
+
+    Args:
+        values: Campos del libro (title, author, published_date, genre, price)
+        book_id: Identificador del libro
+        timestamp: Fecha de creación (por defecto la actual, en UTC)
+
+    Returns:
+        dict: Documento listo para insertar en 'libros_book'
+    """
+    timestamp = naive_utc(timestamp)
+    fields = book_fields(values)
+
+    return {
+        'id': book_id,
+        'title': fields['title'],
+        'author': fields['author'],
+        'published_date': fields['published_date'],
+        'genre': fields['genre'],
+        'price': fields['price'],
+        'created_at': timestamp,
+        'updated_at': timestamp,
+    }
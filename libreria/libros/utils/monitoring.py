@@ -0,0 +1,123 @@
+import threading
+import time
+
+from pymongo import monitoring
+
+from .metrics import current_timings
+
+
+class ConnectionPoolStats(monitoring.ConnectionPoolListener):
+    """
+    Estadísticas del pool de conexiones de MongoDB del proceso.
+
+    Escucha los eventos CMAP de pymongo para contar las conexiones
+    abiertas y en uso y medir cuánto esperan las peticiones para obtener
+    una conexión del pool.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Reinicia los contadores.
+
+        Se llama también en el proceso hijo después de un fork, donde el
+        lock heredado podría haber quedado tomado por otro hilo del padre.
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def stats(self):
+        """
+        Obtiene las estadísticas actuales del pool.
+
+        Returns:
+            dict: Conexiones abiertas y en uso, checkouts, fallos y espera
+        """
+        with self._lock:
+            return {
+                'open_connections': self.open,
+                'checked_out': self.checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears,
+                'wait_ms_avg': round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_ms_max': round(self.wait_ms_max, 3),
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(self.open - 1, 0)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        wait_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+
+pool_stats = ConnectionPoolStats()
+
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    Suma los comandos de MongoDB y su duración a la petición en curso.
+
+    Usa la duración que mide pymongo, por lo que cada evento solo cuesta
+    leer la ContextVar de la petición.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add_command(event.duration_micros)
+
+    def failed(self, event):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add_command(event.duration_micros)
+
+
+command_timer = CommandTimer()
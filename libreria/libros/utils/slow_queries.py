@@ -0,0 +1,305 @@
+"""
+Registro de las agregaciones lentas con su plan de ejecución.
+
+MongoConnection.aggregate mide cada agregación; cada una que supera
+MONGO_SLOW_QUERY_MS se guarda como una línea JSON en MONGO_SLOW_QUERY_LOG
+con la forma del pipeline (sin los valores literales) y la duración, y el
+comando slow_queries las agrupa por forma. Para algunas, en un hilo
+aparte, se obtiene además su explain("executionStats"): como el explain
+vuelve a ejecutar la agregación, cada forma se explica como máximo una
+vez cada MONGO_SLOW_QUERY_EXPLAIN_INTERVAL segundos por worker, y solo en
+la proporción MONGO_SLOW_QUERY_SAMPLE_RATE.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+# Explains pendientes como máximo por worker; el resto de capturas se
+# guarda sin plan
+MAX_PENDING_EXPLAINS = 4
+REDACTED = '?'
+
+
+def pipeline_shape(value):
+    """
+    Obtiene la forma de un pipeline reemplazando los valores literales.
+
+    Se conservan los operadores, los nombres de campo y las referencias
+    '$campo'; el resto de valores se reemplaza por '?'. Los elementos
+    repetidos de una lista (una condición por término de búsqueda) se
+    reducen a uno, de modo que una misma consulta tiene una única forma
+    sin importar la cantidad de términos.
+
+    Args:
+        value: Pipeline o parte de él
+
+    Returns:
+        Estructura equivalente sin valores literales
+    """
+    if isinstance(value, dict):
+        return {key: pipeline_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in map(pipeline_shape, value):
+            if item not in items:
+                items.append(item)
+        return items
+    if isinstance(value, str) and value.startswith('$'):
+        return value
+    return REDACTED
+
+
+def shape_id(shape):
+    """
+    Obtiene un identificador corto y estable para la forma de un pipeline.
+    """
+    encoded = json.dumps(shape, separators=(',', ':')).encode()
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def explain_summary(explain):
+    """
+    Resume la salida de explain("executionStats") de una agregación.
+
+    Recorre tanto la salida de las agregaciones resueltas por completo en
+    la capa de consultas como la de las divididas en etapas ('stages'),
+    incluidas las subconsultas de $lookup. Se ignoran los planes
+    rechazados y el comando original.
+
+    Args:
+        explain: Respuesta del comando explain
+
+    Returns:
+        dict: Documentos y claves examinados, documentos devueltos por la
+        capa de consultas, índices usados, y si hubo recorridos completos
+        de la colección u ordenamientos en memoria
+    """
+    summary = {
+        'docs_examined': 0,
+        'keys_examined': 0,
+        'docs_returned': 0,
+        'execution_ms': 0,
+        'indexes': [],
+        'collection_scan': False,
+        'in_memory_sort': False,
+    }
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+            return
+        if not isinstance(node, dict):
+            return
+
+        stats = node.get('executionStats')
+        if isinstance(stats, dict):
+            summary['docs_returned'] += stats.get('nReturned', 0)
+            summary['execution_ms'] = max(summary['execution_ms'], stats.get('executionTimeMillis', 0))
+
+        summary['docs_examined'] += node.get('totalDocsExamined', 0)
+        summary['keys_examined'] += node.get('totalKeysExamined', 0)
+        # Estadísticas de las subconsultas de $lookup
+        if node.get('collectionScans'):
+            summary['collection_scan'] = True
+        for index in node.get('indexesUsed', ()):
+            if index not in summary['indexes']:
+                summary['indexes'].append(index)
+
+        stage = node.get('stage')
+        if stage == 'IXSCAN' and node.get('indexName') not in summary['indexes']:
+            summary['indexes'].append(node.get('indexName'))
+        elif stage == 'COLLSCAN':
+            summary['collection_scan'] = True
+        elif stage == 'SORT' or '$sort' in node:
+            # Un $sort que aparece como etapa no se resolvió con un índice
+            summary['in_memory_sort'] = True
+
+        for key, item in node.items():
+            if key not in ('rejectedPlans', 'allPlansExecution', 'command'):
+                walk(item)
+
+    walk(explain)
+    return summary
+
+
+class SlowQueryLog:
+    """
+    Detección y registro de las agregaciones lentas de un worker.
+
+    Los explain se ejecutan en un único hilo propio, fuera de la petición
+    que detectó la agregación lenta. Nunca hay dos pendientes para la
+    misma forma, y explained_at guarda cuándo se explicó cada forma por
+    última vez para respetar MONGO_SLOW_QUERY_EXPLAIN_INTERVAL.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Descarta el hilo y las capturas pendientes.
+
+        Se llama también en el proceso hijo después de un fork, donde el
+        hilo del padre no existe y el lock podría haber quedado tomado.
+        """
+        self._lock = threading.Lock()
+        self._executor = None
+        self.pending = set()
+        self.explained_at = {}
+
+    def get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-queries')
+        return self._executor
+
+    def observe(self, collection, pipeline, duration_ms):
+        """
+        Registra una agregación si superó el umbral.
+
+        Todas las agregaciones lentas se guardan, para que los totales por
+        forma sean exactos; solo algunas se guardan con su plan.
+
+        Args:
+            collection: Colección de pymongo en la que se ejecutó
+            pipeline: Etapas de la agregación
+            duration_ms: Duración de la agregación en milisegundos
+
+        Returns:
+            bool: True si se obtendrá su plan de ejecución
+        """
+        threshold = settings.MONGO_SLOW_QUERY_MS
+        if not threshold or duration_ms < threshold:
+            return False
+
+        shape = pipeline_shape(pipeline)
+        key = shape_id(shape)
+        record = {
+            'captured_at': datetime.now(timezone.utc).isoformat(),
+            'collection': collection.name,
+            'shape_id': key,
+            'shape': shape,
+            'duration_ms': round(duration_ms, 3),
+        }
+
+        now = time.monotonic()
+        with self._lock:
+            last = self.explained_at.get(key)
+            explain = (
+                key not in self.pending
+                and len(self.pending) < MAX_PENDING_EXPLAINS
+                and (last is None or now - last >= settings.MONGO_SLOW_QUERY_EXPLAIN_INTERVAL)
+                and random.random() < settings.MONGO_SLOW_QUERY_SAMPLE_RATE
+            )
+            if explain:
+                self.pending.add(key)
+                self.explained_at[key] = now
+                executor = self.get_executor()
+
+        if explain:
+            executor.submit(self.capture, collection, list(pipeline), record)
+        else:
+            self.write(record)
+        return explain
+
+    def write(self, record):
+        """
+        Agrega una captura al archivo MONGO_SLOW_QUERY_LOG.
+        """
+        with open(settings.MONGO_SLOW_QUERY_LOG, 'a', encoding='utf-8') as log:
+            log.write(json.dumps(record, default=str) + '\n')
+
+    def capture(self, collection, pipeline, record):
+        """
+        Obtiene el plan de ejecución de una agregación y guarda la captura.
+        """
+        try:
+            explain = collection.database.command({
+                'explain': {'aggregate': collection.name, 'pipeline': pipeline, 'cursor': {}},
+                'verbosity': 'executionStats',
+            })
+            record['explain'] = explain_summary(explain)
+        except Exception as e:
+            record['explain'] = {'error': str(e)}
+
+        try:
+            self.write(record)
+        finally:
+            with self._lock:
+                self.pending.discard(record['shape_id'])
+
+    def wait(self):
+        """
+        Espera a que terminen las capturas pendientes.
+        """
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def read_slow_queries(path=None):
+    """
+    Lee las capturas guardadas, ignorando las líneas incompletas.
+
+    Args:
+        path: Archivo de capturas (por defecto MONGO_SLOW_QUERY_LOG)
+
+    Returns:
+        list: Capturas en el orden en que se guardaron
+    """
+    records = []
+    try:
+        with open(path or settings.MONGO_SLOW_QUERY_LOG, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def summarize_slow_queries(records):
+    """
+    Agrupa las capturas por forma del pipeline.
+
+    Args:
+        records: Capturas leídas con read_slow_queries
+
+    Returns:
+        list: Un resumen por forma con la cantidad de ejecuciones lentas,
+        el tiempo total, la mediana y el máximo, la cantidad de planes
+        capturados y el de la ejecución más lenta que lo tiene
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record['shape_id'], []).append(record)
+
+    summaries = []
+    for key, group in groups.items():
+        durations = sorted(record['duration_ms'] for record in group)
+        slowest = max(group, key=lambda record: record['duration_ms'])
+        explained = [record for record in group if 'explain' in record]
+        summaries.append({
+            'shape_id': key,
+            'collection': slowest['collection'],
+            'count': len(group),
+            'total_ms': round(sum(durations), 3),
+            'p50_ms': durations[(len(durations) - 1) // 2],
+            'max_ms': durations[-1],
+            'last_seen': group[-1]['captured_at'],
+            'stages': [next(iter(stage), None) for stage in slowest['shape']],
+            'shape': slowest['shape'],
+            'explained': len(explained),
+            'explain': max(explained, key=lambda record: record['duration_ms'])['explain'] if explained else {},
+        })
+    return summaries
@@ -1,15 +1,35 @@
+import csv
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from pymongo.errors import ExecutionTimeout
 from django.shortcuts import render
 from rest_framework import viewsets, views, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema, OpenApiParameter, extend_schema_view
-from drf_spectacular.types import OpenApiTypes
 from .models import Book
-from .serializers import BookSerializer, BookStatsSerializer
-from .pagination import Pagination
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from .schema import OpenApiParameter, OpenApiTypes, extend_schema, extend_schema_view
+from .serializers import BookSerializer, BookStatsSerializer, book_representation
+from .pagination import KeysetPagination, Pagination
+from .authentication import CachedJWTAuthentication, user_cache
 from .utils.mongo import MongoConnection
+from .utils.metrics import render_metrics
+from .utils.monitoring import pool_stats
+from .repository import BookRepository
+from .bulk import BULK_MAX_ITEMS, BookBulkWriter
+from .export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, buffered
+from .importer import IMPORT_FORMATS, IMPORT_MAX_REJECTS, BookImporter, count_rows, detect_format, open_text, read_rows
+from .suggest import SUGGEST_MAX_RESULTS, suggest_index
+from .fuzzy import fuzzy_requested, get_fuzzy_plan
+from .search import facets_requested, get_search_backend, search_facets_pipeline, search_facets_result
+from .cache import ResponseCache
+from .conditional import book_condition, catalog_condition
+from .stats import (
+    STATS_MAX_PAGE_SIZE, STATS_PAGE_SIZE, book_stats_pipeline, book_stats_result, parse_stats_params
+)
 
 @extend_schema_view(
     list=extend_schema(
@@ -21,6 +41,19 @@ from .utils.mongo import MongoConnection
                 required=False,
                 type=str,
                 enum=['FIC', 'NOF', 'SCI', 'ROM', 'MIS', 'FAN', 'PRO', 'DAT']
+            ),
+            OpenApiParameter(
+                name='pagination',
+                description='Usar "cursor" para paginar por cursor sin total de resultados',
+                required=False,
+                type=str,
+                enum=['cursor']
+            ),
+            OpenApiParameter(
+                name='cursor',
+                description='Cursor opaco devuelto en los enlaces de la paginación por cursor',
+                required=False,
+                type=str
             )
         ]
     ),
@@ -39,7 +72,7 @@ class BookViewSet(viewsets.ModelViewSet):
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = Pagination
 
@@ -55,6 +88,274 @@ class BookViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    @catalog_condition
+    def list(self, request, *args, **kwargs):
+        """
+        Lista los libros respondiendo 304 si el catálogo no cambió.
+
+        Con BOOKS_NATIVE_READS la paginación por página se resuelve con
+        pymongo en lugar del ORM.
+        """
+        if settings.BOOKS_NATIVE_READS and not KeysetPagination.is_requested(request):
+            return self.native_list(request)
+        return super().list(request, *args, **kwargs)
+
+    @book_condition
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Obtiene un libro respondiendo 304 si no cambió desde la copia del cliente.
+        """
+        if settings.BOOKS_NATIVE_READS:
+            return self.native_retrieve(request, kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return super().retrieve(request, *args, **kwargs)
+
+    def native_list(self, request):
+        """
+        Lista los libros consultando MongoDB directamente.
+
+        Produce la misma respuesta que el listado del ORM sin pasar por la
+        traducción SQL de djongo ni por la instanciación de modelos.
+
+        Args:
+            request: Objeto Request con el filtro y la paginación
+
+        Returns:
+            Response: Página de libros con los metadatos de paginación
+        """
+        repository = BookRepository()
+        genre = request.query_params.get('genre')
+        documents = self.paginator.paginate_counted(
+            repository.count(genre),
+            lambda offset, limit: repository.list(genre, offset, limit),
+            request
+        )
+        return self.get_paginated_response(self.get_serializer(documents, many=True).data)
+
+    def native_retrieve(self, request, pk):
+        """
+        Obtiene un libro consultando MongoDB directamente.
+
+        Args:
+            request: Objeto Request con el filtro de género
+            pk: Identificador del libro
+
+        Returns:
+            Response: Libro con la misma representación que BookSerializer
+        """
+        document = BookRepository().get(pk, request.query_params.get('genre'))
+        if document is None:
+            raise Http404
+        return Response(book_representation(document))
+
+    @property
+    def paginator(self):
+        """
+        Obtiene el paginador de la vista.
+
+        El listado usa paginación por cursor cuando se solicita con
+        ?pagination=cursor; el resto de acciones usa la paginación por página.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.action == 'list' and KeysetPagination.is_requested(self.request):
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    @extend_schema(
+        tags=['Books'],
+        description=(
+            f'POST crea y PATCH actualiza parcialmente una lista de hasta {BULK_MAX_ITEMS} libros '
+            '(cada elemento de PATCH incluye su "id"); DELETE recibe {"ids": [...]}.'
+        ),
+        request=BookSerializer(many=True),
+        responses={
+            200: OpenApiTypes.OBJECT,
+            201: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+        }
+    )
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Endpoint para crear, actualizar o eliminar libros en lote.
+
+        Valida todos los elementos y escribe los válidos en una sola
+        operación de MongoDB, informando el resultado de cada elemento.
+
+        Args:
+            request: Objeto Request con la lista de libros o de ids
+
+        Returns:
+            Response: Resultados y errores indexados por posición
+        """
+        if request.method == 'DELETE':
+            items = request.data.get('ids') if isinstance(request.data, dict) else None
+        else:
+            items = request.data
+
+        if not isinstance(items, list) or not items:
+            expected = 'de ids en "ids"' if request.method == 'DELETE' else 'de libros'
+            return Response(
+                {'error': f'Se requiere una lista {expected} no vacía'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'Se permiten como máximo {BULK_MAX_ITEMS} elementos por petición'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        writer = BookBulkWriter()
+        if request.method == 'POST':
+            result, success_status = writer.create(items), status.HTTP_201_CREATED
+        elif request.method == 'PATCH':
+            result, success_status = writer.update(items), status.HTTP_200_OK
+        else:
+            result, success_status = writer.delete(items), status.HTTP_200_OK
+
+        return Response(
+            result.as_dict(),
+            status=success_status if result.results else status.HTTP_400_BAD_REQUEST
+        )
+
+    @extend_schema(
+        tags=['Books'],
+        parameters=[
+            OpenApiParameter(
+                name='output',
+                description='Formato de exportación (default: ndjson)',
+                required=False,
+                type=str,
+                enum=sorted(EXPORT_FORMATS)
+            ),
+            OpenApiParameter(
+                name='genre',
+                description='Filtrar por género',
+                required=False,
+                type=str,
+                enum=['FIC', 'NOF', 'SCI', 'ROM', 'MIS', 'FAN', 'PRO', 'DAT']
+            )
+        ],
+        responses={
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            (200, 'text/csv'): OpenApiTypes.STR,
+            400: OpenApiTypes.OBJECT,
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Endpoint para exportar el catálogo completo en NDJSON o CSV.
+
+        Los libros se envían a medida que llegan del cursor de MongoDB,
+        por lo que la memoria del worker es constante y el primer byte
+        sale con el primer lote.
+
+        Args:
+            request: Objeto Request con los parámetros 'output' y 'genre'
+
+        Returns:
+            StreamingHttpResponse: Catálogo en el formato solicitado
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Formato no soportado; use {" o ".join(sorted(EXPORT_FORMATS))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        content_type, extension, rows = EXPORT_FORMATS[output]
+        documents = BookRepository().iterate(
+            request.query_params.get('genre'), batch_size=EXPORT_BATCH_SIZE
+        )
+        response = StreamingHttpResponse(buffered(rows(documents)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="books.{extension}"'
+        return response
+
+    @extend_schema(
+        tags=['Books'],
+        request={
+            'multipart/form-data': {
+                'type': 'object',
+                'properties': {
+                    'file': {'type': 'string', 'format': 'binary'},
+                    'input': {'type': 'string', 'enum': [*IMPORT_FORMATS]}
+                },
+                'required': ['file']
+            }
+        },
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+            413: OpenApiTypes.OBJECT,
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_books(self, request):
+        """
+        Endpoint para importar libros desde un archivo CSV o NDJSON.
+
+        El archivo se procesa de forma incremental en lotes, igual que el
+        comando import_books. La respuesta incluye las estadísticas y las
+        primeras filas rechazadas.
+
+        La importación ocurre dentro de la petición, por lo que el archivo
+        se limita a IMPORT_UPLOAD_MAX_BYTES e IMPORT_UPLOAD_MAX_ROWS; los
+        mayores se importan con el comando, que puede reanudarse. Antes de
+        escribir se recorre el archivo completo, de modo que un error de
+        codificación o de formato no deja una importación parcial.
+
+        Args:
+            request: Objeto Request con el archivo 'file' y el formato opcional 'input'
+
+        Returns:
+            Response: Estadísticas de la importación y filas rechazadas
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'Se requiere el archivo "file"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        input_format = request.data.get('input') or detect_format(upload.name)
+        if input_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f'Formato no soportado; use {" o ".join(IMPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        too_large = Response(
+            {'error': (
+                f'El archivo supera el límite de {settings.IMPORT_UPLOAD_MAX_BYTES} bytes o '
+                f'{settings.IMPORT_UPLOAD_MAX_ROWS} filas; use el comando import_books'
+            )},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        if upload.size > settings.IMPORT_UPLOAD_MAX_BYTES:
+            return too_large
+
+        try:
+            rows = count_rows(upload.file, input_format, limit=settings.IMPORT_UPLOAD_MAX_ROWS + 1)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response(
+                {'error': f'El archivo no es un {input_format.upper()} válido en UTF-8: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if rows > settings.IMPORT_UPLOAD_MAX_ROWS:
+            return too_large
+
+        rejects = []
+
+        def on_reject(reject):
+            if len(rejects) < IMPORT_MAX_REJECTS:
+                rejects.append(reject)
+
+        stream = open_text(upload.file)
+        stats = BookImporter(on_reject=on_reject).run(read_rows(stream, input_format))
+        return Response({**stats, 'rejects': rejects})
+
     @extend_schema(
         tags=['Books'],
         parameters=[
@@ -63,6 +364,18 @@ class BookViewSet(viewsets.ModelViewSet):
                 description='Término de búsqueda',
                 required=True,
                 type=str
+            ),
+            OpenApiParameter(
+                name='facets',
+                description='Incluye en "facets" la cantidad de coincidencias por género, rango de precio y década',
+                required=False,
+                type=bool
+            ),
+            OpenApiParameter(
+                name='fuzzy',
+                description='Tolera errores de escritura buscando los términos parecidos del título y el autor',
+                required=False,
+                type=bool
             )
         ],
         responses={
@@ -76,8 +389,11 @@ class BookViewSet(viewsets.ModelViewSet):
         """
         Endpoint para búsqueda de texto completo en libros.
         
-        Utiliza el motor de búsqueda de MongoDB para realizar
-        búsquedas en los campos de texto del libro.
+        Utiliza el índice invertido de términos para buscar en el título,
+        el autor y el género del libro, ignorando acentos y mayúsculas.
+        Con facets=true la respuesta incluye también las facetas de todas
+        las coincidencias, y con fuzzy=true la búsqueda tolera errores de
+        escritura usando el índice de trigramas.
         
         Args:
             request: Objeto Request con el parámetro de búsqueda 'q'
@@ -92,58 +408,133 @@ class BookViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        pipeline = [
-            {
-                '$match': {
-                    '$or': [
-                        {'title': {'$regex': search_term, '$options': 'i'}},
-                        {'author': {'$regex': search_term, '$options': 'i'}},
-                        {'genre': {'$regex': search_term, '$options': 'i'}}
-                    ]
-                }
-            },
-            {
-                '$addFields': {
-                    'score': {
-                        '$add': [
-                            {'$cond': [{'$regexMatch': {'input': '$title', 'regex': search_term, 'options': 'i'}}, 3, 0]},
-                            {'$cond': [{'$regexMatch': {'input': '$author', 'regex': search_term, 'options': 'i'}}, 2, 0]},
-                            {'$cond': [{'$regexMatch': {'input': '$genre', 'regex': search_term, 'options': 'i'}}, 1, 0]}
-                        ]
-                    }
-                }
-            },
-            {
-                '$sort': {
-                    'score': -1,
-                    'title': 1
-                }
-            }
-        ]
+        return ResponseCache('search').respond(
+            request, lambda: self.get_search_response(request, search_term)
+        )
 
-        try:
-            mongo = MongoConnection()
-            collection = mongo.get_collection('libros_book')
-            results = list(collection.aggregate(pipeline))
+    def get_search_response(self, request, search_term):
+        """
+        Ejecuta la búsqueda y construye la respuesta paginada.
 
-            # Normalizar los ObjectId y Decimal128 para la serialización JSON
-            for result in results:
-                if '_id' in result:
-                    result['_id'] = str(result['_id'])
-                if 'price' in result:
-                    result['price'] = str(result['price'])
+        Args:
+            request: Objeto Request con los parámetros de paginación
+            search_term: Término de búsqueda
 
-            page = self.paginate_queryset(results)
-            if page is not None:
-                return self.get_paginated_response(page)
+        Returns:
+            Response: Resultados paginados ordenados por relevancia
+        """
+        try:
+            if fuzzy_requested(request.query_params):
+                plan = get_fuzzy_plan(search_term)
+            else:
+                plan = get_search_backend().plan(search_term)
+            # La paginación y el conteo se resuelven en la misma agregación
+            page = self.paginator.paginate_aggregation(
+                plan.collection, plan.pipeline, request,
+                ranking=plan.ranking, lookup=plan.lookup
+            )
 
-            return Response(results)
+            response = self.get_paginated_response(page)
+            if facets_requested(request.query_params):
+                response.data['facets'] = self.get_search_facets(plan)
+                if response.data['facets'] is None:
+                    # Sin facetas la respuesta no se guarda en caché
+                    response['Cache-Control'] = 'no-store'
+            return response
+        except APIException:
+            raise
         except Exception as e:
             return Response(
                 {'error': f'Error en la búsqueda: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @extend_schema(
+        tags=['Books'],
+        parameters=[
+            OpenApiParameter(
+                name='prefix',
+                description='Texto escrito; se completa su última palabra',
+                required=True,
+                type=str
+            ),
+            OpenApiParameter(
+                name='limit',
+                description=f'Cantidad de sugerencias (default y máximo {SUGGEST_MAX_RESULTS})',
+                required=False,
+                type=int
+            )
+        ],
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT,
+            503: OpenApiTypes.OBJECT,
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """
+        Endpoint de autocompletado para el cuadro de búsqueda.
+
+        Completa la última palabra con los términos del título y el autor
+        presentes en más libros. Se resuelve con el índice en memoria del
+        worker, sin consultar MongoDB; si el worker aún no lo tiene,
+        responde 503 mientras se construye en segundo plano.
+
+        Args:
+            request: Objeto Request con 'prefix' y opcionalmente 'limit'
+
+        Returns:
+            Response: Sugerencias ordenadas por cantidad de libros
+        """
+        prefix = request.query_params.get('prefix', '')
+        if not prefix.strip():
+            return Response(
+                {'error': 'El parámetro "prefix" es requerido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = int(request.query_params.get('limit', SUGGEST_MAX_RESULTS))
+            if limit < 1:
+                raise ValueError(limit)
+        except ValueError:
+            return Response(
+                {'error': 'El parámetro "limit" debe ser un número positivo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        suggestions = suggest_index.suggest(prefix, min(limit, SUGGEST_MAX_RESULTS))
+        if suggestions is None:
+            return Response(
+                {'error': 'El índice de autocompletado se está construyendo'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'}
+            )
+        return Response({
+            'prefix': prefix,
+            'suggestions': [{'text': text, 'count': count} for text, count in suggestions],
+        })
+
+    def get_search_facets(self, plan):
+        """
+        Calcula las facetas de una búsqueda con su propio límite de tiempo.
+
+        Args:
+            plan: SearchPlan de la búsqueda
+
+        Returns:
+            dict: Facetas de las coincidencias, o None si superaron
+            SEARCH_FACETS_MAX_TIME_MS
+        """
+        try:
+            facet_result = next(MongoConnection().aggregate(
+                plan.collection, search_facets_pipeline(plan),
+                maxTimeMS=settings.SEARCH_FACETS_MAX_TIME_MS
+            ), None)
+        except ExecutionTimeout:
+            return None
+        return search_facets_result(facet_result)
+
 @extend_schema(tags=['Books'])
 class BookStatsView(views.APIView):
     """
@@ -152,7 +543,7 @@ class BookStatsView(views.APIView):
     Proporciona endpoints para análisis estadístico de los datos de libros
     utilizando las capacidades de agregación de MongoDB.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -163,6 +554,24 @@ class BookStatsView(views.APIView):
                 description='Year to filter statistics',
                 required=True,
                 type=int
+            ),
+            OpenApiParameter(
+                name='top',
+                description=f'Books per page, ordered by price (default {STATS_PAGE_SIZE}, max {STATS_MAX_PAGE_SIZE})',
+                required=False,
+                type=int
+            ),
+            OpenApiParameter(
+                name='page',
+                description='Page of the book listing',
+                required=False,
+                type=int
+            ),
+            OpenApiParameter(
+                name='summary',
+                description='Return only the summary numbers, without the book listing',
+                required=False,
+                type=bool
             )
         ],
         responses={
@@ -172,75 +581,54 @@ class BookStatsView(views.APIView):
             500: OpenApiTypes.OBJECT
         }
     )
+    @catalog_condition
     def get(self, request):
         """
         Get average book price by year.
+
+        The books of the year are listed by price in pages of `top` items;
+        `summary=true` returns only the aggregated numbers.
         """
-        year = request.query_params.get('year')
-        
-        if not year or not year.isdigit():
-            return Response(
-                {'error': 'Year parameter is required and must be a number'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        try:
+            year, page, top, summary_only = parse_stats_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        pipeline = [
-            {
-                '$sort': {
-                    'price': -1
-                }
-            },
-            {
-                '$match': {
-                    '$expr': {
-                        '$eq': [{'$year': '$published_date'}, int(year)]
-                    }
-                }
-            },
-            {
-                '$group': {
-                    '_id': None,
-                    'average_price': {'$avg': '$price'},
-                    'min_price': {'$min': '$price'},
-                    'max_price': {'$max': '$price'},
-                    'total_books': {'$sum': 1},
-                    'books': {
-                        '$push': {
-                            'title': '$title',
-                            'author': '$author',
-                            'price': '$price'
-                        }
-                    }
-                }
-            },
-            {
-                '$project': {
-                    '_id': 0,
-                    'year': {'$literal': int(year)},
-                    'average_price': {'$round': ['$average_price', 2]},
-                    'min_price': 1,
-                    'max_price': 1,
-                    'total_books': 1,
-                    'books': 1
-                }
-            }
-        ]
+        return ResponseCache('book_stats').respond(
+            request, lambda: self.get_stats_response(year, page, top, summary_only)
+        )
+
+    def get_stats_response(self, year, page, top, summary_only):
+        """
+        Ejecuta la agregación de estadísticas y construye la respuesta.
+
+        Args:
+            year: Año de publicación
+            page: Página del listado de libros
+            top: Cantidad de libros por página
+            summary_only: Si es True no se incluye el listado de libros
+
+        Returns:
+            Response: Estadísticas del año o 404 si no hay libros
+        """
+        pipeline = book_stats_pipeline(year, page, top, summary_only)
 
         try:
             mongo = MongoConnection()
-            collection = mongo.get_collection('libros_book')
-            result = list(collection.aggregate(pipeline))
+            result = book_stats_result(
+                next(mongo.aggregate('libros_book', pipeline), None), year, page, top
+            )
 
-            if not result:
+            if result is None:
                 return Response(
                     {
-                        'year': int(year),
+                        'year': year,
                         'message': f'No books found for year {year}'
                     },
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            serializer = BookStatsSerializer(data=result[0])
+            serializer = BookStatsSerializer(data=result)
             serializer.is_valid(raise_exception=True)
             
             return Response(serializer.data)
@@ -249,3 +637,51 @@ class BookStatsView(views.APIView):
                 {'error': f'Error processing aggregation: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class RuntimeStatsView(views.APIView):
+    """
+    Vista con métricas de ejecución del worker que atiende la petición.
+
+    Los contadores son locales a cada proceso, por lo que cada petición
+    refleja únicamente el worker que la respondió.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(tags=['Runtime'], responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        """
+        Obtiene las métricas de ejecución del worker actual.
+        """
+        return Response({
+            'response_cache': ResponseCache.stats(),
+            'auth_user_cache': user_cache.stats(),
+            'suggest_index': suggest_index.stats(),
+            'mongo_pool': pool_stats.stats(),
+        })
+
+
+def metrics(request):
+    """
+    Expone los histogramas por vista de todos los workers en el formato de Prometheus.
+
+    Solo está disponible con METRICS_TOKEN y exige ese token en el
+    encabezado Authorization ('Bearer <token>'), que es como Prometheus
+    se autentica en los scrapes.
+
+    Args:
+        request: Objeto HttpRequest
+
+    Returns:
+        HttpResponse: Métricas en texto plano
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404('Las métricas están desactivadas; defina METRICS_TOKEN')
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+        response = HttpResponse('Token de métricas inválido', status=status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')